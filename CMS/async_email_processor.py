@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Async Email Processor for Portfolio Website
+asyncio run loop that overlaps IMAP network I/O with page rendering
+
+The sequential runner downloads every message in full and only then renders
+the winners one by one, so a run costs fetch time + render time. This runner:
+- fetches headers only (one round trip per folder) to pick the newest email per title,
+  skipping versions the title index says are already superseded
+- falls back to the next newest email of a title when its body shows the newest
+  one is not a page email
+- downloads winner bodies back to back on a dedicated IMAP thread
+- starts rendering each winner the moment its body arrives
+- writes each page's media files concurrently
+- leaves pages the render cache says are unchanged (and their media) untouched
+so wall time approaches max(fetch, render) instead of their sum.
+"""
+
+import os
+import sys
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from email.message import Message
+from typing import Dict, List, Optional, Tuple, Any
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from github_actions_email_processor import GitHubActionsEmailProcessor
+from simple_email_processor import (
+    parse_email_content, save_attachments, update_main_index_navigation, commit_and_push_paths, state_paths,
+    sanitize_filename, has_research_tile
+)
+from enhanced_email_processor import render_enhanced_page_from_parsed, add_enhanced_research_tile
+from title_index import message_digest
+from render_cache import RenderCache, render_key
+
+try:
+    import config  # Local import when running from CMS directory
+except ModuleNotFoundError:
+    from . import config  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncEmailProcessor(GitHubActionsEmailProcessor):
+    """GitHubActionsEmailProcessor with an overlapped fetch/render loop"""
+
+    def __init__(self):
+        super().__init__()
+        # imaplib connections are not thread-safe: all IMAP calls share one thread
+        self.imap_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='imap')
+        self.render_pool = ThreadPoolExecutor(max_workers=config.ASYNC_RENDER_WORKERS, thread_name_prefix='render')
+        self.index_lock: Optional[asyncio.Lock] = None
+        self.render_cache = RenderCache()
+
+    async def imap(self, func, *args):
+        """Run a blocking IMAP call on the IMAP thread"""
+        return await asyncio.get_running_loop().run_in_executor(self.imap_pool, func, *args)
+
+    # ------------------------------------------------------------------
+    # Fetch
+    # ------------------------------------------------------------------
+
+    async def scan_folder(self, mail, folder: str) -> List[Dict[str, Any]]:
+        """Classify a folder's new messages from their headers alone"""
+        return await self.imap(self.scan_headers, mail, folder)
+
+    async def fetch_body(self, mail, candidate: Dict[str, Any]) -> Optional[Message]:
+        return await self.imap(self.fetch_message, mail, candidate)
+
+    # ------------------------------------------------------------------
+    # Render
+    # ------------------------------------------------------------------
+
+    async def publish(self, raw_msg: Message, candidate: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Render one email and add its tile; returns the page fields, or None when nothing needed publishing"""
+        loop = asyncio.get_running_loop()
+        # Reads index.html for the page's tile
+        if await asyncio.to_thread(self.title_index.is_unchanged, candidate['subject'].strip(), message_digest(raw_msg)):
+            logger.info(f"Content unchanged since last publish, skipping: {candidate['subject']}")
+            self.record_published(raw_msg, candidate)
+            return None
+
+        parsed = await loop.run_in_executor(self.render_pool, parse_email_content, raw_msg.as_string())
+
+        # Checked before the media writes so a cache hit leaves images/ alone too
+        page = self.render_cache.lookup(sanitize_filename(parsed['title']), render_key('enhanced', parsed))
+        if page is None:
+            # Independent media writes run concurrently, config.MEDIA_WORKERS at a time
+            saved_paths = await asyncio.to_thread(save_attachments, parsed.get('attachments', []), parsed['title'])
+            page = await loop.run_in_executor(self.render_pool, render_enhanced_page_from_parsed,
+                                              parsed, saved_paths, self.render_cache)
+        if not page:
+            raise RuntimeError("page rendering failed")
+
+        # index.html is shared by every render
+        async with self.index_lock:
+            if page.get('cached') and await asyncio.to_thread(has_research_tile, page['filename']):
+                logger.info(f"Page unchanged since last render, nothing to publish: {page['title']}")
+                self.record_published(raw_msg, candidate)
+                return None
+            await asyncio.to_thread(update_main_index_navigation)
+            await asyncio.to_thread(add_enhanced_research_tile, page['title'], page['description'],
+                                    page['filename'], page['tile_image'])
+            if not page.get('cached'):
+                self.render_cache.store(page)
+        self.record_published(raw_msg, candidate)
+        return page
+
+    # ------------------------------------------------------------------
+    # Run loop
+    # ------------------------------------------------------------------
+
+    async def process_new_emails_async(self):
+        """Main email processing function, overlapped"""
+        logger.info("Starting async email processing")
+        self.index_lock = asyncio.Lock()
+
+        mail = await self.imap(self.connect_to_email)
+        if not mail:
+            logger.error("Could not connect to email server")
+            return
+        self.selected_folder = None
+
+        try:
+            candidates = []
+            for folder in self.folders_to_check:
+                try:
+                    candidates.extend(await self.scan_folder(mail, folder))
+                except Exception as e:
+                    logger.error(f"Error checking folder {folder}: {e}")
+
+            if not candidates:
+                logger.info("No new page creation emails to process")
+                self.save_processed_emails()
+                return
+
+            # Bodies arrive one by one; each render starts while the next body downloads
+            renders: Dict[str, Tuple[str, asyncio.Task]] = {}
+            pending = candidates
+            while pending:
+                winners = self.group_emails_by_title([(c['id'], c, c) for c in pending])
+                logger.info(f"Processing {len(winners)} unique titles from {len(pending)} emails")
+                rejected = set()
+                for title, (email_id_str, candidate, _) in sorted(winners.items(), key=lambda kv: kv[1][1]['folder']):
+                    raw_msg = await self.fetch_body(mail, candidate)
+                    if raw_msg is None:
+                        continue
+                    email_data = self.extract_email_data(raw_msg)
+                    if not self.is_page_creation_email(email_data['subject'], email_data['body']):
+                        # Headers alone can't tell; the next newest email of this title gets its turn
+                        logger.info(f"Skipping non-page email: {email_data['subject']}")
+                        self.processed_emails.add(email_id_str)
+                        rejected.add(sanitize_filename(title))
+                        continue
+                    renders[title] = (email_id_str, asyncio.create_task(self.publish(raw_msg, candidate)))
+                pending = [c for c in pending if c['id'] not in self.processed_emails
+                           and sanitize_filename(c['subject'].strip()) in rejected]
+
+            pages = []
+            for title, (email_id_str, task) in renders.items():
+                try:
+                    page = await task
+                except Exception as e:
+                    logger.error(f"❌ Failed to create page for '{title}': {e}")
+                    continue
+                # Published or unchanged, this email is the newest page email for its page, so
+                # the older ones are settled too; a failed render leaves them all for the next run
+                self.mark_page_processed(title, [(c['id'], c, c) for c in candidates])
+                if page:
+                    logger.info(f"✅ Successfully created/updated page: {title}")
+                    pages.append(page)
+
+            if pages and os.getenv('GITHUB_ACTIONS') != 'true':
+                paths = ['index.html'] + state_paths()
+                paths += [f"Pages/{page['filename']}" for page in pages]
+                for page in pages:
+                    paths.extend(media_file.replace('../', '') for media_file in page['saved_files'])
+                titles = ', '.join(page['title'] for page in pages)
+                commit_and_push_paths(paths, f"Add/update pages: {titles}\n\nAutomatically generated from email")
+
+            logger.info(f"Processing complete. Processed {len(pages)} emails")
+            self.save_processed_emails()
+            self.title_index.save()
+            self.render_cache.save()
+
+        finally:
+            try:
+                await self.imap(mail.close)
+                await self.imap(mail.logout)
+            except Exception:
+                pass
+            self.imap_pool.shutdown(wait=False)
+            self.render_pool.shutdown(wait=False)
+
+
+def main():
+    """Main function for the async runner"""
+    try:
+        logger.info("Async Email Processor starting...")
+        # Index and git helpers use paths relative to the CMS directory
+        os.chdir(os.path.dirname(os.path.abspath(__file__)))
+        asyncio.run(AsyncEmailProcessor().process_new_emails_async())
+        logger.info("Async Email Processor completed successfully")
+    except Exception as e:
+        logger.error(f"Fatal error in main: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Adversarial Input Benchmark for Portfolio Website
+Times every rendering entry point on inputs built to make backtracking regexes
+blow up (unclosed delimiters, runs of openers, megabyte lines, an index full of
+tiles) and checks that doubling the input roughly doubles the time.
+
+A case whose time grows more than `--limit` times per doubling is reported as
+superlinear and the script exits 1, so it can gate renderer changes. A call
+slower than `--budget` seconds stops that case early and counts as a failure.
+The legacy renderer is the parity reference only and is not benchmarked here.
+
+Usage:
+    python benchmark_adversarial.py [--sizes N N N] [--limit RATIO] [--budget SECONDS] [case ...]
+"""
+
+import io
+import sys
+import time
+import argparse
+import contextlib
+from datetime import date
+from typing import Callable, Dict, List, Optional
+
+from tag_renderer import render_markdown
+from html_minify import minify_html
+import simple_email_processor as simple
+import enhanced_email_processor as enhanced
+
+# Pathological inputs, each a function of a repeat count
+CASES: Dict[str, Callable[[int], str]] = {
+    'unmatched_stars': lambda n: '*a' * n,
+    'unmatched_bold': lambda n: '**a ' * n,
+    'image_openers': lambda n: '![a](' * n,
+    'video_openers': lambda n: '[VIDEO](' * n,
+    'link_openers': lambda n: '[a](' * n,
+    'wrapped_links': lambda n: '[a\n' * n,
+    'list_items': lambda n: '<li>' * n,
+    'list_lines': lambda n: '\n'.join(['- <li>x'] * n),
+    'carousels': lambda n: '\n'.join(['[Carousel]', 'a.jpg'] * n),
+    'desktop_blocks': lambda n: '\n'.join(['[Desktop]', 'x'] * n),
+    'descriptions': lambda n: '[Description]x ' * n,
+    'tag_openers': lambda n: '<' * n,
+    'code_fences': lambda n: '```python\n' + 'x = \"\"\" /* \' a\n' * n,
+    'raw_elements': lambda n: '<!----><pre> </pre>  \n<' * n + '<script>  \n' * n,
+    'long_line': lambda n: 'word ' * (n * 25),
+    'tile_index': lambda n: '<div class="project">\n<img src="a.png">\n<h3>x</h3>\n' * n
+                            + '<a href="Pages/page.html">Read On...</a>',
+}
+
+
+def quietly(call: Callable[[str], object]) -> Callable[[str], object]:
+    """The processors narrate every step; keep the report readable"""
+    def run(text: str) -> object:
+        with contextlib.redirect_stdout(io.StringIO()):
+            return call(text)
+    return run
+
+
+# Every function untrusted email text reaches on its way to a page
+ENTRY_POINTS: Dict[str, Callable[[str], object]] = {
+    'render_markdown': render_markdown,
+    'build_html_page': quietly(lambda text: simple.build_html_page('Bench', text, 'bench.html', created=date.today())),
+    'build_enhanced_html_page': quietly(lambda text: enhanced.build_enhanced_html_page(
+        'Bench', text, 'bench.html', [], 'Bench', created=date.today())),
+    'parse_email_content': quietly(lambda text: simple.parse_email_content(f"Subject: Bench\n\n{text}")),
+    'extract_description': simple.extract_description,
+    'generate_description': quietly(lambda text: simple.generate_description_from_content(text, 'Bench')),
+    'generate_description (enhanced)': quietly(lambda text: enhanced.generate_description_from_content(text, 'Bench')),
+    'html_to_text': simple.html_to_text,
+    'remove_tile_markup': lambda text: simple.remove_tile_markup(text, 'page.html'),
+    'minify_html': minify_html,
+}
+
+
+def timed(call: Callable[[str], object], text: str) -> float:
+    start = time.perf_counter()
+    call(text)
+    return time.perf_counter() - start
+
+
+def growth(call: Callable[[str], object], make: Callable[[int], str], sizes: List[int],
+           budget: float) -> Optional[List[float]]:
+    """Best-of-two seconds per size, or None once a call exceeds `budget`"""
+    times = []
+    for n in sizes:
+        text = make(n)
+        seconds = min(timed(call, text), timed(call, text))
+        if seconds > budget:
+            return None
+        times.append(seconds)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check rendering entry points stay linear on hostile input")
+    parser.add_argument('cases', nargs='*', help=f"cases to run (default: all of {', '.join(CASES)})")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[2000, 4000, 8000],
+                        help="repeat counts, each double the last (default: 2000 4000 8000)")
+    parser.add_argument('--limit', type=float, default=3.0, help="max time ratio per doubling (default: 3)")
+    parser.add_argument('--budget', type=float, default=5.0, help="max seconds for one call (default: 5)")
+    args = parser.parse_args()
+
+    failures = 0
+    for case in args.cases or CASES:
+        make = CASES[case]
+        print(f"{case} ({len(make(args.sizes[-1])):,} chars at n={args.sizes[-1]})")
+        for name, call in ENTRY_POINTS.items():
+            times = growth(call, make, args.sizes, args.budget)
+            if times is None:
+                failures += 1
+                print(f"  ❌ {name:<32} over the {args.budget:g}s budget")
+                continue
+            # Sub-millisecond timings are mostly noise; don't read growth into them
+            ratio = times[-1] / max(times[-2], 1e-3) if len(times) > 1 else 1.0
+            superlinear = ratio > args.limit and times[-1] > 0.01
+            failures += superlinear
+            print(f"  {'❌' if superlinear else '✅'} {name:<32} {times[-1] * 1e3:9.1f} ms  x{ratio:.1f} per doubling")
+
+    if failures:
+        print(f"❌ {failures} superlinear entry point(s)")
+        sys.exit(1)
+    print("✅ Every entry point grows linearly")
+
+
+if __name__ == "__main__":
+    main()
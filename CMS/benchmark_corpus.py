@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Benchmark Corpus for Portfolio Website
+Email bodies (as markdown_to_html receives them) shared by the renderer
+benchmarks and the renderer parity test.
+
+Every sample sticks to the tag dialect in email_tags_reference.md. Mail
+arrives over IMAP with CRLF line endings, so each sample is also used in a
+CRLF variant.
+"""
+
+import random
+from typing import List, Tuple
+
+TEST_EMAIL = """[center] ## *…Test Email Processing…*
+
+This is a test email to verify that the email-to-portfolio system is working correctly.
+
+**How it works:** This test email should create a new web page and add a tile to the Research section of the homepage.
+
+The system should:
+1. Parse this email content
+2. Generate a new HTML page in the Pages/ directory
+3. Add a research tile to the homepage
+4. Commit and push the changes to GitHub
+
+If you can see this as a webpage with a corresponding tile, the system is working!"""
+
+TAG_REFERENCE_EMAIL = """# Welcome to My Project
+
+This is the main content that will appear normally.
+
+[center] ### Project Highlights
+
+[Desktop]
+This detailed information only shows on desktop browsers.
+Perfect for technical specifications or detailed explanations.
+[/Desktop]
+
+[center] Here's our image gallery:
+
+[Carousel]
+screenshot1.jpg
+demo_video.mp4
+screenshot2.png
+Final result showing the completed project
+[/Carousel]
+
+[right] *Project completed in 2024*
+
+## Conclusion
+
+[center] **Thank you for viewing my project!**"""
+
+ARTICLE_EMAIL = """# Building a Neural Network Classifier
+
+Built a neural network that classifies images with **95% accuracy** on the
+held-out set, using *transfer learning* from a pretrained backbone.
+
+## Technologies Used:
+- Python & TensorFlow
+- 50,000 training images
+- GPU acceleration with **mixed precision**
+
+### Results
+
+The model can identify objects in real-time. See the [project repository](https://github.com/cyohn55/Portfolio) and the [full
+write-up](https://example.com/posts/classifier?ref=portfolio&utm=email) for details.
+
+Demo video: https://www.youtube.com/watch?v=dQw4w9WgXcQ
+
+![Confusion matrix](confusion_matrix.png)
+
+[Mobile]
+[center] Rotate your phone for the full-size charts.
+[/Mobile]
+
+[left] Training loss < 0.05 after 40 epochs & validation "accuracy" > 0.95
+
+## Next Steps
+- Quantize the model for edge devices
+- Try a [vision transformer](https://arxiv.org/abs/2010.11929)
+- Publish the dataset"""
+
+MEDIA_EMAIL = """[center] ### Arduino LED Controller
+
+Created an Arduino-based LED controller with a companion mobile app!
+
+<img src="../images/arduino_led_controller_board.jpg" alt="board.jpg">
+
+## Features:
+- Color mixing
+- Pattern animations
+- Bluetooth control
+
+<video controls style="max-width: 100%; height: auto; margin: 10px 0; border-radius: 8px;" preload="metadata">
+    <source src="../images/arduino_led_controller_demo.mp4" type="video/mp4">
+    <source src="../images/arduino_led_controller_demo.mp4" type="video/quicktime">
+    <p>Your browser doesn't support HTML video. <a href="../images/arduino_led_controller_demo.mp4">Download the video</a> instead.</p>
+</video>
+
+[Carousel]
+<img src="../images/arduino_led_controller_front.jpg" alt="front.jpg">
+<img src="../images/arduino_led_controller_back.jpg" alt="back.jpg">
+Wiring and enclosure
+[/Carousel]
+
+[center] <img src="../images/arduino_led_controller_app.png" alt="app.png">
+
+*Attach images and videos directly to this email*"""
+
+SAMPLE_EMAILS: List[Tuple[str, str]] = [
+    ('test_email', TEST_EMAIL),
+    ('tag_reference', TAG_REFERENCE_EMAIL),
+    ('article', ARTICLE_EMAIL),
+    ('media', MEDIA_EMAIL),
+]
+
+
+def sample_emails(crlf: bool = True) -> List[Tuple[str, str]]:
+    """Samples, plus their CRLF variants when `crlf` is set"""
+    samples = list(SAMPLE_EMAILS)
+    if crlf:
+        samples += [(f"{name}_crlf", text.replace('\n', '\r\n')) for name, text in SAMPLE_EMAILS]
+    return samples
+
+
+def mixed_emails(count: int, seed: int = 0) -> List[str]:
+    """Deterministic pseudo-emails assembled from shuffled sample lines"""
+    rng = random.Random(seed)
+    lines = [line for _, text in SAMPLE_EMAILS for line in text.split('\n')] + ['', '']
+    emails = []
+    for _ in range(count):
+        body = '\n'.join(rng.choice(lines) for _ in range(rng.randint(1, 60)))
+        emails.append(body.replace('\n', '\r\n') if rng.random() < 0.3 else body)
+    return emails
+
+
+def corpus_of_size(size_bytes: int) -> List[str]:
+    """Repeat the samples until their combined UTF-8 size reaches `size_bytes`"""
+    documents = [text for _, text in sample_emails()]
+    corpus, total, i = [], 0, 0
+    while total < size_bytes:
+        document = documents[i % len(documents)]
+        corpus.append(document)
+        total += len(document.encode('utf-8'))
+        i += 1
+    return corpus
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Markdown Engine Benchmark for Portfolio Website
+Throughput (MB/s of email content) and output size of every engine in
+markdown_engines.py on the shared corpus, plus a correctness check, so the
+fastest engine that renders the site's dialect correctly can be picked in
+config.MARKDOWN_ENGINE.
+
+An engine renders an email correctly when no bracket tag ([Carousel],
+[Desktop], [center], [VIDEO](...) ...) is left in its output and every element
+it opens is closed. Engines differ in whitespace and list markup, so outputs
+are not compared byte for byte here (test_tag_renderer.py does that for the
+tags and legacy engines).
+
+Usage:
+    python benchmark_engines.py [--size MB] [--repeat N]
+"""
+
+import re
+import time
+import argparse
+from html.parser import HTMLParser
+from typing import Callable, List
+
+from benchmark_corpus import corpus_of_size
+from markdown_engines import ENGINES, get_engine
+
+# Tags of the email dialect that must never reach a page as text
+LEFTOVER_TAG = re.compile(r'\[/?(?:carousel|desktop|mobile|center|left|right|description)\]|\[VIDEO\]\(',
+                          re.IGNORECASE)
+
+VOID_ELEMENTS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr'}
+
+
+class BalanceChecker(HTMLParser):
+    """Counts end tags without a matching open element and elements left open"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.open: List[str] = []
+        self.errors = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag not in VOID_ELEMENTS:
+            self.open.append(tag)
+
+    def handle_endtag(self, tag):
+        if tag in self.open:
+            while self.open.pop() != tag:
+                self.errors += 1
+        else:
+            self.errors += 1
+
+    def unbalanced(self) -> int:
+        self.close()
+        return self.errors + len(self.open)
+
+
+def rendering_problems(rendered: str) -> int:
+    checker = BalanceChecker()
+    checker.feed(rendered)
+    return len(LEFTOVER_TAG.findall(rendered)) + checker.unbalanced()
+
+
+def throughput(render: Callable[[str], str], documents: List[str], repeat: int) -> float:
+    """Best-of-`repeat` MB/s over `documents`"""
+    size_mb = sum(len(document.encode('utf-8')) for document in documents) / 1e6
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for document in documents:
+            render(document)
+        best = min(best, time.perf_counter() - start)
+    return size_mb / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare markdown engines")
+    parser.add_argument('--size', type=float, default=1.0, help="corpus size in MB (default: 1)")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per engine, best is reported")
+    args = parser.parse_args()
+
+    emails = corpus_of_size(int(args.size * 1e6))
+    input_bytes = sum(len(email.encode('utf-8')) for email in emails)
+    print(f"Corpus: {len(emails)} emails, {args.size:g} MB")
+
+    results = []
+    for name in ENGINES:
+        engine = get_engine(name)
+        outputs = [engine.render(email) for email in emails]
+        output_ratio = sum(len(output.encode('utf-8')) for output in outputs) / input_bytes
+        bad = sum(1 for output in outputs if rendering_problems(output))
+        mbps = throughput(engine.render, emails, args.repeat)
+        results.append((name, mbps, bad))
+        print(f"  {name:<16} {mbps:7.2f} MB/s  output {output_ratio:5.2f}x input  "
+              f"{'✅ all correct' if not bad else f'❌ {bad} emails with leftover tags or unbalanced HTML'}")
+
+    correct = [(mbps, name) for name, mbps, bad in results if not bad]
+    if correct:
+        print(f"Fastest correct engine: {max(correct)[1]}")
+
+
+if __name__ == "__main__":
+    main()
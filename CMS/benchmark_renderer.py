@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Renderer Benchmark for Portfolio Website
+Throughput (MB/s of email content) of the single-pass tag renderer against
+the legacy multi-pass markdown_to_html.
+
+Two workloads:
+    emails    the corpus emails rendered one by one (what the pipeline does)
+    document  the same bytes joined into one large page
+
+On the 2 MB corpus the single-pass renderer measures about 1.2x the legacy
+throughput (1.0x-1.4x from run to run); both renderers produce the same output.
+
+Usage:
+    python benchmark_renderer.py [--size MB] [--repeat N]
+"""
+
+import sys
+import time
+import argparse
+from typing import Callable, List
+
+from benchmark_corpus import corpus_of_size
+from legacy_renderer import markdown_to_html as legacy_markdown_to_html
+from tag_renderer import render_markdown
+
+RENDERERS = [
+    ('legacy', legacy_markdown_to_html),
+    ('single-pass', render_markdown),
+]
+
+
+def throughput(render: Callable[[str], str], documents: List[str], repeat: int) -> float:
+    """Best-of-`repeat` MB/s over `documents`"""
+    size_mb = sum(len(document.encode('utf-8')) for document in documents) / 1e6
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for document in documents:
+            render(document)
+        best = min(best, time.perf_counter() - start)
+    return size_mb / best
+
+
+def check_parity(documents: List[str]) -> bool:
+    for document in documents:
+        if render_markdown(document) != legacy_markdown_to_html(document):
+            return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark markdown renderers")
+    parser.add_argument('--size', type=float, default=2.0, help="corpus size in MB (default: 2)")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per renderer, best is reported")
+    args = parser.parse_args()
+
+    emails = corpus_of_size(int(args.size * 1e6))
+    workloads = [
+        ('emails', emails),
+        ('document', ['\n\n'.join(emails)]),
+    ]
+
+    if not check_parity(emails):
+        print("❌ Renderers disagree on the corpus; fix parity before benchmarking")
+        sys.exit(1)
+    print(f"Corpus: {len(emails)} emails, {args.size:g} MB (outputs identical)")
+
+    for workload, documents in workloads:
+        results = {name: throughput(render, documents, args.repeat) for name, render in RENDERERS}
+        summary = '  '.join(f"{name} {mbps:7.2f} MB/s" for name, mbps in results.items())
+        speedup = results['single-pass'] / results['legacy']
+        print(f"  {workload:<9} {summary}  ({speedup:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Bulk Importer for Portfolio Website
+Migrates an archive of emails (a directory of .eml files or an mbox) in one go.
+
+Unlike calling process_email_to_page once per file, the importer:
+- reads only headers to pick the newest email per page (latest wins), and
+  skips pages whose published version (title index) is already as new,
+- parses and renders the winners in a process pool, leaving pages the
+  render cache says are unchanged untouched,
+- rewrites index.html once and makes a single commit at the end.
+
+Usage:
+    python bulk_import.py <directory | mbox file> [--workers N] [--no-commit]
+"""
+
+import os
+import sys
+import mailbox
+import argparse
+import email
+import email.utils
+from datetime import datetime, timezone
+from email.parser import BytesHeaderParser
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from simple_email_processor import (
+    parse_email_content, render_page_from_parsed, is_delete_command,
+    add_research_tiles, update_main_index_navigation, commit_and_push_paths, state_paths,
+    has_research_tile, store_rendered_pages
+)
+from title_index import TitleVersionIndex, message_digest, decode_email_header
+from render_cache import RenderCache
+
+try:
+    import config  # Local import when running from CMS directory
+except ModuleNotFoundError:
+    from . import config  # type: ignore
+
+# (source label, raw message bytes)
+RawMessage = Tuple[str, bytes]
+
+
+def read_archive(path: str) -> List[RawMessage]:
+    """Load every message from a directory of .eml files or an mbox file"""
+    messages = []
+    if os.path.isdir(path):
+        for root, _, files in os.walk(path):
+            for name in sorted(files):
+                if name.lower().endswith('.eml'):
+                    file_path = os.path.join(root, name)
+                    with open(file_path, 'rb') as f:
+                        messages.append((file_path, f.read()))
+    else:
+        for key, message in mailbox.mbox(path).iteritems():
+            messages.append((f"{os.path.basename(path)}#{key}", message.as_bytes()))
+    return messages
+
+
+def message_date(raw: bytes, source: str) -> datetime:
+    """Date header as an aware datetime; falls back to the file's mtime"""
+    headers = BytesHeaderParser().parsebytes(raw)
+    try:
+        date = email.utils.parsedate_to_datetime(headers.get('Date', ''))
+    except (TypeError, ValueError):
+        date = None
+    if date is None:
+        mtime = os.path.getmtime(source) if os.path.exists(source) else 0
+        date = datetime.fromtimestamp(mtime, timezone.utc)
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return date
+
+
+def select_latest(messages: List[RawMessage], title_index: TitleVersionIndex
+                  ) -> Tuple[List[Tuple[datetime, RawMessage]], int]:
+    """Keep the newest message per page, returned oldest first.
+
+    Pages are keyed by sanitize_filename(subject), so subjects that collapse
+    to the same file also resolve to a single winner, and pages already
+    published from an email at least as new are left out. Delete commands
+    are not replayed. Returns (winners, skipped delete command count).
+    """
+    candidates = []
+    deletes = 0
+    for source, raw in messages:
+        # Keyed like the GitHub Actions runner keys them, so both see the same page versions
+        subject = decode_email_header(BytesHeaderParser().parsebytes(raw).get('Subject')).strip()
+        if is_delete_command(subject, "")[0]:
+            deletes += 1
+            continue
+        candidates.append((subject, message_date(raw, source), (source, raw)))
+    winners = title_index.select_latest(candidates)
+    return sorted(((date, item) for _, date, item in winners.values()), key=lambda item: item[0]), deletes
+
+
+# Loaded once per worker process; only read there
+_worker_render_cache: Optional[RenderCache] = None
+
+
+def init_worker():
+    global _worker_render_cache
+    _worker_render_cache = RenderCache()
+
+
+def render_message(raw: bytes) -> Optional[Dict[str, Any]]:
+    """Process-pool entry point: parse one email and write its page and media"""
+    parsed = parse_email_content(raw.decode('utf-8', errors='replace'))
+    return render_page_from_parsed(parsed, _worker_render_cache)
+
+
+def bulk_import(path: str, workers: Optional[int] = None, commit: bool = True) -> bool:
+    """Import an archive; returns True when every selected page was published"""
+    messages = read_archive(path)
+    if not messages:
+        print(f"No messages found in {path}")
+        return False
+
+    title_index = TitleVersionIndex()
+    winners, deletes = select_latest(messages, title_index)
+
+    # A newer copy of an already published draft doesn't need rendering again
+    unchanged = 0
+    selected = []
+    for date, (source, raw) in winners:
+        msg = email.message_from_bytes(raw)
+        subject = decode_email_header(msg.get('Subject')).strip()
+        digest = message_digest(msg)
+        if title_index.is_unchanged(subject, digest):
+            title_index.record(subject, date, digest)
+            unchanged += 1
+        else:
+            selected.append((date, (source, raw), subject, digest))
+
+    print(f"Read {len(messages)} messages: {len(selected)} pages to render"
+          f"{f', {unchanged} unchanged' if unchanged else ''}"
+          f"{f', {deletes} delete commands skipped' if deletes else ''}")
+    if not selected:
+        title_index.save()
+        return True
+
+    workers = workers or config.BULK_IMPORT_WORKERS or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+        results = list(pool.map(render_message, [raw for _, (_, raw), _, _ in selected]))
+
+    pages = []
+    rendered = 0
+    for (date, (source, _), subject, digest), page in zip(selected, results):
+        if not page:
+            print(f"Failed to render: {source}")
+            continue
+        title_index.record(subject, date, digest)
+        rendered += 1
+        # A cache hit that still has its tile needs nothing at all
+        if not (page.get("cached") and has_research_tile(page["filename"])):
+            pages.append(page)
+    if rendered < len(selected) and not pages:
+        return False
+    if not pages:
+        title_index.save()
+        print(f"All {rendered} pages unchanged since their last render")
+        return True
+
+    # One index.html rewrite for all tiles (oldest first, so newest ends on top)
+    update_main_index_navigation()
+    if not add_research_tiles(pages):
+        return False
+    title_index.save()
+    render_cache = RenderCache()
+    store_rendered_pages(pages, render_cache)
+    print(f"Rendered {len(pages)} pages with {workers} workers")
+
+    if not commit or os.getenv('GITHUB_ACTIONS') == 'true':
+        print("Skipping git commit")
+        return rendered == len(selected)
+
+    paths = ['index.html'] + state_paths()
+    paths += [f"Pages/{page['filename']}" for page in pages]
+    for page in pages:
+        paths.extend(media_file.replace('../', '') for media_file in page["saved_files"])
+    commit_message = f"Bulk import {len(pages)} pages\n\nImported from {os.path.basename(os.path.abspath(path))}"
+    return commit_and_push_paths(paths, commit_message) and rendered == len(selected)
+
+
+def main():
+    """Main function for command line usage"""
+    parser = argparse.ArgumentParser(description="Import an email archive into the portfolio")
+    parser.add_argument('archive', help="directory of .eml files or an mbox file")
+    parser.add_argument('--workers', type=int, default=None, help="render processes (default: CPU count)")
+    parser.add_argument('--no-commit', action='store_true', help="leave the changes uncommitted")
+    args = parser.parse_args()
+
+    archive = os.path.abspath(args.archive)
+    if not os.path.exists(archive):
+        print(f"Error: Archive '{args.archive}' not found")
+        sys.exit(1)
+
+    # Index and git helpers use paths relative to the CMS directory
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    if bulk_import(archive, workers=args.workers, commit=not args.no_commit):
+        print("Success! Archive imported.")
+    else:
+        print("Import finished with errors.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Build-Time Code Highlighter for Portfolio Website
+Turns a fenced code block from an email into pre-classed HTML, so pages show
+highlighted code without shipping a highlighter to the browser.
+
+    ```python
+    def greet(name):
+        return f"Hello {name}"  # comment
+    ```
+
+becomes <pre><code class="language-python"> with every keyword, string,
+number, comment and function name wrapped in a <span class="tok-..."> that
+style.css colours. Each language is one regex over the block: strings and
+block comments that never close run to the end of the block, so the match
+always advances and highlighting stays linear in the size of the code.
+
+A highlighted block is cached under the SHA-256 of (highlighter source,
+language, code), in memory and as a file in config.CODE_CACHE_DIR, so
+re-rendering a page re-tokenizes only the blocks that changed.
+"""
+
+import os
+import re
+import html
+import hashlib
+import logging
+from pathlib import Path
+from typing import Dict, FrozenSet, Optional, Tuple
+
+try:
+    import config  # Local import when running from CMS directory
+except ModuleNotFoundError:
+    from . import config  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+# Editing this module invalidates every cached block
+HIGHLIGHTER_VERSION = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()[:16]
+
+# ```lang opens a block (lang optional), a bare ``` closes it
+FENCE = re.compile(r'^\s*```\s*([\w+#.-]*)\s*$')
+
+NUMBER = r'(?P<num>\b(?:0[xX][0-9a-fA-F_]+|\d[\d_]*(?:\.\d+)?(?:[eE][+-]?\d+)?)\b)'
+NAME = r'(?P<name>[A-Za-z_$][\w$]*)'
+QUOTED = r'"(?:[^"\\\n]|\\.)*"?|\'(?:[^\'\\\n]|\\.)*\'?'
+
+PYTHON_KEYWORDS = frozenset((
+    'False None True and as assert async await break class continue def del elif else except finally for '
+    'from global if import in is lambda nonlocal not or pass raise return try while with yield match case self'
+).split())
+JS_KEYWORDS = frozenset((
+    'async await break case catch class const continue debugger default delete do else export extends false '
+    'finally for function if import in instanceof let new null of return static super switch this throw true '
+    'try typeof undefined var void while with yield interface type enum implements public private protected'
+).split())
+C_KEYWORDS = frozenset((
+    'auto bool break case catch char class const continue default delete do double else enum extern false '
+    'final float for fn func go goto if impl import include int let long loop match mod mut namespace new '
+    'null nullptr package private protected public pub return self short signed sizeof static string struct '
+    'super switch template this throw trait true try typedef typename union unsigned use using var virtual '
+    'void volatile while'
+).split())
+SHELL_KEYWORDS = frozenset((
+    'if then else elif fi for in do done while until case esac function return export local echo cd exit'
+).split())
+
+# name -> (token regex, keywords)
+LANGUAGES: Dict[str, Tuple[re.Pattern, FrozenSet[str]]] = {
+    'python': (re.compile(
+        r'(?P<com>#[^\n]*)'
+        r'|(?P<str>[rRbBfFuU]{0,2}(?:"""(?:[^"\\]|\\.|"(?!""))*(?:"""|$)'
+        r"|'''(?:[^'\\]|\\.|'(?!''))*(?:'''|$)|" + QUOTED + r'))'
+        r'|' + NUMBER + r'|' + NAME, re.DOTALL), PYTHON_KEYWORDS),
+    'javascript': (re.compile(
+        r'(?P<com>//[^\n]*|/\*(?:[^*]|\*(?!/))*(?:\*/|$))'
+        r'|(?P<str>`(?:[^`\\]|\\.)*`?|' + QUOTED + r')'
+        r'|' + NUMBER + r'|' + NAME, re.DOTALL), JS_KEYWORDS),
+    'c': (re.compile(
+        r'(?P<com>//[^\n]*|/\*(?:[^*]|\*(?!/))*(?:\*/|$)|^[ \t]*#[^\n]*)'
+        r'|(?P<str>' + QUOTED + r')'
+        r'|' + NUMBER + r'|' + NAME, re.DOTALL | re.MULTILINE), C_KEYWORDS),
+    'shell': (re.compile(
+        r'(?P<com>(?<![\w$])#[^\n]*)'
+        r'|(?P<str>' + QUOTED + r')'
+        r'|' + NUMBER + r'|' + NAME, re.DOTALL), SHELL_KEYWORDS),
+    # Unknown or missing language: strings and numbers only
+    'text': (re.compile(r'(?P<str>' + QUOTED + r')|' + NUMBER + r'|' + NAME), frozenset()),
+}
+
+ALIASES = {
+    'py': 'python', 'python3': 'python',
+    'js': 'javascript', 'jsx': 'javascript', 'ts': 'javascript', 'tsx': 'javascript', 'typescript': 'javascript',
+    'json': 'javascript',
+    'c': 'c', 'h': 'c', 'cpp': 'c', 'c++': 'c', 'cc': 'c', 'hpp': 'c', 'java': 'c', 'cs': 'c', 'csharp': 'c',
+    'c#': 'c', 'go': 'c', 'rust': 'c', 'rs': 'c', 'kotlin': 'c', 'swift': 'c',
+    'sh': 'shell', 'bash': 'shell', 'shell': 'shell', 'zsh': 'shell', 'console': 'shell',
+}
+
+_memory: Dict[str, str] = {}
+
+
+def fence_language(line: str) -> Optional[str]:
+    """Language of a ``` fence line ('' when none is given), or None if `line` is not a fence"""
+    match = FENCE.match(line)
+    return match.group(1) if match else None
+
+
+def resolve_language(language: str) -> str:
+    """LANGUAGES key for a fence's language name"""
+    name = ALIASES.get(language.lower(), language.lower())
+    return name if name in LANGUAGES else 'text'
+
+
+def tokenize(code: str, language: str) -> str:
+    """`code` as escaped HTML with <span class="tok-..."> around each token"""
+    pattern, keywords = LANGUAGES[resolve_language(language)]
+    out = []
+    pos = 0
+    for match in pattern.finditer(code):
+        kind = match.lastgroup
+        token = match.group()
+        if kind == 'name':
+            if token in keywords:
+                kind = 'kw'
+            elif code.startswith('(', match.end()):
+                kind = 'fn'
+            else:
+                continue
+        out.append(html.escape(code[pos:match.start()], quote=False))
+        out.append(f'<span class="tok-{kind}">{html.escape(token, quote=False)}</span>')
+        pos = match.end()
+    out.append(html.escape(code[pos:], quote=False))
+    return ''.join(out)
+
+
+def block_key(code: str, language: str) -> str:
+    return hashlib.sha256(f"{HIGHLIGHTER_VERSION}\0{language}\0{code}".encode('utf-8')).hexdigest()
+
+
+def highlight(code: str, language: str = '') -> str:
+    """The HTML for one fenced block (trailing blank lines dropped); cached by content hash"""
+    code = code.rstrip('\n')
+    key = block_key(code, language)
+    if key in _memory:
+        return _memory[key]
+
+    cache_path = os.path.join(config.CODE_CACHE_DIR, f"{key}.html")
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            block = f.read()
+    except OSError:
+        css_class = f' class="language-{html.escape(language)}"' if language else ''
+        block = f'<div class="code-container"><pre><code{css_class}>{tokenize(code, language)}</code></pre></div>'
+        try:
+            os.makedirs(config.CODE_CACHE_DIR, exist_ok=True)
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(block)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.warning(f"Could not cache highlighted code block: {e}")
+
+    _memory[key] = block
+    return block
@@ -19,6 +19,14 @@ def _env_path(name: str, default: Path) -> str:
     return os.getenv(name, str(default))
 
 
+def _env_bool(name: str, default: bool) -> bool:
+    """Return environment variable `name` as a boolean (1/true/yes/on)."""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
 # -----------------------------------------------------------------------------
 # Base directories
 # -----------------------------------------------------------------------------
@@ -61,4 +69,132 @@ SUPPORTED_IMAGE_EXTENSIONS = [
     ".svg",
 ]
 SUPPORTED_VIDEO_EXTENSIONS = [".mp4", ".mov", ".avi", ".webm"]
-SUPPORTED_AUDIO_EXTENSIONS = [".mp3", ".wav", ".ogg"] 
\ No newline at end of file
+SUPPORTED_AUDIO_EXTENSIONS = [".mp3", ".wav", ".ogg"] 
+
+# -----------------------------------------------------------------------------
+# Local ingestion endpoint (ingest_server.py)
+# -----------------------------------------------------------------------------
+INGEST_HOST = os.getenv("INGEST_HOST", "127.0.0.1")
+INGEST_PORT: int = int(os.getenv("INGEST_PORT", 8025))
+INGEST_MAX_BYTES: int = int(os.getenv("INGEST_MAX_BYTES", 40 * 1024 * 1024))
+# Messages accepted but not yet published; a full queue pushes back on senders
+INGEST_QUEUE_SIZE: int = int(os.getenv("INGEST_QUEUE_SIZE", 64))
+# Seconds a POST waits for queue space before being answered 503
+INGEST_ENQUEUE_TIMEOUT: float = float(os.getenv("INGEST_ENQUEUE_TIMEOUT", 5))
+# Parallel MIME parsers; publishing (index.html + git) is always serialized
+INGEST_WORKERS: int = int(os.getenv("INGEST_WORKERS", 4))
+
+# -----------------------------------------------------------------------------
+# Bulk archive import (bulk_import.py)
+# -----------------------------------------------------------------------------
+# Render processes; 0 means one per CPU
+BULK_IMPORT_WORKERS: int = int(os.getenv("BULK_IMPORT_WORKERS", 0))
+
+# -----------------------------------------------------------------------------
+# Durable staged job queue (job_queue.py)
+# -----------------------------------------------------------------------------
+JOB_QUEUE_PATH = _env_path("JOB_QUEUE_PATH", Path(__file__).resolve().parent / "jobs.sqlite3")
+JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", 5))
+# A running job whose worker died becomes claimable again after this long
+JOB_LEASE_SECONDS: int = int(os.getenv("JOB_LEASE_SECONDS", 600))
+# Default workers per stage; index and publish are single-writer by design
+JOB_STAGE_CONCURRENCY = {
+    "render": int(os.getenv("JOB_RENDER_CONCURRENCY", os.cpu_count() or 1)),
+    "index": 1,
+    "publish": 1,
+}
+
+# -----------------------------------------------------------------------------
+# Email run loop (github_actions_email_processor.py / async_email_processor.py)
+# -----------------------------------------------------------------------------
+# Overlap IMAP round trips with rendering; set to 0 for the sequential runner
+ASYNC_EMAIL_RUNNER: bool = _env_bool("ASYNC_EMAIL_RUNNER", True)
+ASYNC_RENDER_WORKERS: int = int(os.getenv("ASYNC_RENDER_WORKERS", 4))
+
+# -----------------------------------------------------------------------------
+# Title version index (title_index.py)
+# -----------------------------------------------------------------------------
+# Newest published email per page; committed so every run sees it
+TITLE_INDEX_PATH = _env_path("TITLE_INDEX_PATH", Path(__file__).resolve().parent / "title_versions.json")
+
+# -----------------------------------------------------------------------------
+# Render cache (render_cache.py)
+# -----------------------------------------------------------------------------
+# Content hash of every page's last build; an unchanged page skips its rebuild
+RENDER_CACHE_PATH = _env_path("RENDER_CACHE_PATH", Path(__file__).resolve().parent / "render_cache.json")
+# The parsed email of every page goes next to it in render_sources.json, for
+# verify_pages.py; it holds whole pages, so it stays local (.gitignore)
+
+# -----------------------------------------------------------------------------
+# Template bytecode cache (template_engine.py)
+# -----------------------------------------------------------------------------
+# Compiled Jinja templates, reused across processes; entries are checked
+# against the template source, and `python template_engine.py` warms it
+TEMPLATE_CACHE_DIR = _env_path("TEMPLATE_CACHE_DIR", Path(__file__).resolve().parent / ".template_cache")
+
+# -----------------------------------------------------------------------------
+# Markdown engine (markdown_engines.py)
+# -----------------------------------------------------------------------------
+# Which backend turns email content into page HTML: "tags" (single-pass tag
+# renderer), "python-markdown" or "legacy"; compare them with benchmark_engines.py
+MARKDOWN_ENGINE = os.getenv("MARKDOWN_ENGINE", "tags")
+
+# Fenced code blocks highlighted at build time (code_highlight.py), one file per
+# block hash so an unchanged block is never tokenized twice
+CODE_CACHE_DIR = _env_path("CODE_CACHE_DIR", Path(__file__).resolve().parent / ".code_cache")
+
+# -----------------------------------------------------------------------------
+# HTML minification (html_minify.py)
+# -----------------------------------------------------------------------------
+# Collapse whitespace and drop comments in every generated page (Pages/);
+# the hand-maintained index.html is always written verbatim
+MINIFY_HTML: bool = _env_bool("MINIFY_HTML", True)
+
+# -----------------------------------------------------------------------------
+# Responsive images (image_variants.py)
+# -----------------------------------------------------------------------------
+# Attached photos get WebP/JPEG copies at these widths and pages offer them
+# through <picture>/srcset; set to 0 to embed the original with a bare <img>
+IMAGE_VARIANTS: bool = _env_bool("IMAGE_VARIANTS", True)
+IMAGE_VARIANT_WIDTHS = [int(width) for width in os.getenv("IMAGE_VARIANT_WIDTHS", "480,960,1600").split(",")]
+IMAGE_QUALITY: int = int(os.getenv("IMAGE_QUALITY", 80))
+# Encoder processes; 0 means one per CPU
+IMAGE_WORKERS: int = int(os.getenv("IMAGE_WORKERS", 0))
+# Threads that save and transform one email's attachments; 0 means one per
+# CPU (each holds a decoded photo, so cap it on small machines)
+MEDIA_WORKERS: int = int(os.getenv("MEDIA_WORKERS", 0))
+
+# Home page tiles show a crop of this size (and one at 2x) instead of the
+# full image; `python tile_thumbnails.py` backfills tiles already in index.html
+TILE_THUMBNAILS: bool = _env_bool("TILE_THUMBNAILS", True)
+TILE_THUMBNAIL_SIZE = tuple(int(side) for side in os.getenv("TILE_THUMBNAIL_SIZE", "400x250").split("x"))
+# The first tiles (the newest, about one row) load with the page; the rest
+# wait until they are scrolled to
+EAGER_TILES: int = int(os.getenv("EAGER_TILES", 3))
+
+# -----------------------------------------------------------------------------
+# Media metadata index (media_index.py)
+# -----------------------------------------------------------------------------
+# Size and placeholder of every media file, keyed by content hash; committed
+# so no run probes a file twice
+MEDIA_INDEX_PATH = _env_path("MEDIA_INDEX_PATH", Path(__file__).resolve().parent / "media_index.json")
+
+# Attachments are stored as images/<content hash>.<ext> (media_store.py); this
+# maps the images/<title prefix>_<filename> name each was sent as to its file
+MEDIA_MANIFEST_PATH = _env_path("MEDIA_MANIFEST_PATH", Path(__file__).resolve().parent / "media_manifest.json")
+
+# Opt-in: a new JPEG photo whose perceptual hash is within this many bits (of
+# 64) of a stored JPEG with exactly the same dimensions reuses that photo
+# instead. Off by default - a corrected re-send (a screenshot with one line
+# changed) is only a few bits away and would publish the stale image
+REUSE_NEAR_DUPLICATES: bool = _env_bool("REUSE_NEAR_DUPLICATES", False)
+NEAR_DUPLICATE_DISTANCE: int = int(os.getenv("NEAR_DUPLICATE_DISTANCE", 2))
+
+# MP4/QuickTime attachments are stored with their moov box (the frame index)
+# in front of the frames, so playback starts after the first few kilobytes
+MP4_FASTSTART: bool = _env_bool("MP4_FASTSTART", True)
+
+# SVG attachments are stored without editor metadata, comments and script,
+# with coordinates rounded to this many decimals (svg_optimizer.py)
+SVG_OPTIMIZE: bool = _env_bool("SVG_OPTIMIZE", True)
+SVG_PRECISION: int = int(os.getenv("SVG_PRECISION", 3))
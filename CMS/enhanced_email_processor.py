@@ -8,147 +8,103 @@ import re
 import os
 import sys
 import html
-import subprocess
-import email
-import mimetypes
-import base64
-from datetime import datetime
-from typing import Dict, Any, List
+from datetime import date
+from typing import Dict, Any, List, Optional
 
 # Import functions from the simple email processor
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from simple_email_processor import (
-    extract_attachments, save_attachment, parse_email_content,
-    extract_description, sanitize_filename, process_responsive_tags,
-    process_alignment_tags, markdown_to_html, get_existing_nav_links,
+    parse_email_content, extract_description, sanitize_filename, get_existing_nav_links,
     process_inline_media, update_main_index_navigation, commit_and_push_changes,
-    is_delete_command, delete_page_and_tile, commit_delete_changes,
-    DESCRIPTION_PATTERN  # Import the updated description pattern
+    is_delete_command, delete_page_and_tile, commit_delete_changes, find_tile_image,
+    has_research_tile, store_rendered_pages, page_source, remove_tile_markup, write_page, save_attachments,
+    write_index, report_minified, MinifiedStream
 )
+from render_cache import RenderCache, render_key, first_published
+from text_scan import sub_bracket_paren, strip_tags
+from markdown_engines import get_engine as markdown_engine
+from tag_renderer import embeds_youtube
+from tile_thumbnails import tile_img_html, thumbnail_files, mark_lazy_tiles
+from template_engine import stream as stream_template
 
-def create_enhanced_html_page(title: str, content: str, filename: str, attachments: List[Dict] = None, description_override: str = "") -> tuple:
-    """Enhanced HTML page creation with better error handling and cloud optimization"""
-    try:
-        # Process attachments and embed them inline in content
-        processed_content, saved_files = process_inline_media(content, attachments or [], title)
-        
-        print(f"DEBUG: Processed {len(attachments or [])} attachments, saved {len(saved_files)} files")
-        
-        # Convert content to HTML (this will process the embedded media HTML)
-        content_html = markdown_to_html(processed_content)
-        
-        # Get navigation links
-        nav_links = get_existing_nav_links()
-        
-        # Determine the best image for social media (first image from saved files or default)
-        page_image = "images/python.jpg"  # Default fallback
-        if saved_files:
-            # Use the first saved image file
-            for file_path in saved_files:
-                if any(file_path.lower().endswith(ext) for ext in ['.jpg', '.jpeg', '.png', '.webp', '.gif']):
-                    page_image = file_path.replace('../', '')
-                    print(f"DEBUG: Setting page image to: {page_image}")
-                    break
-        
-        # Determine description (prefer override from original email)
-        if description_override:
-            description = description_override.strip()
-        else:
-            # Extract from content or generate fallback
-            description = extract_description(content)
-            if not description:
-                description = generate_description_from_content(content, title)
-                if not description:
-                    description = f"Learn about {title} in Cody's portfolio"
-            else:
-                description = re.sub(r'(?:__)?MEDIA_?PLACEHOLDER_?\d+__?', '', description, flags=re.IGNORECASE).strip()
-        
-        print(f"DEBUG: Description: '{description}'")
-        
-        # CSS for responsive device styling
-        responsive_css = """
-        /* Desktop-only content: visible on screens 769px and larger */
-        @media (min-width: 769px) {
-            .desktop-only {
-                display: block !important;
-            }
-            .mobile-only {
-                display: none !important;
-            }
-        }
-        
-        /* Mobile-only content: visible on screens 768px and smaller */
-        @media (max-width: 768px) {
-            .desktop-only {
-                display: none !important;
-            }
-            .mobile-only {
-                display: block !important;
-            }
-        }"""
-        
-        # Generate HTML with optimized structure
-        html_template = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{html.escape(title)}</title>
-    <meta name="description" content="{html.escape(description)}">
+try:
+    import config  # Local import when running from CMS directory
+except ModuleNotFoundError:
+    from . import config  # type: ignore
+
+def stream_enhanced_html_page(title: str, content: str, filename: str, attachments: List[Dict] = None, description_override: str = "",
+                              saved_paths: Optional[List[Optional[str]]] = None, created: Optional[date] = None) -> tuple:
+    """Render an enhanced page lazily without writing it, returns (chunks, saved_files, description)"""
+    created = created or first_published(filename)
+    
+    # Process attachments and embed them inline in content
+    processed_content, saved_files = process_inline_media(content, attachments or [], title, saved_paths)
     
-    <!-- Favicon -->
-    <link rel="icon" type="image/x-icon" href="../{page_image}">
-    <link rel="icon" type="image/png" sizes="32x32" href="../{page_image}">
-    <link rel="icon" type="image/png" sizes="16x16" href="../{page_image}">
-    <link rel="apple-touch-icon" href="../{page_image}">
+    print(f"DEBUG: Processed {len(attachments or [])} attachments, saved {len(saved_files)} files")
     
-    <!-- Open Graph / Facebook -->
-    <meta property="og:type" content="website">
-    <meta property="og:url" content="https://cyohn55.github.io/Portfolio/Pages/{filename}">
-    <meta property="og:title" content="{html.escape(title)}">
-    <meta property="og:description" content="{html.escape(description)}">
-    <meta property="og:image" content="https://cyohn55.github.io/Portfolio/{page_image}">
-    <meta property="og:site_name" content="Cody's Portfolio">
+    # Convert content to HTML lazily (this will process the embedded media HTML)
+    content_chunks = markdown_engine().stream(processed_content)
     
-    <!-- Twitter -->
-    <meta property="twitter:card" content="summary_large_image">
-    <meta property="twitter:url" content="https://cyohn55.github.io/Portfolio/Pages/{filename}">
-    <meta property="twitter:title" content="{html.escape(title)}">
-    <meta property="twitter:description" content="{html.escape(description)}">
-    <meta property="twitter:image" content="https://cyohn55.github.io/Portfolio/{page_image}">
+    # Get navigation links
+    nav_links = get_existing_nav_links()
     
-    <!-- Link to CSS -->
-    <link rel="stylesheet" href="../style.css">
+    # Determine the best image for social media (first image from saved files or default)
+    page_image = "images/python.jpg"  # Default fallback
+    if saved_files:
+        # Use the first saved image file
+        for file_path in saved_files:
+            if any(file_path.lower().endswith(ext) for ext in ['.jpg', '.jpeg', '.png', '.webp', '.gif']):
+                page_image = file_path.replace('../', '')
+                print(f"DEBUG: Setting page image to: {page_image}")
+                break
     
-    <!-- Responsive Device Styling -->
-    <style>{responsive_css}
-    </style>
-</head>
-<body>
-    <header>
-        <h2>Code(Yohn's) Portfolio</h2>
-        <nav>
-            <ul>
-{nav_links}
-            </ul>
-        </nav>
-    </header>
+    # Determine description (prefer override from original email)
+    if description_override:
+        description = description_override.strip()
+    else:
+        # Extract from content or generate fallback
+        description = extract_description(content)
+        if not description:
+            description = generate_description_from_content(content, title)
+            if not description:
+                description = f"Learn about {title} in Cody's portfolio"
+        else:
+            description = re.sub(r'(?:__)?MEDIA_?PLACEHOLDER_?\d+__?', '', description, flags=re.IGNORECASE).strip()
+    
+    print(f"DEBUG: Description: '{description}'")
+    
+    # Generate HTML through the shared (bytecode-cached) template path
+    chunks = stream_template(
+        'enhanced_page.html',
+        title=title,
+        description=description,
+        page_image=page_image,
+        filename=filename,
+        nav_links=nav_links,
+        content_chunks=content_chunks,
+        youtube_embeds=embeds_youtube(processed_content),
+        created_at=created.strftime('%B %d, %Y')
+    )
+    # Minify last, as the page streams out
+    if config.MINIFY_HTML:
+        chunks = MinifiedStream(chunks)
+    return chunks, saved_files, description
 
-    <div class="content">
-        <!-- Written Section -->
-        <div class="wrap-text-container">
-            <h1 class="article-title">{html.escape(title)}</h1>
-            {content_html}
-            <p><em>Created: {datetime.now().strftime('%B %d, %Y')}</em></p>
-        </div>
-    </div>
+def build_enhanced_html_page(title: str, content: str, filename: str, attachments: List[Dict] = None, description_override: str = "",
+                             saved_paths: Optional[List[Optional[str]]] = None, created: Optional[date] = None) -> tuple:
+    """Render an enhanced page without writing it, returns (html, saved_files, description)"""
+    chunks, saved_files, description = stream_enhanced_html_page(
+        title, content, filename, attachments, description_override, saved_paths, created
+    )
+    return ''.join(chunks), saved_files, description
 
-    <footer>
-        <p>&copy; 2025 Cody Yohn. All rights reserved.</p>
-    </footer>
-    <script src="../script.js"></script>
-</body>
-</html>"""
+def create_enhanced_html_page(title: str, content: str, filename: str, attachments: List[Dict] = None, description_override: str = "",
+                              saved_paths: Optional[List[Optional[str]]] = None, created: Optional[date] = None) -> tuple:
+    """Enhanced HTML page creation with better error handling and cloud optimization"""
+    try:
+        chunks, saved_files, description = stream_enhanced_html_page(
+            title, content, filename, attachments, description_override, saved_paths, created
+        )
         
         # Write to Pages directory
         pages_dir = "../Pages"
@@ -156,10 +112,10 @@ def create_enhanced_html_page(title: str, content: str, filename: str, attachmen
             os.makedirs(pages_dir)
         
         filepath = os.path.join(pages_dir, filename)
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(html_template)
+        write_page(filepath, chunks)
         
         print(f"SUCCESS: Successfully created: {filepath}")
+        report_minified(filepath, chunks)
         if saved_files:
             print(f"INFO: Saved {len(saved_files)} media files: {', '.join(os.path.basename(f) for f in saved_files)}")
         
@@ -174,8 +130,8 @@ def generate_description_from_content(content: str, title: str) -> str:
     try:
         # Remove markdown formatting and HTML tags
         clean_content = re.sub(r'[#*`_]', '', content)
-        clean_content = re.sub(r'<[^>]+>', '', clean_content)
-        clean_content = re.sub(r'\[.*?\]\(.*?\)', '', clean_content)  # Remove links
+        clean_content = strip_tags(clean_content)
+        clean_content = sub_bracket_paren(clean_content, '[', lambda *_: '')  # Remove links
         
         # Get first meaningful sentence
         sentences = re.split(r'[.!?]+', clean_content.strip())
@@ -239,7 +195,7 @@ def add_enhanced_research_tile(title: str, description: str, filename: str, tile
         
         # Prepare new tile HTML with proper indentation
         tile_html = f'''            <div class="project">
-                <img src="{tile_image}" alt="{html.escape(title)}">
+                {tile_img_html(tile_image, html.escape(title), lazy=False)}
                 <h3>{html.escape(title)}</h3>
                 <p>{html.escape(description)}</p>
                 <a href="Pages/{filename}">Read On...</a>
@@ -262,9 +218,8 @@ def add_enhanced_research_tile(title: str, description: str, filename: str, tile
             
             print(f"DEBUG: Inserting tile at position {end_of_div_tag}")
             
-            # Write updated content
-            with open(index_path, 'w', encoding='utf-8') as f:
-                f.write(updated_content)
+            # Write updated content; the tile pushed out of the first row now loads lazily
+            write_index(mark_lazy_tiles(updated_content), index_path)
                 
             print(f"SUCCESS: Successfully added research tile for: {title}")
             return True
@@ -280,6 +235,13 @@ def add_enhanced_research_tile(title: str, description: str, filename: str, tile
         traceback.print_exc()
         return False
 
+def collapse_blank_lines(match: re.Match) -> str:
+    """Whitespace run with 3+ newlines -> one blank line; same result as re.sub(r'\\n\\s*\\n\\s*\\n', '\\n\\n')"""
+    run = match.group(0)
+    if run.count('\n') < 3:
+        return run
+    return run[:run.index('\n')] + '\n\n' + run[run.rindex('\n') + 1:]
+
 def remove_research_tile(filename: str, title: str = None):
     """Remove a research tile from the homepage"""
     try:
@@ -290,17 +252,13 @@ def remove_research_tile(filename: str, title: str = None):
         with open(index_path, 'r', encoding='utf-8') as f:
             content = f.read()
         
-        # Pattern to match the entire tile div
-        tile_pattern = r'<div class="project">\s*<img[^>]*>\s*<h3>[^<]*</h3>\s*<p>[^<]*</p>\s*<a href="Pages/' + re.escape(filename) + r'"[^>]*>.*?</a>\s*</div>'
-        
-        # Remove the tile
-        updated_content = re.sub(tile_pattern, '', content, flags=re.DOTALL)
+        # Remove the tile (single pass over the index, see text_scan.find_tile)
+        updated_content, _ = remove_tile_markup(content, filename)
         
         # Clean up any extra whitespace
-        updated_content = re.sub(r'\n\s*\n\s*\n', '\n\n', updated_content)
+        updated_content = re.sub(r'\s+', collapse_blank_lines, updated_content)
         
-        with open(index_path, 'w', encoding='utf-8') as f:
-            f.write(updated_content)
+        write_index(mark_lazy_tiles(updated_content), index_path)
         
         print(f"INFO: Removed tile: {title or filename}")
         return True
@@ -309,6 +267,53 @@ def remove_research_tile(filename: str, title: str = None):
         print(f"ERROR: Error removing tile: {e}")
         return False
 
+def render_enhanced_page_from_parsed(parsed: Dict[str, Any], saved_paths: Optional[List[Optional[str]]] = None,
+                                     render_cache: Optional[RenderCache] = None) -> Optional[Dict[str, Any]]:
+    """Write the page and media for a parsed email, leaving index.html and git alone.
+
+    Returns the fields needed for the page's home page tile, or None on failure.
+    A render cache hit writes nothing and returns the cached fields (see
+    render_page_from_parsed).
+    """
+    filename = sanitize_filename(parsed["title"])
+    render_cache = render_cache or RenderCache()
+    key = render_key('enhanced', parsed)
+    cached = render_cache.lookup(filename, key)
+    if cached:
+        print(f"INFO: Unchanged since last render, leaving Pages/{filename} untouched")
+        return cached
+    created = first_published(filename, render_cache)
+    
+    # Create HTML page with attachments
+    if saved_paths is None:
+        saved_paths = save_attachments(parsed.get("attachments") or [], parsed["title"])
+    success, saved_files, description = create_enhanced_html_page(
+        parsed["title"],
+        parsed["content"],
+        filename,
+        parsed.get("attachments"),
+        parsed.get("description", ""),
+        saved_paths,
+        created
+    )
+    if not success:
+        return None
+    
+    # The tile's thumbnail is published along with the page's media
+    tile_image = find_tile_image(parsed, saved_files, saved_paths)
+    saved_files = saved_files + thumbnail_files(tile_image)
+    
+    return {
+        "title": parsed["title"],
+        "filename": filename,
+        "description": description,
+        "tile_image": tile_image,
+        "saved_files": saved_files,
+        "cache_key": key,
+        "created": created.isoformat(),
+        "source": page_source('enhanced', parsed, saved_paths),
+    }
+
 def process_enhanced_email_to_page(email_content: str) -> bool:
     """Process email content into a web page with enhanced error handling"""
     try:
@@ -352,85 +357,22 @@ def process_enhanced_email_to_page(email_content: str) -> bool:
                 return False
         
         # Regular page creation logic
-        # Generate filename
-        filename = sanitize_filename(parsed["title"])
+        page = render_enhanced_page_from_parsed(parsed)
         
-        # Create HTML page with attachments
-        success, saved_files, description = create_enhanced_html_page(
-            parsed["title"],
-            parsed["content"],
-            filename,
-            parsed.get("attachments"),
-            parsed.get("description", "")
-        )
+        if page and page.get("cached") and has_research_tile(page["filename"]):
+            print(f"SUCCESS: Page '{parsed['title']}' is unchanged; nothing to publish")
+            return True
         
-        if success:
+        if page:
+            filename = page["filename"]
+            saved_files = page["saved_files"]
+            store_rendered_pages([page])
+            
             # Update navigation
             update_main_index_navigation()
             
-            # Find the first image to use for the tile
-            tile_image = None
-            ordered_content = parsed.get("ordered_content", [])
-            attachments = parsed.get("attachments", [])
-            
-            print(f"DEBUG: Found {len(ordered_content)} ordered content items")
-            print(f"DEBUG: Found {len(attachments)} attachments")
-            
-            # Look through ordered content to find the first image
-            for item in ordered_content:
-                if item.get('type') == 'media':
-                    attachment_index = item.get('attachment_index')
-                    if attachment_index is not None and attachment_index < len(attachments):
-                        attachment = attachments[attachment_index]
-                        print(f"DEBUG: Checking attachment {attachment_index}: {attachment.get('filename')} - {attachment.get('content_type')}")
-                        
-                        if attachment.get('content_type', '').startswith('image/'):
-                            # Found the first image in body order - get its saved path
-                            page_prefix = re.sub(r'[^a-zA-Z0-9]', '_', parsed["title"].lower())[:20]
-                            # Sanitize attachment filename the same way save_attachment does
-                            sanitized_attachment_filename = re.sub(r'[^a-zA-Z0-9._-]', '_', attachment['filename'])
-                            expected_filename = f"{page_prefix}_{sanitized_attachment_filename}"
-                            
-                            print(f"DEBUG: Found first image: {expected_filename}")
-                            
-                            # Check if file exists directly in the saved files
-                            for saved_file in saved_files:
-                                base_saved_file = os.path.basename(saved_file)
-                                print(f"DEBUG: Checking saved file: {base_saved_file}")
-                                
-                                if base_saved_file == expected_filename:
-                                    tile_image = saved_file.replace('../', '')
-                                    print(f"DEBUG: MATCH! Setting tile image to: {tile_image}")
-                                    break
-                            
-                            # If we didn't find an exact match, check for partial filename matches
-                            if not tile_image:
-                                for saved_file in saved_files:
-                                    base_saved_file = os.path.basename(saved_file)
-                                    # Check if sanitized filename is part of saved file
-                                    if sanitized_attachment_filename in base_saved_file:
-                                        tile_image = saved_file.replace('../', '')
-                                        print(f"DEBUG: Partial Match! Setting tile image to: {tile_image}")
-                                        break
-                            
-                            # If we still didn't find a match, use the expected path
-                            if not tile_image:
-                                tile_image = f"images/{expected_filename}"
-                                print(f"DEBUG: No match found, defaulting to expected path: {tile_image}")
-                                
-                            # Once we find the first image, we're done
-                            break
-                            
-            # If no image was found in the content order, look directly at saved media files for images
-            if not tile_image and saved_files:
-                for saved_file in saved_files:
-                    if any(saved_file.lower().endswith(ext) for ext in ['.jpg', '.jpeg', '.png', '.gif', '.webp']):
-                        tile_image = saved_file.replace('../', '')
-                        print(f"DEBUG: Using first saved image file: {tile_image}")
-                        break
-            
             # Add research tile to home page
-            add_enhanced_research_tile(parsed["title"], description, filename, tile_image)
+            add_enhanced_research_tile(parsed["title"], page["description"], filename, page["tile_image"])
             
             # Check if we're running in GitHub Actions
             is_github_actions = os.getenv('GITHUB_ACTIONS') == 'true'
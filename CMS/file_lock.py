@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Cross-Process File Lock for Portfolio Website
+The media index and the media manifest are JSON files that every render
+loads, merges its additions into and replaces. Renders run in threads of
+one process (async_email_processor.py) and in separate processes
+(bulk_import.py and job_queue.py), so that load/merge/replace is done
+holding locked(), or one writer would drop the entries of another.
+
+The lock is an flock on <file>.lock, taken by one thread of a process at a
+time. Without fcntl (Windows) only the threads of a process are serialized.
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore
+
+# flock is held per open file, not per thread, so threads queue here first
+_thread_locks: Dict[str, threading.Lock] = {}
+_guard = threading.Lock()
+
+
+@contextmanager
+def locked(path: str) -> Iterator[None]:
+    """Hold the lock for `path` across threads and processes"""
+    path = os.path.abspath(path)
+    with _guard:
+        thread_lock = _thread_locks.setdefault(path, threading.Lock())
+    with thread_lock:
+        if fcntl is None:
+            yield
+            return
+        with open(f"{path}.lock", 'a') as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
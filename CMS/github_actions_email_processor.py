@@ -13,11 +13,23 @@ import sys
 import json
 import logging
 from datetime import datetime, timedelta
+from email.message import Message
 from typing import Dict, List, Optional, Tuple, Any
-from email.header import decode_header
 import subprocess
 import re
 
+try:
+    import config  # Local import when running from CMS directory
+except ModuleNotFoundError:
+    from . import config  # type: ignore
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from simple_email_processor import sanitize_filename
+from title_index import TitleVersionIndex, parse_email_date, message_digest, decode_email_header
+
+# Headers a run needs to pick the newest email per page before any body is downloaded
+HEADER_FIELDS = '(BODY.PEEK[HEADER.FIELDS (SUBJECT FROM DATE)])'
+
 # Configure logging for GitHub Actions
 logging.basicConfig(
     level=logging.INFO,
@@ -26,6 +38,9 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 class GitHubActionsEmailProcessor:
+    # Spam is checked too: replies from new threads often land there
+    folders_to_check = ['inbox', '[Gmail]/Spam']
+
     def __init__(self):
         """Initialize with environment variables for GitHub Actions"""
         self.server = "imap.gmail.com"
@@ -40,6 +55,8 @@ class GitHubActionsEmailProcessor:
         script_dir = os.path.dirname(os.path.abspath(__file__))
         self.processed_emails_file = os.path.join(script_dir, 'processed_emails_cloud.json')
         self.processed_emails = self.load_processed_emails()
+        self.title_index = TitleVersionIndex()
+        self.selected_folder: Optional[str] = None
         
     def load_processed_emails(self) -> set:
         """Load list of already processed email IDs"""
@@ -86,16 +103,7 @@ class GitHubActionsEmailProcessor:
     
     def decode_email_header(self, header: str) -> str:
         """Decode email header safely"""
-        if not header:
-            return ""
-        try:
-            decoded = decode_header(header)[0]
-            if isinstance(decoded[0], bytes):
-                return decoded[0].decode(decoded[1] or 'utf-8')
-            return str(decoded[0])
-        except Exception as e:
-            logger.warning(f"Could not decode header: {e}")
-            return str(header)
+        return decode_email_header(header)
     
     def is_authorized_sender(self, sender: str) -> bool:
         """Check if sender is authorized to create pages"""
@@ -247,24 +255,110 @@ class GitHubActionsEmailProcessor:
         }
     
     def group_emails_by_title(self, emails: List[Tuple[str, Any, Dict]]) -> Dict[str, Tuple[str, Any, Dict]]:
-        """Group emails by title and return most recent for each title"""
-        title_groups = {}
+        """Group emails by title and return most recent for each title
+        
+        Titles that map to the same page file are grouped together, and pages whose
+        newest email is not newer than the published version (title index) are
+        dropped; their emails are marked as processed.
+        """
+        winners = self.title_index.select_latest(
+            (email_data['subject'].strip(), parse_email_date(email_data['date']), (email_id, raw_msg, email_data))
+            for email_id, raw_msg, email_data in emails
+        )
+        for email_id, _, email_data in emails:
+            if sanitize_filename(email_data['subject'].strip()) not in winners:
+                self.processed_emails.add(email_id)
+        
+        return {title: item for title, _, item in winners.values()}
+    
+    def record_published(self, raw_msg, email_data: Dict[str, str]):
+        """Remember the email a page was just published from"""
+        self.title_index.record(email_data['subject'].strip(), parse_email_date(email_data['date']),
+                                message_digest(raw_msg))
+    
+    def mark_page_processed(self, title: str, new_emails: List[Tuple[str, Any, Dict]]):
+        """Mark every email that renders to the same page as `title` as processed"""
+        filename = sanitize_filename(title)
+        for other_email_id, _, other_data in new_emails:
+            if sanitize_filename(other_data['subject'].strip()) == filename:
+                self.processed_emails.add(other_email_id)
+    
+    def select_folder(self, mail, folder: str) -> bool:
+        """Select `folder` unless it is selected already"""
+        if self.selected_folder == folder:
+            return True
+        status, _ = mail.select(folder)
+        self.selected_folder = folder if status == 'OK' else None
+        return status == 'OK'
+    
+    def scan_headers(self, mail, folder: str) -> List[Dict[str, Any]]:
+        """Classify a folder's new messages from their headers alone (one round trip for the folder)"""
+        if not self.select_folder(mail, folder):
+            logger.warning(f"Could not select folder: {folder}, skipping")
+            return []
+        logger.info(f"Checking folder: {folder}")
         
-        for email_id, raw_msg, email_data in emails:
-            title = email_data['subject'].strip()
+        # Search for recent emails from authorized sender
+        since_date = (datetime.now() - timedelta(hours=24)).strftime('%d-%b-%Y')
+        status, messages = mail.search(None, f'(FROM "{self.authorized_sender}" SINCE {since_date})')
+        if status != 'OK':
+            logger.error(f"Could not search emails in {folder}")
+            return []
+        
+        email_ids = [i for i in messages[0].split() if f"{folder}:{i.decode()}" not in self.processed_emails]
+        if not email_ids:
+            logger.info(f"No new emails from authorized sender in {folder}")
+            return []
+        
+        status, msg_data = mail.fetch(b','.join(email_ids).decode(), HEADER_FIELDS)
+        if status != 'OK':
+            logger.error(f"Could not fetch headers in {folder}")
+            return []
+        
+        candidates = []
+        for item in msg_data:
+            if not isinstance(item, tuple) or len(item) < 2:
+                continue
+            seq = item[0].split()[0].decode()
+            email_id_str = f"{folder}:{seq}"  # Add folder prefix to differentiate IDs
+            headers = email.message_from_bytes(item[1])
+            subject = self.decode_email_header(headers.get('Subject', ''))
+            sender = self.decode_email_header(headers.get('From', ''))
             
-            # Parse email date
-            try:
-                email_date = email.utils.parsedate_to_datetime(email_data['date'])
-            except:
-                email_date = datetime.now()
+            if not self.is_authorized_sender(sender):
+                logger.info(f"Skipping email from unauthorized sender: {sender}")
+                self.processed_emails.add(email_id_str)
+                continue
+            # Delete commands are recognized from the subject alone
+            delete_target = self.is_delete_command(subject, '')
+            if delete_target:
+                logger.info(f"Delete command detected for: {delete_target}")
+                # TODO: Implement delete functionality in enhanced_email_processor
+                self.processed_emails.add(email_id_str)
+                continue
             
-            # Keep the most recent email for each title
-            if title not in title_groups or email_date > title_groups[title][3]:
-                title_groups[title] = (email_id, raw_msg, email_data, email_date)
+            candidates.append({'id': email_id_str, 'folder': folder, 'seq': seq,
+                               'subject': subject, 'date': headers.get('Date', '')})
+        logger.info(f"Found {len(candidates)} candidate emails in {folder}")
+        return candidates
+    
+    def fetch_message(self, mail, candidate: Dict[str, Any]) -> Optional[Message]:
+        """Download a candidate's full message; one found in spam is copied to the inbox"""
+        if not self.select_folder(mail, candidate['folder']):
+            return None
+        status, msg_data = mail.fetch(candidate['seq'], '(RFC822)')
+        if status != 'OK' or not msg_data or not isinstance(msg_data[0], tuple):
+            logger.warning(f"Could not fetch {candidate['id']}")
+            return None
         
-        # Return without the date
-        return {title: data[:3] for title, data in title_groups.items()}
+        # If this is in spam folder, mark it as not spam
+        if candidate['folder'].lower().endswith('spam'):
+            try:
+                logger.info(f"Moving email from spam to inbox: {candidate['subject']}")
+                mail.copy(candidate['seq'], 'inbox')  # Copy to inbox
+            except Exception as e:
+                logger.warning(f"Failed to move email from spam: {e}")
+        return email.message_from_bytes(msg_data[0][1])
     
     def process_new_emails(self):
         """Main email processing function for GitHub Actions"""
@@ -274,135 +368,70 @@ class GitHubActionsEmailProcessor:
         if not mail:
             logger.error("Could not connect to email server")
             return
-        
-        new_emails = []
+        self.selected_folder = None
         
         try:
-            # Check both inbox and spam folders
-            folders_to_check = ['inbox', '[Gmail]/Spam']
-            
-            for folder in folders_to_check:
+            candidates = []
+            for folder in self.folders_to_check:
                 try:
-                    # Select folder
-                    status, messages = mail.select(folder)
-                    
-                    if status != 'OK':
-                        logger.warning(f"Could not select folder: {folder}, skipping")
-                        continue
-                    
-                    logger.info(f"Checking folder: {folder}")
-                    
-                    # Search for recent emails from authorized sender
-                    since_date = (datetime.now() - timedelta(hours=24)).strftime('%d-%b-%Y')
-                    search_criteria = f'(FROM "{self.authorized_sender}" SINCE {since_date})'
-                    
-                    status, messages = mail.search(None, search_criteria)
-                    
-                    if status != 'OK':
-                        logger.error(f"Could not search emails in {folder}")
-                        continue
-                    
-                    email_ids = messages[0].split()
-                    
-                    if not email_ids:
-                        logger.info(f"No recent emails found from authorized sender in {folder}")
-                        continue
-                    
-                    logger.info(f"Found {len(email_ids)} recent emails from {self.authorized_sender} in {folder}")
-                    
-                    # Process emails in this folder
-                    for email_id in email_ids:
-                        email_id_str = f"{folder}:{email_id.decode()}"  # Add folder prefix to differentiate IDs
-                        
-                        # Skip already processed emails
-                        if email_id_str in self.processed_emails:
-                            continue
-                        
-                        # Fetch email
-                        try:
-                            status, msg_data = mail.fetch(email_id, '(RFC822)')
-                            if status != 'OK' or not msg_data or not msg_data[0]:
-                                continue
-                            
-                            # Ensure we have the email data in the right format
-                            email_data_bytes = msg_data[0][1]
-                            if isinstance(email_data_bytes, bytes):
-                                raw_msg = email.message_from_bytes(email_data_bytes)
-                            else:
-                                logger.warning(f"Unexpected email data type: {type(email_data_bytes)}")
-                                continue
-                            email_data = self.extract_email_data(raw_msg)
-                            
-                            # Check if authorized
-                            if not self.is_authorized_sender(email_data['sender']):
-                                logger.info(f"Skipping email from unauthorized sender: {email_data['sender']}")
-                                self.processed_emails.add(email_id_str)
-                                continue
-                            
-                            # Check for delete commands first
-                            delete_target = self.is_delete_command(email_data['subject'], email_data['body'])
-                            if delete_target:
-                                logger.info(f"Delete command detected for: {delete_target}")
-                                # TODO: Implement delete functionality in enhanced_email_processor
-                                self.processed_emails.add(email_id_str)
-                                continue
-                            
-                            # Check if it's a page creation email
-                            if self.is_page_creation_email(email_data['subject'], email_data['body']):
-                                new_emails.append((email_id_str, raw_msg, email_data))
-                                logger.info(f"Found page creation email: {email_data['subject']} in {folder}")
-                                
-                                # If this is in spam folder, mark it as not spam
-                                if folder.lower().endswith('spam'):
-                                    try:
-                                        logger.info(f"Moving email from spam to inbox: {email_data['subject']}")
-                                        mail.copy(email_id, 'inbox')  # Copy to inbox
-                                    except Exception as e:
-                                        logger.warning(f"Failed to move email from spam: {e}")
-                            else:
-                                logger.info(f"Skipping non-page email: {email_data['subject']}")
-                                self.processed_emails.add(email_id_str)
-                                
-                        except Exception as e:
-                            logger.error(f"Error processing email {email_id_str}: {e}")
-                            continue
+                    candidates.extend(self.scan_headers(mail, folder))
                 except Exception as e:
                     logger.error(f"Error checking folder {folder}: {e}")
             
             processed_count = 0
             
-            if not new_emails:
+            if not candidates:
                 logger.info("No new page creation emails to process")
                 self.save_processed_emails()
                 return
             
-            # Group by title and process most recent per title
-            title_groups = self.group_emails_by_title(new_emails)
-            logger.info(f"Processing {len(title_groups)} unique titles from {len(new_emails)} emails")
-            
-            for title, (email_id_str, raw_msg, email_data) in title_groups.items():
-                logger.info(f"Processing: {title}")
-                
-                result = self.create_page_from_email(raw_msg)
+            # Only the newest email of each page is downloaded; when its body shows it
+            # is not a page email, the next newest of that title gets its turn
+            pending = candidates
+            while pending:
+                title_groups = self.group_emails_by_title([(c['id'], c, c) for c in pending])
+                logger.info(f"Processing {len(title_groups)} unique titles from {len(pending)} emails")
+                rejected = set()
                 
-                if result['success']:
-                    logger.info(f"✅ Successfully created/updated page: {title}")
-                    processed_count += 1
+                for title, (email_id_str, candidate, _) in sorted(title_groups.items(),
+                                                                  key=lambda kv: kv[1][1]['folder']):
+                    raw_msg = self.fetch_message(mail, candidate)
+                    if raw_msg is None:
+                        continue
+                    email_data = self.extract_email_data(raw_msg)
+                    if not self.is_page_creation_email(email_data['subject'], email_data['body']):
+                        logger.info(f"Skipping non-page email: {email_data['subject']}")
+                        self.processed_emails.add(email_id_str)
+                        rejected.add(sanitize_filename(title))
+                        continue
                     
-                    # Mark this email as processed
-                    self.processed_emails.add(email_id_str)
+                    logger.info(f"Processing: {title}")
                     
-                    # Mark all older emails with same title as processed
-                    for other_email_id, _, other_data in new_emails:
-                        if other_data['subject'].strip() == title and other_email_id != email_id_str:
-                            self.processed_emails.add(other_email_id)
-                            logger.info(f"Marked older email with same title as processed: {other_email_id}")
-                            
-                else:
-                    logger.error(f"❌ Failed to create page for '{title}': {result.get('error', 'Unknown error')}")
+                    if self.title_index.is_unchanged(title, message_digest(raw_msg)):
+                        logger.info(f"Content unchanged since last publish, skipping: {title}")
+                        self.record_published(raw_msg, candidate)
+                        self.mark_page_processed(title, [(c['id'], c, c) for c in candidates])
+                        continue
+                    
+                    result = self.create_page_from_email(raw_msg)
+                    
+                    if result['success']:
+                        logger.info(f"✅ Successfully created/updated page: {title}")
+                        processed_count += 1
+                        self.record_published(raw_msg, candidate)
+                        
+                        # Mark this email and all older emails for the same page as processed
+                        self.mark_page_processed(title, [(c['id'], c, c) for c in candidates])
+                                
+                    else:
+                        logger.error(f"❌ Failed to create page for '{title}': {result.get('error', 'Unknown error')}")
+                
+                pending = [c for c in pending if c['id'] not in self.processed_emails
+                           and sanitize_filename(c['subject'].strip()) in rejected]
             
             logger.info(f"Processing complete. Processed {processed_count} emails")
             self.save_processed_emails()
+            self.title_index.save()
             
         except Exception as e:
             logger.error(f"Error in email processing: {e}")
@@ -417,8 +446,15 @@ def main():
     """Main function for GitHub Actions"""
     try:
         logger.info("GitHub Actions Email Processor starting...")
-        processor = GitHubActionsEmailProcessor()
-        processor.process_new_emails()
+        if config.ASYNC_EMAIL_RUNNER:
+            # Overlapped fetch/render loop (set ASYNC_EMAIL_RUNNER=0 for the sequential one)
+            import asyncio
+            from async_email_processor import AsyncEmailProcessor
+            os.chdir(os.path.dirname(os.path.abspath(__file__)))
+            asyncio.run(AsyncEmailProcessor().process_new_emails_async())
+        else:
+            processor = GitHubActionsEmailProcessor()
+            processor.process_new_emails()
         logger.info("GitHub Actions Email Processor completed successfully")
     except Exception as e:
         logger.error(f"Fatal error in main: {e}")
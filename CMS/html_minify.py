@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+HTML Minifier for Portfolio Website
+The last stage of every generated page write: drops the indentation, blank
+lines and comments the templates carry, so each visitor downloads less.
+index.html is hand-maintained and written verbatim.
+
+- a whitespace run with a line break becomes one "\\n", any other run of two
+  or more spaces/tabs becomes one " " (whitespace is never removed outright:
+  between inline elements it is visible, and #typing-text is pre-line)
+- <pre>, <textarea> and <script> contents are copied untouched
+- comments are dropped, except conditional comments (<!--[if ...]>)
+
+The minifier is a single forward scan that works chunk by chunk, so it
+stays linear in the page size and streams behind the page builders without
+holding the page in memory. Only a short tail that might be the start of a
+tag, comment or whitespace run is carried from one chunk to the next.
+"""
+
+import re
+from typing import Iterable, Iterator, Optional
+
+# What the scan stops at outside raw elements
+MARKUP = re.compile(r'<!--|<(pre|textarea|script)\b|[ \t\n\r\f]{2,}|[\t\r\f]', re.IGNORECASE)
+
+# ASCII whitespace only: a non-breaking space is content
+SPACE_RUN = re.compile(r'[ \t\n\r\f]+')
+
+# End of each verbatim region
+CLOSERS = {
+    'comment': re.compile(r'-->'),
+    'pre': re.compile(r'</pre\s*>', re.IGNORECASE),
+    'textarea': re.compile(r'</textarea\s*>', re.IGNORECASE),
+    'script': re.compile(r'</script\s*>', re.IGNORECASE),
+}
+
+# Longer than any opener MARKUP looks for, and than any closer
+TAIL = 16
+
+
+class HtmlMinifier:
+    """Incremental minifier: feed() the chunks of one page in order, then close()"""
+
+    def __init__(self):
+        self.pending = ''
+        self.region: Optional[str] = None  # CLOSERS key while inside a comment or raw element
+        self.keep_region = True
+        self.bytes_saved = 0
+
+    def feed(self, chunk: str) -> str:
+        # str(): Jinja hands out Markup pieces, and Markup + text escapes the text
+        return self._scan(self.pending + str(chunk), final=False)
+
+    def close(self) -> str:
+        return self._scan(self.pending, final=True)
+
+    def _scan(self, text: str, final: bool) -> str:
+        out = []
+        pos = 0
+        end = len(text)
+        if not final:
+            # Hold back a trailing run of whitespace and a tag that may be cut off
+            lt = text.rfind('<', max(0, end - TAIL))
+            if lt != -1:
+                end = lt
+            while end > 0 and text[end - 1] in ' \t\n\r\f':
+                end -= 1
+
+        while True:
+            if self.region:
+                closer = CLOSERS[self.region].search(text, pos)
+                if closer is None:
+                    # Copy all but what could be the start of the closer
+                    stop = len(text) if final else max(pos, len(text) - TAIL)
+                    self._region_text(out, text[pos:stop])
+                    pos = stop
+                    break
+                self._region_text(out, text[pos:closer.end()])
+                pos = closer.end()
+                self.region = None
+                continue
+
+            match = MARKUP.search(text, pos, max(pos, end))
+            if match is None:
+                out.append(text[pos:max(pos, end)])
+                pos = max(pos, end)
+                break
+            out.append(text[pos:match.start()])
+            pos = match.start()
+            token = match.group()
+            if token == '<!--':
+                self.region = 'comment'
+                self.keep_region = text.startswith('<!--[', pos)
+            elif token[0] == '<':
+                self.region = match.group(1).lower()
+                self.keep_region = True
+            else:
+                out.append(self._collapse(token))
+                pos = match.end()
+
+        held = SPACE_RUN.match(text, pos) if self.region is None else None
+        if held:
+            # A held-back run is collapsed now, so a page of blank chunks can't pile up
+            self.pending = self._collapse(held.group()) + text[held.end():]
+        else:
+            self.pending = text[pos:]
+        return ''.join(out)
+
+    def _collapse(self, run: str) -> str:
+        collapsed = '\n' if '\n' in run else ' '
+        self.bytes_saved += len(run) - len(collapsed)
+        return collapsed
+
+    def _region_text(self, out: list, text: str):
+        if self.keep_region:
+            out.append(text)
+        else:
+            self.bytes_saved += len(text.encode('utf-8'))
+
+
+class MinifiedStream:
+    """`chunks` minified as they are consumed; bytes_saved is final once iteration ends"""
+
+    def __init__(self, chunks: Iterable[str]):
+        self.chunks = chunks
+        self.minifier = HtmlMinifier()
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.minifier.bytes_saved
+
+    def __iter__(self) -> Iterator[str]:
+        for chunk in self.chunks:
+            minified = self.minifier.feed(chunk)
+            if minified:
+                yield minified
+        tail = self.minifier.close()
+        if tail:
+            yield tail
+
+
+def minify_html(text: str) -> str:
+    """`text` minified in one go"""
+    minifier = HtmlMinifier()
+    return minifier.feed(text) + minifier.close()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Responsive Image Variants for Portfolio Website
+Turns an attached photo into the handful of files a browser actually needs,
+so a phone doesn't download a 3 MB original to draw a 400px-wide image.
+
+- clean_original(): what save_attachment writes - the photo turned upright
+  (EXIF orientation applied) with its EXIF block (camera, GPS) dropped
+- build_variants(): WebP and JPEG copies at each width in
+  config.IMAGE_VARIANT_WIDTHS narrower than the original (plus the original
+  width, capped at the widest step), in images/variants/
+- picture_html(): the <picture> element offering them through srcset/sizes
+
+Images with transparency get PNG instead of JPEG as the fallback format.
+GIF, SVG and animated images are left alone. Variant files are named after
+the SHA-256 of the original's bytes, so an image that is already on disk
+under that hash (a resend, or the same photo on another page) is never
+decoded again, and the ones that do need work are encoded in a process pool.
+"""
+
+import io
+import os
+import html
+import hashlib
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from PIL import Image, ImageOps
+
+from media_index import ORIENTATION_TAG, has_alpha, image_attributes
+
+try:
+    import config  # Local import when running from CMS directory
+except ModuleNotFoundError:
+    from . import config  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+# Bump when the encoding changes, so existing variants are not reused
+PIPELINE_VERSION = 1
+
+# Formats worth re-encoding; anything else keeps its bare <img>
+RASTER_FORMATS = ('JPEG', 'PNG', 'WEBP')
+
+# Content images are up to 80vw wide on desktop and full width on phones (style.css)
+SIZES = '(min-width: 769px) 80vw, 100vw'
+
+# Quality the cleaned original is re-saved at
+ORIGINAL_QUALITY = 95
+
+
+class Variants(NamedTuple):
+    """The variant files of one image"""
+    stem: str  # content hash every variant file name starts with
+    widths: Tuple[int, ...]
+    fallback: str  # 'jpg', or 'png' for images with transparency
+    width: int  # upright size of the original
+    height: int
+
+    def url(self, width: int, ext: str) -> str:
+        return f"../images/variants/{self.stem}-{width}.{ext}"
+
+    def files(self) -> List[str]:
+        """Site-relative paths of every variant file, as the page builders write them"""
+        return [self.url(width, ext) for width in self.widths for ext in ('webp', self.fallback)]
+
+
+def variants_dir() -> str:
+    return os.path.join(config.IMAGES_DIR, 'variants')
+
+
+def content_stem(path: str) -> str:
+    """Hash every file derived from `path` is named after (covers the encoder settings too)"""
+    with open(path, 'rb') as f:
+        digest = hashlib.file_digest(f, 'sha256')
+    digest.update(f"\0{PIPELINE_VERSION}\0{config.IMAGE_QUALITY}".encode('ascii'))
+    return digest.hexdigest()[:16]
+
+
+def clean_original(data: bytes) -> bytes:
+    """`data` turned upright and without EXIF; unchanged when it has no EXIF or isn't a still photo"""
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            if img.format not in RASTER_FORMATS or getattr(img, 'is_animated', False) or not img.getexif():
+                return data
+            image_format = img.format
+            icc_profile = img.info.get('icc_profile')
+            upright = ImageOps.exif_transpose(img)
+            out = io.BytesIO()
+            # Pillow only writes the EXIF it is handed, so none is written
+            upright.save(out, image_format, quality=ORIGINAL_QUALITY, icc_profile=icc_profile)
+            return out.getvalue()
+    except Exception as e:
+        logger.warning(f"Could not clean image metadata, keeping the original: {e}")
+        return data
+
+
+def plan_variants(path: str) -> Optional[Variants]:
+    """The variants `path` gets, read from its header only; None if it isn't a still raster image"""
+    with Image.open(path) as img:
+        if img.format not in RASTER_FORMATS or getattr(img, 'is_animated', False):
+            return None
+        width, height = img.size
+        if img.getexif().get(ORIENTATION_TAG) in (5, 6, 7, 8):
+            width, height = height, width
+        transparent = has_alpha(img)
+    steps = sorted(set(config.IMAGE_VARIANT_WIDTHS))
+    widths = [step for step in steps if step < width] + [min(width, steps[-1])]
+    return Variants(content_stem(path), tuple(sorted(set(widths))), 'png' if transparent else 'jpg',
+                    width, height)
+
+
+def write_variants(path: str, variants: Variants, quality: int) -> Variants:
+    """Encode every variant of `path` (runs in a worker process or thread)"""
+    os.makedirs(variants_dir(), exist_ok=True)
+    with Image.open(path) as img:
+        upright = ImageOps.exif_transpose(img)
+        upright = upright.convert('RGBA' if variants.fallback == 'png' else 'RGB')
+    for width in variants.widths:
+        height = max(1, round(variants.height * width / variants.width))
+        resized = upright if width == variants.width else upright.resize((width, height), Image.LANCZOS)
+        for ext in ('webp', variants.fallback):
+            target = os.path.join(variants_dir(), os.path.basename(variants.url(width, ext)))
+            tmp_path = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+            if ext == 'webp':
+                resized.save(tmp_path, 'WEBP', quality=quality, method=6)
+            elif ext == 'jpg':
+                resized.save(tmp_path, 'JPEG', quality=quality, optimize=True, progressive=True)
+            else:
+                resized.save(tmp_path, 'PNG', optimize=True)
+            # A variant only appears once it is whole, so its name alone means "cached"
+            os.replace(tmp_path, target)
+    return variants
+
+
+def is_cached(urls: List[str]) -> bool:
+    return all(os.path.exists(os.path.join(variants_dir(), os.path.basename(url))) for url in urls)
+
+
+def encode_all(tasks: List[Tuple[str, Callable, tuple]]) -> Dict[str, Any]:
+    """Run each (key, function, args) task, in a process pool when there is more than one
+
+    Maps each key to its function's result, or to the exception it raised.
+    """
+    workers = min(len(tasks), config.IMAGE_WORKERS or os.cpu_count() or 1)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [(key, pool.submit(function, *args)) for key, function, args in tasks]
+            return {key: future.exception() or future.result() for key, future in futures}
+    results = {}
+    for key, function, args in tasks:
+        try:
+            results[key] = function(*args)
+        except Exception as e:
+            results[key] = e
+    return results
+
+
+def build_variants(paths: List[str]) -> Dict[str, Variants]:
+    """Variants for each image in `paths` ('../images/x' style); images that can't have them are left out
+
+    Images whose variants are already on disk only have their header read;
+    the rest are encoded in parallel.
+    """
+    done: Dict[str, Variants] = {}
+    pending: List[Tuple[str, Callable, tuple]] = []
+    for path in paths:
+        source = os.path.join(config.IMAGES_DIR, os.path.basename(path))
+        try:
+            variants = plan_variants(source)
+        except Exception as e:
+            logger.warning(f"Could not read {path} for responsive variants: {e}")
+            continue
+        if variants is None:
+            continue
+        if is_cached(variants.files()):
+            done[path] = variants
+        else:
+            pending.append((path, write_variants, (source, variants, config.IMAGE_QUALITY)))
+
+    for path, result in encode_all(pending).items():
+        if isinstance(result, Exception):
+            logger.warning(f"Could not build responsive variants for {path}: {result}")
+        else:
+            done[path] = result
+    return done
+
+
+def picture_html(variants: Variants, alt: str, entry: Optional[Dict[str, Any]] = None, lazy: bool = False) -> str:
+    """<picture> offering `variants` as WebP with a JPEG/PNG fallback (`entry`: the media index entry)"""
+    def srcset(ext: str) -> str:
+        return ', '.join(f"{variants.url(width, ext)} {width}w" for width in variants.widths)
+
+    return (f'<picture><source type="image/webp" srcset="{srcset("webp")}" sizes="{SIZES}">'
+            f'<img src="{variants.url(variants.widths[-1], variants.fallback)}" srcset="{srcset(variants.fallback)}" '
+            f'sizes="{SIZES}" alt="{html.escape(alt)}"{image_attributes(entry, lazy)}></picture>')
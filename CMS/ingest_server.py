@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Local Ingestion Endpoint for Portfolio Website
+Accepts raw RFC 822 messages pushed by local mail infrastructure, so pages
+are published without waiting for the next IMAP poll.
+
+Usage:
+    python ingest_server.py            # HTTP server on INGEST_HOST:INGEST_PORT
+    python ingest_server.py --stdin    # MDA delivery hook, one message on stdin
+
+HTTP API:
+    POST /messages   body = raw message  -> 202 queued / 503 queue full
+    GET  /health                         -> queue depth and counters (JSON)
+
+Messages are parsed in a process pool (INGEST_WORKERS) and then published
+one at a time through simple_email_processor.process_parsed_email, the same
+pipeline used for `simple_email_processor.py <email_file>`.
+
+--stdin runs the job_queue.py stages in-line and exits with a sysexits.h
+status: 0 when published, 65 (EX_DATAERR) when the message can never be
+published, 75 (EX_TEMPFAIL) when a retry can succeed (file system or git
+push errors). A redelivered message finds its page already written and only
+retries the push.
+"""
+
+import os
+import sys
+import json
+import signal
+import asyncio
+import logging
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from simple_email_processor import parse_email_content, process_parsed_email, commit_and_push_paths
+from job_queue import run_render, run_index, publish_paths
+
+try:
+    import config  # Local import when running from CMS directory
+except ModuleNotFoundError:
+    from . import config  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+# sysexits.h: EX_DATAERR bounces the message, EX_TEMPFAIL tells the MTA to
+# keep it and retry delivery later
+EX_DATAERR = 65
+EX_TEMPFAIL = 75
+
+HTTP_REASONS = {
+    200: "OK",
+    202: "Accepted",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    411: "Length Required",
+    413: "Payload Too Large",
+    503: "Service Unavailable",
+}
+
+
+def decode_raw_message(raw: bytes) -> str:
+    """Decode raw message bytes the way parse_email_content expects them"""
+    return raw.decode('utf-8', errors='replace')
+
+
+def parse_raw_message(raw: bytes) -> Dict[str, Any]:
+    """Process-pool entry point: bytes in, parsed email dict out"""
+    return parse_email_content(decode_raw_message(raw))
+
+
+class IngestServer:
+    """Bounded-queue HTTP front end for the email-to-page pipeline"""
+
+    def __init__(self, host: str = config.INGEST_HOST, port: int = config.INGEST_PORT,
+                 queue_size: int = config.INGEST_QUEUE_SIZE, workers: int = config.INGEST_WORKERS,
+                 max_bytes: int = config.INGEST_MAX_BYTES,
+                 enqueue_timeout: float = config.INGEST_ENQUEUE_TIMEOUT):
+        self.host = host
+        self.port = port
+        self.workers = max(1, workers)
+        self.max_bytes = max_bytes
+        self.enqueue_timeout = enqueue_timeout
+        self.queue: "asyncio.Queue[Tuple[int, bytes]]" = asyncio.Queue(maxsize=max(1, queue_size))
+        self.ids = itertools.count(1)
+        self.stats = {"accepted": 0, "rejected": 0, "published": 0, "failed": 0}
+        self.publish_lock = asyncio.Lock()
+        self.parse_pool: Optional[ProcessPoolExecutor] = None
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    # ------------------------------------------------------------------
+    # Pipeline workers
+    # ------------------------------------------------------------------
+
+    async def worker(self):
+        """Parse queued messages in parallel, publish them one at a time"""
+        loop = asyncio.get_running_loop()
+        while True:
+            message_id, raw = await self.queue.get()
+            try:
+                parsed = await loop.run_in_executor(self.parse_pool, parse_raw_message, raw)
+                # index.html and the git index are shared state
+                async with self.publish_lock:
+                    success = await asyncio.to_thread(process_parsed_email, parsed)
+                self.stats["published" if success else "failed"] += 1
+                logger.info(f"Message #{message_id} ({parsed.get('title', '')!r}): "
+                            f"{'published' if success else 'FAILED'}")
+            except Exception as e:
+                self.stats["failed"] += 1
+                logger.error(f"Message #{message_id} failed: {e}")
+            finally:
+                self.queue.task_done()
+
+    # ------------------------------------------------------------------
+    # HTTP handling
+    # ------------------------------------------------------------------
+
+    async def read_request(self, reader: asyncio.StreamReader) -> Tuple[str, str, Dict[str, str]]:
+        """Read the request line and headers (body is left in the stream)"""
+        request_line = (await reader.readline()).decode('latin-1').strip()
+        method, _, rest = request_line.partition(' ')
+        path = rest.split(' ', 1)[0].split('?', 1)[0]
+
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode('latin-1')
+            if line in ('\r\n', '\n', ''):
+                break
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+        return method.upper(), path, headers
+
+    async def respond(self, writer: asyncio.StreamWriter, status: int, payload: Dict[str, Any],
+                      extra_headers: Optional[Dict[str, str]] = None):
+        body = json.dumps(payload).encode('utf-8')
+        head = [f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}",
+                "Content-Type: application/json",
+                f"Content-Length: {len(body)}",
+                "Connection: close"]
+        for name, value in (extra_headers or {}).items():
+            head.append(f"{name}: {value}")
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body)
+        await writer.drain()
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            method, path, headers = await self.read_request(reader)
+
+            if path == '/health':
+                await self.respond(writer, 200, {"queued": self.queue.qsize(),
+                                                 "capacity": self.queue.maxsize, **self.stats})
+                return
+            if path != '/messages':
+                await self.respond(writer, 404, {"error": f"unknown path {path}"})
+                return
+            if method != 'POST':
+                await self.respond(writer, 405, {"error": "POST a raw RFC 822 message"},
+                                   {"Allow": "POST"})
+                return
+
+            # Require an explicit length so oversized uploads are refused unread
+            try:
+                length = int(headers['content-length'])
+            except (KeyError, ValueError):
+                await self.respond(writer, 411, {"error": "Content-Length required"})
+                return
+            if length > self.max_bytes:
+                await self.respond(writer, 413, {"error": f"message exceeds {self.max_bytes} bytes"})
+                return
+            if length <= 0:
+                await self.respond(writer, 400, {"error": "empty message"})
+                return
+
+            raw = await reader.readexactly(length)
+            message_id = next(self.ids)
+            try:
+                await asyncio.wait_for(self.queue.put((message_id, raw)), self.enqueue_timeout)
+            except asyncio.TimeoutError:
+                self.stats["rejected"] += 1
+                await self.respond(writer, 503, {"error": "ingest queue full"},
+                                   {"Retry-After": str(max(1, int(self.enqueue_timeout)))})
+                return
+
+            self.stats["accepted"] += 1
+            await self.respond(writer, 202, {"id": message_id, "queued": self.queue.qsize()})
+
+        except (asyncio.IncompleteReadError, ConnectionError) as e:
+            logger.warning(f"Client disconnected mid-request: {e}")
+        except Exception as e:
+            logger.error(f"Error handling request: {e}")
+        finally:
+            writer.close()
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def serve(self):
+        """Run until SIGINT/SIGTERM, then drain the queue before exiting"""
+        self.parse_pool = ProcessPoolExecutor(max_workers=self.workers)
+        workers = [asyncio.create_task(self.worker()) for _ in range(self.workers)]
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        logger.info(f"Ingest server listening on http://{self.host}:{self.port}/messages "
+                    f"(queue={self.queue.maxsize}, workers={self.workers})")
+
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except (NotImplementedError, RuntimeError):
+                pass  # Windows: fall back to KeyboardInterrupt
+
+        try:
+            await stop.wait()
+        finally:
+            logger.info("Shutting down: no longer accepting, draining queue...")
+            self.server.close()
+            await self.server.wait_closed()
+            await self.queue.join()
+            for task in workers:
+                task.cancel()
+            self.parse_pool.shutdown()
+            logger.info(f"Ingest server stopped: {self.stats}")
+
+
+def process_stdin() -> int:
+    """Publish a single message piped in by an MDA; returns an exit status"""
+    raw = sys.stdin.buffer.read()
+    if not raw.strip():
+        print("ERROR: No message on stdin")
+        return EX_DATAERR
+
+    try:
+        result = run_render({'raw': raw})
+        run_index(result)
+    except OSError as e:
+        print(f"ERROR: Could not write the page, will retry: {e}")
+        return EX_TEMPFAIL
+    except Exception as e:
+        print(f"ERROR: Message cannot be published: {e}")
+        return EX_DATAERR
+
+    if os.getenv('GITHUB_ACTIONS') == 'true':
+        return 0  # The workflow commits and pushes for us
+    title = result.get('title') or result.get('identifier', '')
+    if not commit_and_push_paths(publish_paths(result), f"Publish page update: {title}\n\nAutomatically generated from email"):
+        return EX_TEMPFAIL
+    return 0
+
+
+def main():
+    """Main function for the ingestion endpoint"""
+    parser = argparse.ArgumentParser(description="Push raw emails into the portfolio pipeline")
+    parser.add_argument('--stdin', action='store_true', help="process one message from stdin and exit")
+    parser.add_argument('--host', default=config.INGEST_HOST)
+    parser.add_argument('--port', type=int, default=config.INGEST_PORT)
+    parser.add_argument('--workers', type=int, default=config.INGEST_WORKERS)
+    parser.add_argument('--queue-size', type=int, default=config.INGEST_QUEUE_SIZE)
+    args = parser.parse_args()
+
+    # Pipeline paths (../index.html, ../Pages) are relative to the CMS directory
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    if args.stdin:
+        sys.exit(process_stdin())
+
+    server = IngestServer(host=args.host, port=args.port, queue_size=args.queue_size, workers=args.workers)
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Durable Staged Job Queue for Portfolio Website
+SQLite-backed pipeline so a failure in one step never throws away the work
+done by the steps before it.
+
+Every fetched email becomes a job that moves through explicit stages:
+
+    render   parse the raw message, write the page and its media
+    index    update index.html (tile insert, or page + tile removal)
+    publish  git add/commit/push, batched across every ready job
+    done
+
+Each stage is idempotent and retried on its own: a slow or failing git push
+leaves jobs waiting in `publish` and never re-fetches or re-renders them.
+Claims are leased, so jobs held by a crashed worker become claimable again.
+
+Jobs are keyed by the page they write (the sanitized subject). Before render
+jobs are claimed, latest wins: a pending job with a newer email for the same
+page supersedes the older ones, which go straight to `done`. A render is
+never claimed while another render of its page holds a lease, so two render
+workers never write the same Pages/ file.
+
+A message is queued once per source and content: enqueueing an edited file
+at the same path queues it again.
+
+Usage:
+    python job_queue.py enqueue <email_file> [...]   # or --stdin
+    python job_queue.py work [render|index|publish|all] [--concurrency N]
+    python job_queue.py status
+    python job_queue.py retry [--stage STAGE]
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import sqlite3
+import argparse
+import threading
+from email.parser import BytesHeaderParser
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from simple_email_processor import (
+    parse_email_content, render_page_from_parsed, is_delete_command, sanitize_filename,
+    add_research_tile, update_main_index_navigation, delete_page_and_tile,
+    remove_research_tile, commit_and_push_paths, state_paths, has_research_tile, store_rendered_pages, PAGES_DIR
+)
+from title_index import decode_email_header, parse_email_date
+
+try:
+    import config  # Local import when running from CMS directory
+except ModuleNotFoundError:
+    from . import config  # type: ignore
+
+STAGES = ['render', 'index', 'publish']
+NEXT_STAGE = {'render': 'index', 'index': 'publish', 'publish': 'done'}
+
+# index.html is rewritten in place; never let two index workers interleave
+_index_lock = threading.Lock()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    source      TEXT NOT NULL UNIQUE,
+    raw         BLOB NOT NULL,
+    page        TEXT,
+    sent_at     REAL,
+    stage       TEXT NOT NULL DEFAULT 'render',
+    state       TEXT NOT NULL DEFAULT 'pending',
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    result      TEXT,
+    error       TEXT,
+    lease_until REAL,
+    created_at  REAL NOT NULL,
+    updated_at  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_stage_state ON jobs (stage, state);
+"""
+
+# Columns added since the first schema; older databases get them on open
+ADDED_COLUMNS = {'page': 'TEXT', 'sent_at': 'REAL'}
+
+# A pending render job some other live job for its page is newer than
+# (by email date, then by id)
+SUPERSEDED = """
+    jobs.stage = 'render' AND jobs.state = 'pending' AND jobs.page IS NOT NULL AND EXISTS (
+        SELECT 1 FROM jobs AS other WHERE other.page = jobs.page AND other.id != jobs.id
+        AND other.state != 'failed'
+        AND (COALESCE(other.sent_at, 0) > COALESCE(jobs.sent_at, 0)
+             OR (COALESCE(other.sent_at, 0) = COALESCE(jobs.sent_at, 0) AND other.id > jobs.id)))
+"""
+
+
+def page_key(raw: bytes) -> Tuple[Optional[str], Optional[float]]:
+    """(page filename, email date) of a raw message, from its headers"""
+    headers = BytesHeaderParser().parsebytes(raw)
+    subject = decode_email_header(headers.get('Subject')).strip()
+    date = parse_email_date(headers.get('Date'))
+    return (sanitize_filename(subject) if subject else None), (date.timestamp() if date else None)
+
+
+class JobQueue:
+    """Thin wrapper around the jobs table; one instance per thread/process"""
+
+    def __init__(self, path: str = config.JOB_QUEUE_PATH):
+        self.path = path
+        self.db = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+        columns = {row['name'] for row in self.db.execute("PRAGMA table_info(jobs)")}
+        for column, column_type in ADDED_COLUMNS.items():
+            if column not in columns:
+                self.db.execute(f"ALTER TABLE jobs ADD COLUMN {column} {column_type}")
+
+    def close(self):
+        self.db.close()
+
+    def enqueue(self, raw: bytes, source: str) -> Optional[int]:
+        """Store a fetched message; returns None if the same content was already queued from `source`"""
+        now = time.time()
+        page, sent_at = page_key(raw)
+        cursor = self.db.execute(
+            "INSERT OR IGNORE INTO jobs (source, raw, page, sent_at, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (f"{source}#{hashlib.sha256(raw).hexdigest()[:16]}", raw, page, sent_at, now, now))
+        return cursor.lastrowid if cursor.rowcount else None
+
+    def claim(self, stage: str, limit: int = 1) -> List[sqlite3.Row]:
+        """Lease up to `limit` pending (or abandoned) jobs at `stage`"""
+        now = time.time()
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            query = ("SELECT * FROM jobs WHERE stage = ? AND "
+                     "(state = 'pending' OR (state = 'running' AND lease_until < ?))")
+            if stage == 'render':
+                # Latest wins: older versions of a page are never rendered
+                self.db.execute(
+                    f"UPDATE jobs SET stage = 'done', result = ?, updated_at = ? WHERE {SUPERSEDED}",
+                    (json.dumps({"action": "superseded"}), now))
+                # One render per page at a time; they share its Pages/ file
+                query += (" AND (page IS NULL OR NOT EXISTS (SELECT 1 FROM jobs AS other WHERE "
+                          "other.page = jobs.page AND other.id != jobs.id AND other.stage = 'render' "
+                          "AND other.state = 'running' AND other.lease_until >= ?))")
+            rows = self.db.execute(query + " ORDER BY id LIMIT ?",
+                                   (stage, now, now, limit) if stage == 'render' else (stage, now, limit)).fetchall()
+            for row in rows:
+                self.db.execute(
+                    "UPDATE jobs SET state = 'running', attempts = attempts + 1, "
+                    "lease_until = ?, updated_at = ? WHERE id = ?",
+                    (now + config.JOB_LEASE_SECONDS, now, row['id']))
+            self.db.execute("COMMIT")
+            return rows
+        except Exception:
+            self.db.execute("ROLLBACK")
+            raise
+
+    def advance(self, job_id: int, stage: str, result: Optional[Dict[str, Any]] = None):
+        """Mark the current stage finished and queue the job for the next one"""
+        updates = "stage = ?, state = 'pending', attempts = 0, error = NULL, lease_until = NULL, updated_at = ?"
+        params: List[Any] = [NEXT_STAGE[stage], time.time()]
+        if result is not None:
+            updates += ", result = ?"
+            params.append(json.dumps(result))
+        self.db.execute(f"UPDATE jobs SET {updates} WHERE id = ?", (*params, job_id))
+
+    def fail(self, job_id: int, attempts: int, error: str):
+        """Record a failed attempt; the job stays at its stage for a retry"""
+        state = 'failed' if attempts >= config.JOB_MAX_ATTEMPTS else 'pending'
+        self.db.execute(
+            "UPDATE jobs SET state = ?, error = ?, lease_until = NULL, updated_at = ? WHERE id = ?",
+            (state, error, time.time(), job_id))
+
+    def retry_failed(self, stage: Optional[str] = None) -> int:
+        """Put failed jobs back to pending at the stage where they failed"""
+        query = "UPDATE jobs SET state = 'pending', attempts = 0, updated_at = ? WHERE state = 'failed'"
+        params: List[Any] = [time.time()]
+        if stage:
+            query += " AND stage = ?"
+            params.append(stage)
+        return self.db.execute(query, params).rowcount
+
+    def counts(self) -> Dict[Tuple[str, str], int]:
+        rows = self.db.execute("SELECT stage, state, COUNT(*) AS n FROM jobs GROUP BY stage, state")
+        return {(row['stage'], row['state']): row['n'] for row in rows}
+
+
+# =============================================================================
+# STAGE HANDLERS (each one safe to run again on the same job)
+# =============================================================================
+
+def run_render(job: sqlite3.Row) -> Dict[str, Any]:
+    """Parse the stored message and write its page and media files"""
+    parsed = parse_email_content(job['raw'].decode('utf-8', errors='replace'))
+
+    is_delete, page_identifier = is_delete_command(parsed["title"], parsed["content"])
+    if is_delete:
+        filename = page_identifier if page_identifier.endswith('.html') else sanitize_filename(page_identifier)
+        return {"action": "delete", "identifier": page_identifier, "filename": filename}
+
+    page = render_page_from_parsed(parsed)
+    if not page:
+        raise RuntimeError(f"Rendering failed for '{parsed['title']}'")
+    return {"action": "page", **page}
+
+
+def run_index(result: Dict[str, Any]):
+    """Apply the rendered result to index.html"""
+    with _index_lock:
+        if result["action"] == "delete":
+            if os.path.exists(os.path.join(PAGES_DIR, result["filename"])):
+                if not delete_page_and_tile(result["identifier"]):
+                    raise RuntimeError(f"Could not delete {result['filename']}")
+            else:
+                # Already deleted by an earlier attempt; make sure the tile is gone too
+                remove_research_tile(result["filename"])
+            return
+
+        # Render cache hit: the page is already published exactly as it would be rebuilt
+        if result.get("cached") and has_research_tile(result["filename"]):
+            return
+
+        update_main_index_navigation()
+        if not add_research_tile(result["title"], result["description"], result["filename"], result["tile_image"]):
+            raise RuntimeError(f"Could not add tile for {result['filename']}")
+        store_rendered_pages([result])
+
+
+def publish_paths(result: Dict[str, Any]) -> List[str]:
+    """Repository paths touched by a job"""
+    paths = [f"Pages/{result['filename']}", 'index.html'] + state_paths()
+    paths.extend(media_file.replace('../', '') for media_file in result.get("saved_files", []))
+    return paths
+
+
+def drain_stage(stage: str, path: str = config.JOB_QUEUE_PATH) -> int:
+    """Work through every claimable job at `stage`; returns jobs advanced"""
+    queue = JobQueue(path)
+    advanced = 0
+    try:
+        while True:
+            # Publishing batches every ready job into one commit
+            jobs = queue.claim(stage, limit=1000 if stage == 'publish' else 1)
+            if not jobs:
+                return advanced
+
+            if stage == 'publish':
+                results = [json.loads(job['result']) for job in jobs]
+                paths = sorted({p for result in results for p in publish_paths(result)})
+                if os.getenv('GITHUB_ACTIONS') == 'true':
+                    ok = True  # The workflow commits and pushes for us
+                else:
+                    titles = ', '.join(r.get('title') or r.get('identifier', '') for r in results)
+                    ok = commit_and_push_paths(paths, f"Publish {len(jobs)} page update(s): {titles}\n\n"
+                                                      f"Automatically generated from email")
+                for job in jobs:
+                    if ok:
+                        queue.advance(job['id'], stage)
+                        advanced += 1
+                    else:
+                        queue.fail(job['id'], job['attempts'] + 1, "git commit/push failed")
+                if not ok:
+                    return advanced
+                continue
+
+            job = jobs[0]
+            try:
+                if stage == 'render':
+                    queue.advance(job['id'], stage, run_render(job))
+                else:
+                    run_index(json.loads(job['result']))
+                    queue.advance(job['id'], stage)
+                advanced += 1
+            except Exception as e:
+                print(f"Job {job['id']} failed at {stage}: {e}")
+                queue.fail(job['id'], job['attempts'] + 1, str(e))
+    finally:
+        queue.close()
+
+
+def run_workers(stage: str, concurrency: int = 1, path: str = config.JOB_QUEUE_PATH) -> int:
+    """Drain `stage` with `concurrency` worker processes"""
+    if stage != 'render' and concurrency > 1:
+        # index.html and the git index are single-writer resources
+        print(f"Stage '{stage}' runs one worker at a time; ignoring concurrency={concurrency}")
+        concurrency = 1
+    if concurrency <= 1:
+        return drain_stage(stage, path)
+    with ProcessPoolExecutor(max_workers=concurrency) as pool:
+        return sum(pool.map(drain_stage, [stage] * concurrency, [path] * concurrency))
+
+
+def main():
+    """Main function for command line usage"""
+    parser = argparse.ArgumentParser(description="Durable staged email-to-page job queue")
+    parser.add_argument('--db', default=config.JOB_QUEUE_PATH, help="SQLite database path")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    enqueue = commands.add_parser('enqueue', help="queue raw email files")
+    enqueue.add_argument('files', nargs='*')
+    enqueue.add_argument('--stdin', action='store_true', help="read one message from stdin")
+
+    work = commands.add_parser('work', help="run workers for a stage")
+    work.add_argument('stage', nargs='?', default='all', choices=STAGES + ['all'])
+    work.add_argument('--concurrency', type=int, default=None)
+
+    commands.add_parser('status', help="show job counts per stage")
+
+    retry = commands.add_parser('retry', help="reset failed jobs to pending")
+    retry.add_argument('--stage', choices=STAGES)
+
+    args = parser.parse_args()
+    db_path = os.path.abspath(args.db)
+
+    # Index and git helpers use paths relative to the CMS directory
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    queue = JobQueue(db_path)
+
+    if args.command == 'enqueue':
+        sources = [(f"stdin:{time.time_ns()}", sys.stdin.buffer.read())] if args.stdin else []
+        for file_path in args.files:
+            with open(file_path, 'rb') as f:
+                sources.append((os.path.abspath(file_path), f.read()))
+        for source, raw in sources:
+            job_id = queue.enqueue(raw, source)
+            print(f"Queued job {job_id}: {source}" if job_id else f"Already queued: {source}")
+
+    elif args.command == 'work':
+        queue.close()
+        stages = STAGES if args.stage == 'all' else [args.stage]
+        for stage in stages:
+            concurrency = args.concurrency or config.JOB_STAGE_CONCURRENCY.get(stage, 1)
+            print(f"{stage}: advanced {run_workers(stage, concurrency, db_path)} job(s)")
+        queue = JobQueue(db_path)
+
+    elif args.command == 'retry':
+        print(f"Reset {queue.retry_failed(args.stage)} failed job(s)")
+
+    counts = queue.counts()
+    for stage in STAGES + ['done']:
+        summary = ', '.join(f"{state}={n}" for (s, state), n in sorted(counts.items()) if s == stage)
+        print(f"  {stage:<8} {summary or '-'}")
+    queue.close()
+
+
+if __name__ == "__main__":
+    main()
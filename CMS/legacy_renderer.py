@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Legacy Markdown Renderer for Portfolio Website
+The original multi-pass markdown_to_html, kept as a reference.
+
+Pages are now rendered by tag_renderer.py. The parity test and
+benchmark_renderer.py compare the new renderer against this one. Its parsing
+is left as it was, but it is not frozen: when the output of tag_renderer.py
+changes on purpose (layout classes, carousels, media markup), this module
+changes with it, mostly by calling the same helpers, so the two keep
+producing the same pages.
+"""
+
+import re
+import html
+
+from simple_email_processor import (
+    process_responsive_tags, process_alignment_tags,
+    MARKDOWN_BOLD_PATTERN, MARKDOWN_ITALIC_PATTERN, MARKDOWN_IMAGE_PATTERN,
+    MARKDOWN_LINK_PATTERN, VIDEO_PATTERN, YOUTUBE_PATTERN
+)
+from tag_renderer import opens_alignment_div, carousel_html, YOUTUBE_HTML
+
+
+def markdown_to_html(content: str) -> str:
+    """Convert basic markdown to HTML with media support"""
+    # Don't escape HTML if it contains pre-embedded media tags
+    if '<img ' in content or '<video ' in content:
+        # Content already has HTML, process carefully
+        pass
+    else:
+        # Escape HTML for safety
+        content = html.escape(content)
+    
+    # Process responsive device tags FIRST (before alignment and markdown headers)
+    content = process_responsive_tags(content)
+    
+    # Process custom alignment tags SECOND (before markdown headers)
+    # This allows alignment tags to handle their own markdown
+    content = process_alignment_tags(content)
+    
+    # Convert markdown headers (but skip headers that are already inside alignment divs)
+    lines = content.split('\n')
+    processed_lines = []
+    first_h1_found = False
+    inside_alignment_div = False
+    
+    for line in lines:
+        # Check if we're inside an alignment div
+        if opens_alignment_div(line):
+            inside_alignment_div = True
+            processed_lines.append(line)
+            continue
+        elif line.strip() == '</div>' and inside_alignment_div:
+            inside_alignment_div = False
+            processed_lines.append(line)
+            continue
+        elif inside_alignment_div:
+            # Skip markdown processing for lines inside alignment divs
+            processed_lines.append(line)
+            continue
+        
+        # Process markdown headers only if not inside alignment divs
+        line_stripped = line.strip()
+        if line_stripped.startswith('### '):
+            processed_lines.append('<h3>' + line_stripped[4:] + '</h3>')
+        elif line_stripped.startswith('## '):
+            processed_lines.append('<h2>' + line_stripped[3:] + '</h2>')
+        elif line_stripped.startswith('# ') and not first_h1_found:
+            # Skip the first H1 to avoid duplication with page title
+            first_h1_found = True
+            continue
+        elif line_stripped.startswith('# '):
+            # Convert subsequent H1s to H2s for better hierarchy
+            processed_lines.append('<h2>' + line_stripped[2:] + '</h2>')
+        else:
+            processed_lines.append(line)
+    
+    content = '\n'.join(processed_lines)
+    
+    # Convert markdown formatting using pre-compiled patterns for better performance
+    content = MARKDOWN_BOLD_PATTERN.sub(r'<strong>\1</strong>', content)
+    content = MARKDOWN_ITALIC_PATTERN.sub(r'<em>\1</em>', content)
+    
+    # Convert markdown images: ![alt text](url)
+    content = MARKDOWN_IMAGE_PATTERN.sub(r'<img src="\2" alt="\1" class="email-image">', content)
+    
+    # Convert markdown links: [text](url)
+    content = MARKDOWN_LINK_PATTERN.sub(r'<a href="\2" target="_blank">\1</a>', content)
+    
+    # Convert video tags: [VIDEO](url)
+    content = VIDEO_PATTERN.sub(r'<video controls class="email-video" preload="metadata"><source src="\1" type="video/mp4"><p>Your browser doesn\'t support HTML video. <a href="\1">Download the video</a> instead.</p></video>', content)
+    
+    # Convert YouTube links: [YOUTUBE](video_id or full_url)
+    def youtube_replacer(match):
+        url = match.group(1)
+        # Extract video ID from various YouTube URL formats
+        if 'youtube.com/watch?v=' in url:
+            video_id = url.split('v=')[1].split('&')[0]
+        elif 'youtu.be/' in url:
+            video_id = url.split('youtu.be/')[1].split('?')[0]
+        elif len(url) == 11:  # Direct video ID
+            video_id = url
+        else:
+            video_id = url
+        
+        # Facade markup is shared with the tag renderer
+        return YOUTUBE_HTML.format(video_id)
+    
+    content = YOUTUBE_PATTERN.sub(youtube_replacer, content)
+    
+    # Process [Carousel][/Carousel] tags for image/video galleries
+    def process_carousel_tags(content):
+        """Process [Carousel] tags to create responsive image/video carousels"""
+        carousel_pattern = r'\[Carousel\](.*?)\[/Carousel\]'
+        
+        carousel_ids = {}
+        
+        def carousel_replacer(match):
+            # Markup and runtime (carousel.js) are shared with the tag renderer
+            return carousel_html(match.group(1), carousel_ids)
+        
+        return re.sub(carousel_pattern, carousel_replacer, content, flags=re.DOTALL | re.IGNORECASE)
+    
+    content = process_carousel_tags(content)
+    
+    # Convert lists
+    content = re.sub(r'^- (.*?)$', r'<li>\1</li>', content, flags=re.MULTILINE)
+    content = re.sub(r'(<li>.*?</li>)', r'<ul>\1</ul>', content, flags=re.DOTALL)
+    
+    # Convert paragraphs - but preserve all HTML elements
+    paragraphs = content.split('\n\n')
+    html_paragraphs = []
+    
+    for para in paragraphs:
+        para = para.strip()
+        if para:
+            # Split paragraph into lines to check for headers and HTML elements
+            lines = para.split('\n')
+            processed_para_lines = []
+            current_text_block = []
+            inside_html_block = False
+            html_block_tag = None
+            
+            for line in lines:
+                line_stripped = line.strip()
+                
+                # Check if we're starting a multi-line HTML block
+                if not inside_html_block:
+                    # Check for opening tags of multi-line HTML elements
+                    if line_stripped.startswith('<video') and not line_stripped.endswith('</video>'):
+                        inside_html_block = True
+                        html_block_tag = 'video'
+                        # If we have accumulated text, wrap it in a paragraph
+                        if current_text_block:
+                            processed_para_lines.append(f'<p>{" ".join(current_text_block)}</p>')
+                            current_text_block = []
+                        processed_para_lines.append(line)
+                        continue
+                    elif line_stripped.startswith('<div') and not line_stripped.endswith('</div>'):
+                        inside_html_block = True
+                        html_block_tag = 'div'
+                        # If we have accumulated text, wrap it in a paragraph
+                        if current_text_block:
+                            processed_para_lines.append(f'<p>{" ".join(current_text_block)}</p>')
+                            current_text_block = []
+                        processed_para_lines.append(line)
+                        continue
+                
+                # If we're inside an HTML block, continue until we find the closing tag
+                if inside_html_block:
+                    processed_para_lines.append(line)
+                    if line_stripped.endswith(f'</{html_block_tag}>'):
+                        inside_html_block = False
+                        html_block_tag = None
+                    continue
+                
+                # Check if this line is already a single-line HTML element (including headers)
+                if (line_stripped.startswith('<h1>') or line_stripped.startswith('<h2>') or 
+                    line_stripped.startswith('<h3>') or line_stripped.startswith('<h4>') or
+                    line_stripped.startswith('<h5>') or line_stripped.startswith('<h6>') or
+                    line_stripped.startswith('<img') or line_stripped.startswith('<picture>') or
+                    line_stripped.startswith('<ul>') or line_stripped.startswith('<li>') or
+                    line_stripped.startswith('<strong>') or line_stripped.startswith('<em>') or
+                    line_stripped.startswith('<a ') or
+                    line_stripped.endswith('</h1>') or line_stripped.endswith('</h2>') or
+                    line_stripped.endswith('</h3>') or line_stripped.endswith('</h4>') or
+                    line_stripped.endswith('</h5>') or line_stripped.endswith('</h6>') or
+                    line_stripped.endswith('</ul>') or line_stripped.endswith('</li>') or
+                    '<h1>' in line_stripped or '<h2>' in line_stripped or '<h3>' in line_stripped or
+                    '<h4>' in line_stripped or '<h5>' in line_stripped or '<h6>' in line_stripped or
+                    (line_stripped.startswith('<video') and line_stripped.endswith('</video>')) or
+                    (line_stripped.startswith('<div') and line_stripped.endswith('</div>'))):
+                    # If we have accumulated text, wrap it in a paragraph
+                    if current_text_block:
+                        processed_para_lines.append(f'<p>{" ".join(current_text_block)}</p>')
+                        current_text_block = []
+                    # Add the HTML element as-is
+                    processed_para_lines.append(line)
+                else:
+                    # Accumulate text lines that aren't HTML elements
+                    if line.strip():
+                        current_text_block.append(line.strip())
+            
+            # Handle any remaining text
+            if current_text_block:
+                processed_para_lines.append(f'<p>{" ".join(current_text_block)}</p>')
+            
+            html_paragraphs.extend(processed_para_lines)
+        else:
+            html_paragraphs.append(para)
+    
+    return '\n'.join(html_paragraphs)
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Markdown Engines for Portfolio Website
+Interchangeable backends that turn the email markdown/tag dialect into HTML.
+
+    tags             tag_renderer.py, the single-pass renderer (default)
+    python-markdown  Python-Markdown, with an extension for the bracket tags
+    legacy           legacy_renderer.py, the original multi-pass renderer
+
+config.MARKDOWN_ENGINE picks the engine the page builders use. Every engine
+has render(content) -> str and stream(content) -> chunks; engines that can't
+stream hand out the whole page as one chunk. `python benchmark_engines.py`
+compares their throughput and output size on the shared corpus.
+
+get_engine() hands every caller the same engine object, including the
+render threads of async_email_processor.py, so an engine keeps no per-render
+state on itself: a markdown.Markdown instance isn't thread-safe, and the
+python-markdown engine keeps one per thread.
+
+The python-markdown engine leaves standard markdown (headings, emphasis,
+lists, links, paragraphs) to Python-Markdown and renders the site's own tags
+with the tag renderer's helpers, so a bracket tag looks the same whichever
+engine built the page:
+
+- [Desktop]/[Mobile] blocks become their usual divs with the inside still
+  parsed as markdown (md_in_html)
+- [Carousel] blocks and [center]/[left]/[right] lines are stored as raw HTML
+- ``` code blocks are highlighted by code_highlight.py
+- [VIDEO](src) and bare YouTube URLs become the usual players
+- links open in a new tab and images get the page's inline image style
+- the first "# " heading is dropped (it repeats the page title) and later
+  ones become <h2>, as in the other engines
+"""
+
+import re
+import threading
+import xml.etree.ElementTree as etree
+from abc import ABC, abstractmethod
+from typing import Dict, Iterator, List, Optional
+
+import markdown
+from markdown.extensions import Extension
+from markdown.inlinepatterns import InlineProcessor
+from markdown.preprocessors import Preprocessor
+from markdown.treeprocessors import Treeprocessor
+
+from text_scan import sub_pairs
+from code_highlight import fence_language, highlight
+from tag_renderer import (
+    render_markdown, stream_markdown, carousel_html, align_line, render_emphasis, render_links, responsive_classes,
+    CAROUSEL_OPEN, CAROUSEL_CLOSE, DESKTOP_OPEN, DESKTOP_CLOSE, MOBILE_OPEN, MOBILE_CLOSE,
+    VIDEO_HTML, youtube_html,
+)
+
+try:
+    import config  # Local import when running from CMS directory
+except ModuleNotFoundError:
+    from . import config  # type: ignore
+
+IMAGE_CLASS = 'email-image'  # style.css, as in tag_renderer.IMAGE_HTML
+
+
+class MarkdownEngine(ABC):
+    """Renders the email dialect; subclasses implement render() and, if they can, stream()"""
+
+    name = ''
+
+    @abstractmethod
+    def render(self, content: str) -> str:
+        """The page body HTML for `content`"""
+
+    def stream(self, content: str) -> Iterator[str]:
+        yield self.render(content)
+
+
+class TagsEngine(MarkdownEngine):
+    name = 'tags'
+
+    def render(self, content: str) -> str:
+        return render_markdown(content)
+
+    def stream(self, content: str) -> Iterator[str]:
+        return stream_markdown(content)
+
+
+class LegacyEngine(MarkdownEngine):
+    name = 'legacy'
+
+    def render(self, content: str) -> str:
+        # legacy_renderer imports simple_email_processor, which imports this module
+        from legacy_renderer import markdown_to_html
+        return markdown_to_html(content)
+
+
+# =============================================================================
+# PYTHON-MARKDOWN
+# =============================================================================
+
+def _responsive_open(block_content: str, css_class: str) -> str:
+    """The [Desktop]/[Mobile] wrapper div around markdown that md_in_html still parses"""
+    css_class, block_content = responsive_classes(block_content, css_class)
+    return f'\n\n<div class="{css_class}" markdown="1">\n\n{block_content}\n\n</div>\n\n'
+
+
+class BracketBlockPreprocessor(Preprocessor):
+    """Expands the bracket block and line tags before Python-Markdown parses the page"""
+
+    def run(self, lines: List[str]) -> List[str]:
+        carousel_ids: Dict[str, int] = {}
+        text = '\n'.join(self.stash_fences(lines))
+        text = sub_pairs(text, DESKTOP_OPEN, DESKTOP_CLOSE,
+                         lambda _, inner: _responsive_open(inner, 'desktop-only'))
+        text = sub_pairs(text, MOBILE_OPEN, MOBILE_CLOSE,
+                         lambda _, inner: _responsive_open(inner, 'mobile-only'))
+        text = sub_pairs(text, CAROUSEL_OPEN, CAROUSEL_CLOSE,
+                         lambda _, inner: f'\n\n{self.stash(carousel_html(inner, carousel_ids))}\n\n')
+
+        output = []
+        for line in text.split('\n'):
+            aligned = align_line(line) if '[' in line else None
+            if aligned is not None:
+                # Aligned text keeps its inline markdown, rendered the tag renderer's way
+                output.extend(['', self.stash(render_links(render_emphasis(aligned))), ''])
+            else:
+                output.append(line)
+        return output
+
+    def stash_fences(self, lines: List[str]) -> List[str]:
+        """Lines with each ``` code block replaced by its highlighted HTML"""
+        output: List[str] = []
+        fence: Optional[List[str]] = None
+        language = ''
+        for line in lines:
+            marker = fence_language(line)
+            if fence is None:
+                if marker is None:
+                    output.append(line)
+                else:
+                    fence, language = [], marker
+            elif marker == '':
+                output.extend(['', self.stash(highlight('\n'.join(fence), language)), ''])
+                fence = None
+            else:
+                fence.append(line)
+        if fence is not None:
+            # The unclosed block swallowed the blank lines the text has to end with
+            output.extend(['', self.stash(highlight('\n'.join(fence), language)), '', ''])
+        return output
+
+    def stash(self, block_html: str) -> str:
+        """Placeholder for raw HTML; on a line of its own it replaces its whole paragraph"""
+        return self.md.htmlStash.store(block_html.strip())
+
+
+class StashedHtmlPattern(InlineProcessor):
+    """Replaces a match with raw HTML built from it"""
+
+    def __init__(self, pattern: str, build, md: markdown.Markdown):
+        super().__init__(pattern, md)
+        self.build = build
+
+    def handleMatch(self, m: re.Match, data: str):
+        return self.md.htmlStash.store(self.build(m)), m.start(0), m.end(0)
+
+
+class SiteMarkupTreeprocessor(Treeprocessor):
+    """Page conventions: no duplicate title heading, links in new tabs, styled images"""
+
+    def run(self, root: etree.Element):
+        first_h1 = next((child for child in root if child.tag == 'h1'), None)
+        if first_h1 is not None:
+            root.remove(first_h1)
+        for heading in root.iter('h1'):
+            heading.tag = 'h2'
+        for link in root.iter('a'):
+            link.set('target', '_blank')
+        for image in root.iter('img'):
+            if not image.get('class'):
+                image.set('class', IMAGE_CLASS)
+
+
+class BracketTagExtension(Extension):
+    """The site's bracket tags for Python-Markdown"""
+
+    def extendMarkdown(self, md: markdown.Markdown):
+        # After whitespace normalization (30), before raw HTML blocks are stashed (20)
+        md.preprocessors.register(BracketBlockPreprocessor(md), 'bracket_blocks', 25)
+        # Ahead of 'link' (160), which would otherwise read [VIDEO](src) as a link
+        md.inlinePatterns.register(
+            StashedHtmlPattern(r'\[VIDEO\]\(([^)\n]*)\)', lambda m: VIDEO_HTML.format(m.group(1)), md),
+            'video', 165)
+        md.inlinePatterns.register(
+            StashedHtmlPattern(r'https?://(?:www\.)?youtube\.com/watch\?v=([a-zA-Z0-9_-]{11})',
+                               youtube_html, md),
+            'youtube', 105)
+        md.treeprocessors.register(SiteMarkupTreeprocessor(md), 'site_markup', 5)
+
+
+class PythonMarkdownEngine(MarkdownEngine):
+    name = 'python-markdown'
+
+    def __init__(self):
+        self.local = threading.local()
+
+    @property
+    def md(self) -> markdown.Markdown:
+        """This thread's parser; one keeps its state between the calls of a conversion"""
+        if not hasattr(self.local, 'md'):
+            self.local.md = markdown.Markdown(extensions=['md_in_html', BracketTagExtension()],
+                                              output_format='html')
+        return self.local.md
+
+    def render(self, content: str) -> str:
+        return self.md.reset().convert(content)
+
+
+ENGINES = {engine.name: engine for engine in (TagsEngine, PythonMarkdownEngine, LegacyEngine)}
+
+_instances: Dict[str, MarkdownEngine] = {}
+
+
+def get_engine(name: str = None) -> MarkdownEngine:
+    """The engine called `name` (default: config.MARKDOWN_ENGINE)"""
+    name = name or config.MARKDOWN_ENGINE
+    if name not in ENGINES:
+        raise ValueError(f"Unknown markdown engine '{name}' (choose from {', '.join(ENGINES)})")
+    if name not in _instances:
+        _instances[name] = ENGINES[name]()
+    return _instances[name]
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Media Metadata Index for Portfolio Website
+What the page builders know about each media file, keyed by the SHA-256 of
+its bytes, so a file is only ever probed once however many pages use it.
+
+For an image that is:
+- its upright width and height, read from the header without decoding the
+  pixels, so the markup can reserve the image's space before it loads
+- its perceptual hash (perceptual_hash.py), which media_store.py uses to
+  spot a re-encoded copy of an image that is already stored
+- its dominant colour and a tiny blurred WebP (a data: URI of a few hundred
+  bytes), painted as the image's background until the image arrives;
+  images with transparency get neither, since the background would show
+  through them
+
+For an SVG, its width and height (from its attributes or viewBox), its
+size, and - when svg_optimizer.py rewrote it - the size it arrived at and
+the bytes that saved.
+
+For an MP4/QuickTime video, its duration and display width and height,
+read from its `moov` box (mp4_faststart.py) without touching the frames.
+
+Entries are only ever added, so processes that render in parallel merge
+their additions into the file when they save.
+"""
+
+import io
+import os
+import re
+import json
+import base64
+import hashlib
+import logging
+import threading
+import xml.etree.ElementTree as ET
+from typing import Any, BinaryIO, Dict, Optional, Union
+
+from PIL import Image, ImageFilter, ImageOps
+
+from perceptual_hash import SIZE as HASH_SIZE, perceptual_hash
+from mp4_faststart import probe_video
+from file_lock import locked
+
+try:
+    import config  # Local import when running from CMS directory
+except ModuleNotFoundError:
+    from . import config  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+ORIENTATION_TAG = 0x0112
+
+# Longest side of the blurred placeholder, in pixels
+PLACEHOLDER_SIZE = 16
+
+SVG_LENGTH = re.compile(r'\s*([0-9.]+)\s*(px)?\s*')
+
+
+def media_digest(path: str) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.file_digest(f, 'sha256').hexdigest()
+
+
+def has_alpha(img: Image.Image) -> bool:
+    return img.mode in ('RGBA', 'LA', 'PA') or 'transparency' in img.info
+
+
+def probe_image(path: Union[str, BinaryIO]) -> Dict[str, Any]:
+    """Index entry for an image file"""
+    with Image.open(path) as img:
+        # Image.open has only parsed the header so far
+        width, height = img.size
+        if img.getexif().get(ORIENTATION_TAG) in (5, 6, 7, 8):
+            width, height = height, width
+        entry: Dict[str, Any] = {'kind': 'image', 'format': (img.format or '').lower(),
+                                 'width': width, 'height': height}
+        entry.update(image_traits(img))
+    return entry
+
+
+def image_traits(img: Image.Image) -> Dict[str, Any]:
+    """Perceptual hash, dominant colour and placeholder of an opened image (decoded here, at reduced size)"""
+    transparent = has_alpha(img)
+    # JPEGs decode straight at a fraction of their size
+    img.draft('RGB', (HASH_SIZE * 4, HASH_SIZE * 4))
+    upright = ImageOps.exif_transpose(img)
+    fingerprint = perceptual_hash(upright)
+    traits: Dict[str, Any] = {'phash': f"{fingerprint:016x}" if fingerprint is not None else None}
+    if transparent:
+        return traits
+    small = upright.convert('RGB')
+    small.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE), Image.BOX)
+    traits['color'] = '#{:02x}{:02x}{:02x}'.format(*small.resize((1, 1), Image.BOX).getpixel((0, 0)))
+    out = io.BytesIO()
+    small.filter(ImageFilter.GaussianBlur(1)).save(out, 'WEBP', quality=30)
+    traits['placeholder'] = 'data:image/webp;base64,' + base64.b64encode(out.getvalue()).decode('ascii')
+    return traits
+
+
+def probe_svg(path: str) -> Dict[str, Any]:
+    """Index entry for an SVG file; width and height are left out when it only has relative ones"""
+    root = ET.parse(path).getroot()
+    entry: Dict[str, Any] = {'kind': 'image', 'format': 'svg', 'bytes': os.path.getsize(path)}
+    width, height = (SVG_LENGTH.fullmatch(root.get(name, '')) for name in ('width', 'height'))
+    view_box = root.get('viewBox', '').replace(',', ' ').split()
+    if width and height:
+        entry['width'], entry['height'] = round(float(width.group(1))), round(float(height.group(1)))
+    elif len(view_box) == 4:
+        entry['width'], entry['height'] = round(float(view_box[2])), round(float(view_box[3]))
+    return entry
+
+
+class MediaIndex:
+    """sha256 of a media file -> what is known about it"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or config.MEDIA_INDEX_PATH
+        self.entries: Dict[str, Dict[str, Any]] = self.load()
+        self.added: Dict[str, Dict[str, Any]] = {}
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                    return data if isinstance(data, dict) else {}
+        except Exception as e:
+            logger.warning(f"Could not load media index: {e}")
+        return {}
+
+    def save(self):
+        """Write the entries added since loading, merged with whatever is on disk now"""
+        if not self.added:
+            return
+        with locked(self.path):
+            try:
+                entries = self.load()
+                # Field by field, so a fresh probe doesn't drop what another writer learned (e.g. bytes saved)
+                for digest, entry in self.added.items():
+                    entries[digest] = dict(entries.get(digest, {}), **entry)
+                tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(entries, f, indent=2, sort_keys=True)
+                os.replace(tmp_path, self.path)
+                self.entries = entries
+                self.added = {}
+            except Exception as e:
+                logger.error(f"Could not save media index: {e}")
+
+    def image(self, path: str) -> Optional[Dict[str, Any]]:
+        """Entry for the image at `path`, probing it the first time; None if it can't be read"""
+        if path.lower().endswith('.svg'):
+            return self.svg(path)
+        try:
+            digest = media_digest(path)
+            entry = self.entries.get(digest)
+            if entry is None or 'phash' not in entry:
+                entry = dict(entry or {}, **probe_image(path))
+                entry['path'] = f"images/{os.path.basename(path)}"
+                self.entries[digest] = self.added[digest] = entry
+            return entry
+        except Exception as e:
+            logger.warning(f"Could not read image metadata for {path}: {e}")
+            return None
+
+    def svg(self, path: str, original_bytes: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Entry for the SVG at `path`; `original_bytes` is the size it had before it was optimized"""
+        try:
+            digest = media_digest(path)
+            entry = self.entries.get(digest)
+            if entry is None or (original_bytes is not None and 'original_bytes' not in entry):
+                entry = dict(entry or {}, **probe_svg(path))
+                entry['path'] = f"images/{os.path.basename(path)}"
+                if original_bytes is not None:
+                    entry['original_bytes'] = original_bytes
+                    entry['saved_bytes'] = original_bytes - entry['bytes']
+                self.entries[digest] = self.added[digest] = entry
+            return entry
+        except Exception as e:
+            logger.warning(f"Could not read SVG metadata for {path}: {e}")
+            return None
+
+    def video(self, path: str) -> Optional[Dict[str, Any]]:
+        """Entry for the MP4/QuickTime video at `path`, probing it the first time; None if it can't be read"""
+        try:
+            digest = media_digest(path)
+            entry = self.entries.get(digest)
+            if entry is None:
+                entry = probe_video(path)
+                entry['path'] = f"images/{os.path.basename(path)}"
+                self.entries[digest] = self.added[digest] = entry
+            return entry
+        except Exception as e:
+            logger.warning(f"Could not read video metadata for {path}: {e}")
+            return None
+
+
+def image_attributes(entry: Optional[Dict[str, Any]], lazy: bool) -> str:
+    """<img> attributes for an indexed image: its size, async decoding, lazy loading and placeholder"""
+    attributes = ''
+    if entry and 'width' in entry:
+        attributes += f' width="{entry["width"]}" height="{entry["height"]}"'
+    attributes += ' decoding="async"'
+    if lazy:
+        attributes += ' loading="lazy"'
+    if entry and entry.get('placeholder'):
+        attributes += f' style="background: {entry["color"]} url({entry["placeholder"]}) center / cover no-repeat"'
+    return attributes
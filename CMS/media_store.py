@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Content-Addressed Media Store for Portfolio Website
+Attachments are saved as images/<sha256 prefix>.<ext>, named by their bytes
+instead of by page title and attachment name, so:
+
+- re-sending a page writes nothing: its files are already there
+- the same image sent for two pages is stored (and committed) once
+- a file on disk is never rewritten, since its name promises its bytes
+
+The manifest (config.MEDIA_MANIFEST_PATH) maps the name an attachment used
+to get, images/<title prefix>_<filename>, to the file that now holds it,
+along with the digest of the bytes as received. A re-send is recognised
+from that digest before the attachment is cleaned (see image_variants.py),
+so nothing is decoded either.
+
+Phones often re-encode a photo between sends, which changes every byte.
+With config.REUSE_NEAR_DUPLICATES on, a new JPEG's perceptual hash is looked
+up among the JPEGs in the media index (media_index.py) before it is written,
+and one with exactly the same dimensions within
+config.NEAR_DUPLICATE_DISTANCE bits is reused instead. It is off by default
+and never applies to PNG or other formats: a screenshot re-sent with one
+line corrected is only a few bits from the original, and reusing it would
+publish the stale image. `python media_store.py` reports the
+near-duplicates already in images/, of any format.
+
+Usage:
+    python media_store.py [--distance BITS]
+"""
+
+import io
+import os
+import re
+import sys
+import json
+import hashlib
+import logging
+import argparse
+import mimetypes
+import threading
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from perceptual_hash import BKTree
+from media_index import MediaIndex, probe_image
+from file_lock import locked
+
+try:
+    import config  # Local import when running from CMS directory
+except ModuleNotFoundError:
+    from . import config  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+# Hex digits of the SHA-256 in a stored file's name
+DIGEST_LENGTH = 16
+STORED_NAME = re.compile(rf'[0-9a-f]{{{DIGEST_LENGTH}}}(\.[a-z0-9]+)?')
+
+# The hash is grayscale, so a black-and-white edit of a photo matches the photo;
+# these also have to agree for two images to count as the same picture
+ASPECT_TOLERANCE = 0.02  # relative difference of width/height
+COLOUR_TOLERANCE = 10  # RGB distance of the dominant colours (re-encoding moves it by 1-2)
+
+# Default --distance of the report, which only lists candidates for a person to look at
+REPORT_DISTANCE = 6
+
+# Only photos are reused; screenshots and graphics (PNG, WebP) differ in a few bits when edited
+REUSABLE_FORMATS = ('jpeg',)
+
+# BK-tree of the reusable images, built once per run (per media index) and added to as images are stored
+_trees: Dict[Tuple[str, str], BKTree] = {}
+_tree_lock = threading.Lock()
+
+
+def stored_name(data: bytes, filename: str, content_type: str = '') -> str:
+    """File name `data` is stored under"""
+    ext = os.path.splitext(filename)[1].lower() or mimetypes.guess_extension(content_type) or ''
+    return f"{hashlib.sha256(data).hexdigest()[:DIGEST_LENGTH]}{ext}"
+
+
+def is_stored_name(name: str) -> bool:
+    """True for a content-addressed file name (see stored_name)"""
+    return bool(STORED_NAME.fullmatch(name))
+
+
+class MediaManifest:
+    """images/<name> an attachment was sent as -> {path, received} of the stored file"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or config.MEDIA_MANIFEST_PATH
+        self.entries: Dict[str, Dict[str, Any]] = self.load()
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                    return data if isinstance(data, dict) else {}
+        except Exception as e:
+            logger.warning(f"Could not load media manifest: {e}")
+        return {}
+
+    def record(self, name: str, path: str, received: str):
+        """Add one entry, merged into the manifest on disk so parallel writers don't drop each other's"""
+        with locked(self.path):
+            try:
+                self.entries = self.load()
+                self.entries[name] = {'path': path, 'received': received}
+                tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(self.entries, f, indent=2, sort_keys=True)
+                os.replace(tmp_path, self.path)
+            except Exception as e:
+                logger.error(f"Could not save media manifest: {e}")
+
+    def resolve(self, name: str) -> str:
+        """Stored path for an 'images/<name>' style path; `name` itself when it isn't in the manifest"""
+        prefix = '../' if name.startswith('../') else ''
+        entry = self.entries.get(name[len(prefix):])
+        return prefix + entry['path'] if entry else name
+
+    def find_received(self, received: str) -> Optional[str]:
+        """Stored path of bytes received before, if that file is still there"""
+        for entry in self.entries.values():
+            if entry.get('received') == received and os.path.exists(stored_file(entry['path'])):
+                return entry['path']
+        return None
+
+
+def stored_file(path: str) -> str:
+    return os.path.join(config.IMAGES_DIR, os.path.basename(path))
+
+
+def store(data: bytes, name: str, content_type: str = '',
+          prepare: Optional[Callable[[bytes], bytes]] = None) -> str:
+    """Save attachment bytes sent as `name` ('images/<prefix>_<filename>'); returns the stored 'images/...' path
+
+    `prepare` turns the received bytes into the bytes to keep; it is skipped
+    when the same bytes were received before.
+    """
+    manifest = MediaManifest()
+    received = hashlib.sha256(data).hexdigest()
+    path = manifest.find_received(received)
+    if path is None:
+        kept = prepare(data) if prepare else data
+        path = f"images/{stored_name(kept, name, content_type)}"
+        target = stored_file(path)
+        match = None if os.path.exists(target) else near_duplicate(kept, path)
+        if match:
+            path, bits = match
+            logger.info(f"{name} looks like {path} ({bits} bits apart), reusing it")
+        elif os.path.exists(target) and os.path.getsize(target) == len(kept):
+            logger.info(f"Already stored: {path}")
+        else:
+            tmp_path = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(kept)
+            os.replace(tmp_path, target)
+            logger.info(f"Stored {name} as {path} ({len(kept)} bytes)")
+    if manifest.entries.get(name) != {'path': path, 'received': received}:
+        manifest.record(name, path, received)
+    return path
+
+
+def aspect(width: int, height: int) -> float:
+    return width / height if height else 0.0
+
+
+def alike(a: Dict[str, Any], b: Dict[str, Any]) -> bool:
+    """Same aspect ratio and dominant colour (both None for images with transparency)"""
+    shape_a, shape_b = aspect(a['width'], a['height']), aspect(b['width'], b['height'])
+    if abs(shape_a - shape_b) > ASPECT_TOLERANCE * max(shape_a, shape_b):
+        return False
+    if not a.get('color') or not b.get('color'):
+        return not a.get('color') and not b.get('color')
+    rgb_a, rgb_b = (bytes.fromhex(entry['color'][1:]) for entry in (a, b))
+    return sum((x - y) ** 2 for x, y in zip(rgb_a, rgb_b)) <= COLOUR_TOLERANCE ** 2
+
+
+def reusable(entry: Dict[str, Any]) -> bool:
+    return entry.get('format') in REUSABLE_FORMATS and bool(entry.get('phash'))
+
+
+def same_photo(a: Dict[str, Any], b: Dict[str, Any]) -> bool:
+    """Both JPEG photos with exactly the same dimensions and dominant colour"""
+    return (reusable(a) and reusable(b) and (a['width'], a['height']) == (b['width'], b['height'])
+            and alike(a, b))
+
+
+def hash_tree(media_index: MediaIndex) -> BKTree:
+    """BK-tree of the indexed JPEG photos still in images/, holding their index entries"""
+    tree: BKTree = BKTree()
+    for entry in media_index.entries.values():
+        if reusable(entry) and entry.get('path') and os.path.exists(stored_file(entry['path'])):
+            tree.add(int(entry['phash'], 16), entry)
+    return tree
+
+
+def near_duplicate(data: bytes, path: str) -> Optional[Tuple[str, int]]:
+    """Stored 'images/...' path of a photo that looks like `data`, and how many hash bits apart
+
+    Without a match, `data` is about to be stored as `path`, so later
+    attachments of this run can match it.
+    """
+    if not config.REUSE_NEAR_DUPLICATES:
+        return None
+    try:
+        candidate = probe_image(io.BytesIO(data))
+    except Exception:
+        return None
+    if not reusable(candidate):
+        return None
+    with _tree_lock:
+        key = (config.MEDIA_INDEX_PATH, config.IMAGES_DIR)
+        if key not in _trees:
+            _trees[key] = hash_tree(MediaIndex())
+        tree = _trees[key]
+        matches = [(bits, entry['path']) for bits, entry in
+                   tree.find(int(candidate['phash'], 16), config.NEAR_DUPLICATE_DISTANCE)
+                   if same_photo(candidate, entry) and os.path.exists(stored_file(entry['path']))]
+        if not matches:
+            tree.add(int(candidate['phash'], 16), dict(candidate, path=path))
+            return None
+    bits, match = min(matches)
+    return match, bits
+
+
+def near_duplicate_groups(max_distance: int) -> List[List[Dict[str, Any]]]:
+    """Groups of images in images/ that look alike, after indexing any not in the media index yet"""
+    media_index = MediaIndex()
+    for name in sorted(os.listdir(config.IMAGES_DIR)):
+        path = os.path.join(config.IMAGES_DIR, name)
+        if os.path.isfile(path) and name.lower().endswith(('.jpg', '.jpeg', '.png', '.webp')):
+            media_index.image(path)
+    media_index.save()
+
+    # The index can hold the same path twice (an image edited in place); keep the current one
+    entries = {}
+    for entry in media_index.entries.values():
+        if entry.get('phash') and entry.get('path') and os.path.exists(stored_file(entry['path'])):
+            entries[entry['path']] = entry
+    tree: BKTree = BKTree()
+    for entry in entries.values():
+        tree.add(int(entry['phash'], 16), entry)
+
+    # Union-find over every pair the tree reports within range
+    parent = {path: path for path in entries}
+
+    def root(path: str) -> str:
+        while parent[path] != path:
+            parent[path] = parent[parent[path]]
+            path = parent[path]
+        return path
+
+    for path, entry in entries.items():
+        for _, other in tree.find(int(entry['phash'], 16), max_distance):
+            if other['path'] in entries and alike(entry, other):
+                parent[root(other['path'])] = root(path)
+
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for path, entry in entries.items():
+        groups.setdefault(root(path), []).append(entry)
+    return sorted((group for group in groups.values() if len(group) > 1), key=lambda group: group[0]['path'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report images in images/ that are near-duplicates of each other")
+    parser.add_argument('--distance', type=int, default=REPORT_DISTANCE,
+                        help=f"max differing hash bits (default: {REPORT_DISTANCE})")
+    args = parser.parse_args()
+
+    groups = near_duplicate_groups(args.distance)
+    wasted = 0
+    for group in groups:
+        sizes = {entry['path']: os.path.getsize(stored_file(entry['path'])) for entry in group}
+        keep = max(sizes, key=sizes.get)
+        wasted += sum(sizes.values()) - sizes[keep]
+        print(f"🔁 {len(group)} near-duplicates of {keep}:")
+        for path, size in sorted(sizes.items()):
+            print(f"   {path:<60} {size:>10,} bytes{'  (largest)' if path == keep else ''}")
+    if groups:
+        print(f"⚠️  {len(groups)} group(s), {wasted:,} bytes in copies")
+    else:
+        print("✅ No near-duplicate images")
+
+
+if __name__ == "__main__":
+    main()
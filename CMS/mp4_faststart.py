@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+MP4 Faststart for Portfolio Website
+Phones write the `moov` box of an .mp4/.mov (the index of where every frame
+is) after the `mdat` box holding the frames, because it is only known once
+recording stops. A browser can't start playing until it has the index, so
+with `<video preload="metadata">` it downloads almost the whole file first.
+
+faststart() rewrites the file with `moov` in front of `mdat`. Moving it
+shifts every byte of media data, so each chunk offset in the `stco`/`co64`
+tables is moved by the same amount. Only the top-level boxes are reordered;
+no media data is decoded or changed. Files that are already faststart,
+fragmented (`moof`) or not ISO-BMFF at all come back unchanged.
+
+video_metadata() reads the duration and display size from the same `moov`
+for the media index (media_index.py).
+"""
+
+import os
+import struct
+import logging
+from typing import Any, BinaryIO, Dict, Iterator, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+# Content types save_attachment rewrites
+VIDEO_TYPES = ('video/mp4', 'video/quicktime', 'video/x-m4v')
+
+# Boxes on the way from moov to the chunk offset tables and track headers
+CONTAINERS = {b'moov', b'trak', b'mdia', b'minf', b'stbl'}
+
+
+class Box(NamedTuple):
+    type: bytes
+    start: int  # offset of the box header
+    header: int  # header length (8, or 16 with a 64-bit size)
+    end: int
+
+
+def boxes(data: bytes, start: int = 0, end: Optional[int] = None) -> Iterator[Box]:
+    """Boxes laid out back to back in data[start:end]; raises ValueError on a malformed size"""
+    end = len(data) if end is None else end
+    while start + 8 <= end:
+        size, box_type = struct.unpack_from('>I4s', data, start)
+        header = 8
+        if size == 1:
+            if start + 16 > end:
+                raise ValueError(f"truncated {box_type!r} box at {start}")
+            size = struct.unpack_from('>Q', data, start + 8)[0]
+            header = 16
+        elif size == 0:  # runs to the end of the file
+            size = end - start
+        if size < header or start + size > end:
+            raise ValueError(f"bad size for {box_type!r} box at {start}")
+        yield Box(box_type, start, header, start + size)
+        start += size
+
+
+def file_boxes(f: BinaryIO) -> List[Box]:
+    """Top-level boxes of an open file, read by seeking from header to header"""
+    f.seek(0, os.SEEK_END)
+    end = f.tell()
+    found: List[Box] = []
+    start = 0
+    while start + 8 <= end:
+        f.seek(start)
+        head = f.read(16)
+        size, box_type = struct.unpack_from('>I4s', head)
+        header = 8
+        if size == 1:
+            size, header = struct.unpack_from('>Q', head, 8)[0], 16
+        elif size == 0:
+            size = end - start
+        if size < header or start + size > end:
+            raise ValueError(f"bad size for {box_type!r} box at {start}")
+        found.append(Box(box_type, start, header, start + size))
+        start += size
+    return found
+
+
+def child_boxes(data: bytes, box: Box) -> Iterator[Box]:
+    return boxes(data, box.start + box.header, box.end)
+
+
+def chunk_offset_tables(moov: bytes, box: Box) -> Iterator[Box]:
+    """Every stco/co64 box under `box`"""
+    for child in child_boxes(moov, box):
+        if child.type in (b'stco', b'co64'):
+            yield child
+        elif child.type in CONTAINERS:
+            yield from chunk_offset_tables(moov, child)
+
+
+def needs_faststart(top: List[Box]) -> bool:
+    types = [box.type for box in top]
+    if b'moov' not in types or b'mdat' not in types or b'moof' in types:
+        return False
+    return types.index(b'moov') > types.index(b'mdat')
+
+
+def faststart(data: bytes) -> bytes:
+    """`data` with its moov box moved in front of the first mdat; unchanged when there is nothing to do"""
+    try:
+        top = list(boxes(data))
+    except ValueError as e:
+        logger.warning(f"Not rewriting video, can't parse its boxes: {e}")
+        return data
+    if not needs_faststart(top):
+        return data
+
+    moov = next(box for box in top if box.type == b'moov')
+    first_mdat = next(i for i, box in enumerate(top) if box.type == b'mdat')
+    order = top[:first_mdat] + [moov] + [box for box in top[first_mdat:] if box is not moov]
+
+    # Where each box's first byte lands in the new layout
+    moved = {}
+    position = 0
+    for box in order:
+        moved[box.start] = position - box.start
+        position += box.end - box.start
+
+    def new_offset(offset: int) -> int:
+        for box in top:
+            if box.start <= offset < box.end:
+                return offset + moved[box.start]
+        raise ValueError(f"chunk offset {offset} is outside the file")
+
+    patched = bytearray(data[moov.start:moov.end])
+    local = Box(moov.type, 0, moov.header, moov.end - moov.start)
+    try:
+        for table in chunk_offset_tables(bytes(patched), local):
+            body = table.start + table.header
+            count = struct.unpack_from('>I', patched, body + 4)[0]
+            fmt = '>I' if table.type == b'stco' else '>Q'
+            width = struct.calcsize(fmt)
+            if body + 8 + count * width > table.end:
+                raise ValueError(f"{table.type.decode()} table runs past its box")
+            for k in range(count):
+                at = body + 8 + k * width
+                offset = new_offset(struct.unpack_from(fmt, patched, at)[0])
+                if fmt == '>I' and offset > 0xFFFFFFFF:
+                    raise ValueError("chunk offset no longer fits in stco")
+                struct.pack_into(fmt, patched, at, offset)
+    except (ValueError, struct.error) as e:
+        logger.warning(f"Not rewriting video: {e}")
+        return data
+
+    parts = [bytes(patched) if box is moov else data[box.start:box.end] for box in order]
+    return b''.join(parts)
+
+
+def full_box_version(moov: bytes, box: Box) -> int:
+    return moov[box.start + box.header]
+
+
+def video_metadata(moov: bytes) -> Dict[str, Any]:
+    """Duration (seconds) and display width/height of the first video track, from a whole moov box"""
+    top = next(boxes(moov))
+    metadata: Dict[str, Any] = {}
+    for child in child_boxes(moov, top):
+        if child.type == b'mvhd':
+            body = child.start + child.header + 4
+            if full_box_version(moov, child) == 1:
+                timescale, duration = struct.unpack_from('>IQ', moov, body + 16)
+            else:
+                timescale, duration = struct.unpack_from('>II', moov, body + 8)
+            if timescale:
+                metadata['duration'] = round(duration / timescale, 3)
+        elif child.type == b'trak' and 'width' not in metadata:
+            size = track_size(moov, child)
+            if size:
+                metadata['width'], metadata['height'] = size
+    return metadata
+
+
+def track_size(moov: bytes, trak: Box) -> Optional[tuple]:
+    """Display size of a video track (its tkhd size, turned by the track matrix); None for other tracks"""
+    tkhd = None
+    handler = None
+    for child in child_boxes(moov, trak):
+        if child.type == b'tkhd':
+            tkhd = child
+        elif child.type == b'mdia':
+            for part in child_boxes(moov, child):
+                if part.type == b'hdlr':
+                    handler = moov[part.start + part.header + 8:part.start + part.header + 12]
+    if tkhd is None or handler != b'vide':
+        return None
+    # The matrix follows version/flags, times, track id, duration and 16 bytes of layer/volume fields
+    matrix = tkhd.start + tkhd.header + (52 if full_box_version(moov, tkhd) == 1 else 40)
+    a, b, _, c, d = struct.unpack_from('>iiiii', moov, matrix)
+    width, height = (value >> 16 for value in struct.unpack_from('>II', moov, matrix + 36))
+    # A phone held upright records landscape frames and a 90 degree rotation
+    if a == 0 and d == 0 and b and c:
+        width, height = height, width
+    return width, height
+
+
+def probe_video(path: str) -> Dict[str, Any]:
+    """Index entry for an MP4/QuickTime file; only its moov box is read"""
+    with open(path, 'rb') as f:
+        top = file_boxes(f)
+        ftyp = next((box for box in top if box.type == b'ftyp'), None)
+        moov = next((box for box in top if box.type == b'moov'), None)
+        if moov is None:
+            raise ValueError("no moov box")
+        brand = b''
+        if ftyp:
+            f.seek(ftyp.start + ftyp.header)
+            brand = f.read(4)
+        f.seek(moov.start)
+        entry: Dict[str, Any] = {'kind': 'video', 'format': 'mov' if brand == b'qt  ' else 'mp4',
+                                 'faststart': not needs_faststart(top)}
+        entry.update(video_metadata(f.read(moov.end - moov.start)))
+    return entry
+
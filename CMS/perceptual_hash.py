@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Perceptual Hash for Portfolio Website
+A 64-bit fingerprint of what an image looks like, so a photo that a phone
+re-encoded or resized between two sends still matches the copy already in
+images/ (their SHA-256 differs, their perceptual hashes barely do).
+
+The hash is the classic DCT hash: the image is shrunk to 32x32 grayscale,
+transformed with a 2-D DCT (two matrix products in numpy), and each of the
+64 lowest frequencies except the DC term becomes one bit - set when it is
+above the median. Similar images differ in a few bits; the number of
+differing bits (Hamming distance) is the match score.
+
+Near-duplicates are looked up in a BK-tree, which only descends into the
+subtrees whose distance band can still hold a match, so a lookup touches
+a small part of the index instead of every image.
+"""
+
+from typing import Dict, Generic, Iterator, List, Optional, Tuple, TypeVar
+
+import numpy as np
+from PIL import Image, ImageOps
+
+T = TypeVar('T')
+
+SIZE = 32
+LOW = 8
+
+# A flat image (solid colour, blank page) hashes to noise; it never matches
+MIN_CONTRAST = 2.0
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    """Orthonormal DCT-II matrix: DCT(x) = M @ x"""
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    matrix = np.sqrt(2.0 / n) * np.cos(np.pi * (2 * i + 1) * k / (2 * n))
+    matrix[0] /= np.sqrt(2.0)
+    return matrix
+
+
+DCT = _dct_matrix(SIZE)
+
+
+def perceptual_hash(img: Image.Image) -> Optional[int]:
+    """DCT hash of an (upright) image, or None when it is too flat to fingerprint"""
+    gray = np.asarray(img.convert('L').resize((SIZE, SIZE), Image.LANCZOS), dtype=np.float64)
+    if gray.std() < MIN_CONTRAST:
+        return None
+    low = (DCT @ gray @ DCT.T)[:LOW, :LOW].ravel()
+    bits = low > np.median(low[1:])
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def file_hash(path: str) -> Optional[int]:
+    with Image.open(path) as img:
+        img.draft('L', (SIZE * 4, SIZE * 4))
+        return perceptual_hash(ImageOps.exif_transpose(img))
+
+
+def distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class BKTree(Generic[T]):
+    """Metric tree over 64-bit hashes; find() returns every item within a distance"""
+
+    def __init__(self):
+        # node: (hash, items with that hash, children by distance)
+        self.root: Optional[Tuple[int, List[T], Dict[int, tuple]]] = None
+
+    def add(self, value: int, item: T):
+        if self.root is None:
+            self.root = (value, [item], {})
+            return
+        node = self.root
+        while True:
+            d = distance(value, node[0])
+            if d == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(d)
+            if child is None:
+                node[2][d] = (value, [item], {})
+                return
+            node = child
+
+    def find(self, value: int, max_distance: int) -> Iterator[Tuple[int, T]]:
+        """(distance, item) for every item within `max_distance` of `value`"""
+        stack = [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
+            d = distance(value, node[0])
+            if d <= max_distance:
+                for item in node[1]:
+                    yield d, item
+            # Triangle inequality: only children in [d - max, d + max] can hold matches
+            for child_distance, child in node[2].items():
+                if d - max_distance <= child_distance <= d + max_distance:
+                    stack.append(child)
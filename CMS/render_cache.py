@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Render Cache for Portfolio Website
+Content-hash cache that lets an unchanged page skip its whole build.
+
+Every render is keyed by a SHA-256 over what the page is built from:
+
+- the page builder ('simple' or 'enhanced')
+- the parsed email: title, [Description] and content, i.e. after
+  parse_email_content has dropped transport headers, MIME boundaries and
+  part whitespace that differ between two sends of the same draft
+- every attachment's filename, content type and data digest
+- the template version (templates/*.html), the markdown engine
+  (config.MARKDOWN_ENGINE), whether pages are minified (config.MINIFY_HTML),
+  the image settings (responsive variants and tile thumbnails, whose files
+  are published with the page) and the renderer version (the source of the modules that turn content
+  into a page)
+
+The cache maps each output filename to the key of its last build and the
+digest of the page that build wrote. A hit - same key, page still on disk
+with that digest, media still present - means a rebuild would reproduce what
+is already published, so process_inline_media, markdown_to_html, the
+template, the Pages/ write and the tile remove/insert are all skipped and
+every file is left byte-for-byte untouched.
+
+Each entry also keeps what makes a rebuild reproducible: the date the page
+was first published (shown as "Created:") and the digest of the parsed source
+the page was built from. The source itself holds the whole email, so it goes
+to render_sources.json next to the cache, which is not committed;
+verify_pages.py re-renders every page whose local source still matches the
+recorded digest and reports drift.
+
+Lookups are read-only and safe from worker processes; store() and save() are
+called from the single writer that also updates index.html.
+"""
+
+import os
+import re
+import json
+import hashlib
+import logging
+import functools
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+try:
+    import config  # Local import when running from CMS directory
+except ModuleNotFoundError:
+    from . import config  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+CMS_DIR = Path(__file__).resolve().parent
+TEMPLATE_DIR = CMS_DIR / "templates"
+
+# Modules whose code decides the bytes of a page
+RENDERER_SOURCES = (
+    'tag_renderer.py',
+    'markdown_engines.py',
+    'code_highlight.py',
+    'template_engine.py',
+    'html_minify.py',
+    'image_variants.py',
+    'media_index.py',
+    'mp4_faststart.py',
+    'simple_email_processor.py',
+    'enhanced_email_processor.py',
+    '../carousel.js',  # their digests are in the script URLs pages load
+    '../youtube.js',
+)
+
+# Page fields kept so a hit can stand in for a fresh render
+PAGE_FIELDS = ('title', 'filename', 'description', 'tile_image', 'saved_files', 'created')
+
+# The "Created:" line both page builders write
+CREATED_LINE = re.compile(r'<p><em>Created: (\w+ \d{1,2}, \d{4})</em></p>')
+
+
+def file_digest(path: str) -> Optional[str]:
+    """SHA-256 of a file, or None when it can't be read"""
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.file_digest(f, 'sha256').hexdigest()
+    except OSError:
+        return None
+
+
+def _sources_digest(paths: List[Path]) -> str:
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(path.name.encode('utf-8') + b'\0')
+        digest.update((file_digest(str(path)) or '').encode('ascii') + b'\0')
+    return digest.hexdigest()
+
+
+@functools.cache
+def template_version() -> str:
+    """Digest of every page template"""
+    return _sources_digest(sorted(TEMPLATE_DIR.glob('*.html')))
+
+
+@functools.cache
+def renderer_version() -> str:
+    """Digest of the renderer and page builder sources"""
+    return _sources_digest([CMS_DIR / name for name in RENDERER_SOURCES])
+
+
+def render_key(builder: str, parsed: Dict[str, Any]) -> str:
+    """Cache key for rendering `parsed` with `builder`"""
+    digest = hashlib.sha256()
+    images = (f"{config.IMAGE_VARIANTS}:{config.IMAGE_VARIANT_WIDTHS}:{config.IMAGE_QUALITY}:"
+              f"{config.TILE_THUMBNAILS}:{config.TILE_THUMBNAIL_SIZE}")
+    for value in (builder, template_version(), config.MARKDOWN_ENGINE, str(config.MINIFY_HTML), images,
+                  renderer_version(), parsed.get('title', ''), parsed.get('description', ''), parsed.get('content', '')):
+        digest.update(value.encode('utf-8') + b'\0')
+    for attachment in parsed.get('attachments') or []:
+        data = attachment.get('data') or attachment.get('content') or b''
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        digest.update(str(attachment.get('filename', '')).encode('utf-8') + b'\0')
+        digest.update(str(attachment.get('content_type', '')).encode('utf-8') + b'\0')
+        digest.update(hashlib.sha256(data).hexdigest().encode('ascii') + b'\0')
+    return digest.hexdigest()
+
+
+def source_digest(source: Dict[str, Any]) -> str:
+    """SHA-256 of a page's parsed source (see page_source in simple_email_processor.py)"""
+    return hashlib.sha256(json.dumps(source, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def site_path(relative: str) -> str:
+    """Absolute path of a '../images/x' style path written by the page builders"""
+    if relative.startswith('../'):
+        relative = relative[3:]
+    return os.path.join(str(config.BASE_DIR), relative)
+
+
+class RenderCache:
+    """filename -> {key, page_hash, source_hash, page fields} of the last build, plus the local sources"""
+
+    def __init__(self, path: str = config.RENDER_CACHE_PATH):
+        self.path = path
+        self.sources_path = os.path.join(os.path.dirname(path), 'render_sources.json')
+        self.entries: Dict[str, Dict[str, Any]] = self.load(self.path)
+        self.sources: Dict[str, Dict[str, Any]] = self.load(self.sources_path)
+
+    def load(self, path: str) -> Dict[str, Dict[str, Any]]:
+        try:
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                    return data if isinstance(data, dict) else {}
+        except Exception as e:
+            logger.warning(f"Could not load render cache: {e}")
+        return {}
+
+    def save(self):
+        for path, data in ((self.path, self.entries), (self.sources_path, self.sources)):
+            try:
+                tmp_path = path + '.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, indent=2, sort_keys=True)
+                os.replace(tmp_path, path)
+            except Exception as e:
+                logger.error(f"Could not save render cache: {e}")
+
+    def source(self, filename: str) -> Optional[Dict[str, Any]]:
+        """The source `filename` was last built from, if this machine has it"""
+        source = self.sources.get(filename)
+        entry = self.entries.get(filename, {})
+        if source is None or source_digest(source) != entry.get('source_hash'):
+            return None
+        return source
+
+    def lookup(self, filename: str, key: str) -> Optional[Dict[str, Any]]:
+        """The cached page for `filename` if building `key` would rewrite identical files"""
+        entry = self.entries.get(filename)
+        if not entry or entry.get('key') != key:
+            return None
+        if file_digest(os.path.join(config.PAGES_DIR, filename)) != entry.get('page_hash'):
+            return None
+        if not all(os.path.exists(site_path(media_file)) for media_file in entry.get('saved_files', [])):
+            return None
+        page = {field: entry.get(field) for field in PAGE_FIELDS}
+        page['cache_key'] = key
+        page['cached'] = True
+        return page
+
+    def store(self, page: Dict[str, Any]):
+        """Remember a page that was just written (needs the 'cache_key' the builders return)"""
+        key = page.get('cache_key')
+        page_hash = file_digest(os.path.join(config.PAGES_DIR, page['filename']))
+        if not key or page_hash is None:
+            return
+        entry = {field: page.get(field) for field in PAGE_FIELDS}
+        entry.update(key=key, page_hash=page_hash)
+        if page.get('source'):
+            entry['source_hash'] = source_digest(page['source'])
+            self.sources[page['filename']] = page['source']
+        # The first publication date never moves
+        entry['created'] = self.entries.get(page['filename'], {}).get('created') or entry['created']
+        self.entries[page['filename']] = entry
+
+
+def first_published(filename: str, render_cache: Optional[RenderCache] = None) -> date:
+    """Date `filename` was first published.
+
+    Taken from the render cache, else from the "Created:" line of the page
+    already on disk (pages built before dates were recorded), else today.
+    """
+    entry = (render_cache or RenderCache()).entries.get(filename, {})
+    if entry.get('created'):
+        return date.fromisoformat(entry['created'])
+    try:
+        with open(os.path.join(config.PAGES_DIR, filename), 'r', encoding='utf-8') as f:
+            match = CREATED_LINE.search(f.read())
+        if match:
+            return datetime.strptime(match.group(1), '%B %d, %Y').date()
+    except (OSError, ValueError):
+        pass
+    return date.today()
@@ -20,9 +20,22 @@ import mimetypes
 import base64
 import traceback
 import logging
-from datetime import datetime
-from typing import Dict, Any, List, Optional, Tuple
-from template_engine import render as render_template
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from template_engine import stream as stream_template
+from markdown_engines import get_engine as markdown_engine
+from tag_renderer import embeds_youtube
+from render_cache import RenderCache, render_key, first_published
+from text_scan import sub_pairs, find_pair, sub_bracket_paren, strip_tags, find_tile
+from html_minify import MinifiedStream
+from image_variants import Variants, clean_original, build_variants, picture_html
+from media_index import MediaIndex, image_attributes
+from media_store import store as store_media
+from mp4_faststart import VIDEO_TYPES, faststart
+from svg_optimizer import optimize_svg, record_savings as record_svg_savings
+from tile_thumbnails import tile_img_html, thumbnail_files, mark_lazy_tiles
 
 # -----------------------------------------------------------------------------
 # Override with centralized config (allows env-based overrides and DRY setup)
@@ -65,6 +78,9 @@ DELETE_PATTERNS = [
 
 # Content processing patterns
 DESCRIPTION_PATTERN = re.compile(r'\[Description\](.*?)\[/Description\]', re.IGNORECASE | re.DOTALL)
+DESCRIPTION_OPEN = re.compile(r'\[Description\]', re.IGNORECASE)
+DESCRIPTION_CLOSE = re.compile(r'\[/Description\]', re.IGNORECASE)
+TILE_OPEN = re.compile(r'<div class="project">', re.IGNORECASE)
 MARKDOWN_BOLD_PATTERN = re.compile(r'\*\*(.*?)\*\*')
 MARKDOWN_ITALIC_PATTERN = re.compile(r'\*(.*?)\*')
 MARKDOWN_IMAGE_PATTERN = re.compile(r'!\[(.*?)\]\((.*?)\)')
@@ -74,6 +90,7 @@ YOUTUBE_SHORT_PATTERN = re.compile(r'https?://(?:www\.)?youtu\.be/([a-zA-Z0-9_-]
 EMAIL_PATTERN = re.compile(r'\[Email:[^\]]*\]', re.IGNORECASE)
 DELETE_PATTERN = re.compile(r'\[DELETE\s+CONFIRM\]\s*(.+)$', re.IGNORECASE)
 VIDEO_PATTERN = re.compile(r'\[VIDEO\]\((.*?)\)')
+MEDIA_PLACEHOLDER_PATTERN = re.compile(r'__MEDIA_PLACEHOLDER_(\d+)__')
 
 # Responsive tag patterns
 DESKTOP_PATTERN = re.compile(r'\[Desktop\](.*?)\[/Desktop\]', re.DOTALL | re.IGNORECASE)
@@ -205,7 +222,7 @@ def html_to_text(html_content: str) -> str:
     text = re.sub(r'</\s*p\s*>', '\n', text, flags=re.IGNORECASE)
 
     # Drop all other tags
-    text = re.sub(r'<[^>]+>', '', text)
+    text = strip_tags(text)
 
     # Un-escape HTML entities (&amp; → & etc.)
     return _html.unescape(text)
@@ -266,6 +283,30 @@ def save_attachment(attachment: Dict[str, Any], page_title: str) -> Optional[str
         logger.warning(f"No attachment data found for {attachment.get('filename', 'unknown')}")
         return None
     
+    content_type = attachment.get('content_type', '')
+    name = attachment_path(attachment, page_title).replace('../', '')
+    
+    # Stored under its content hash, so identical bytes are written once (see media_store.py);
+    # photos are kept upright and without their EXIF (camera, location), SVGs are optimized
+    # and stripped of script, and videos get their index in front of their frames so they
+    # start playing before they are downloaded
+    is_svg = content_type == 'image/svg+xml' or name.lower().endswith('.svg')
+    prepare = None
+    if is_svg:
+        prepare = optimize_svg if config.SVG_OPTIMIZE else None
+    elif content_type.startswith('image/'):
+        prepare = clean_original
+    elif content_type in VIDEO_TYPES and config.MP4_FASTSTART:
+        prepare = faststart
+    path = store_media(attachment_data, name, content_type, prepare)
+    if is_svg and prepare:
+        record_svg_savings(os.path.join(IMAGES_DIR, os.path.basename(path)), len(attachment_data))
+    
+    logger.info(f"Saved attachment: {name} -> {path}")
+    return f"../{path}"
+
+def attachment_path(attachment: Dict[str, Any], page_title: str) -> str:
+    """Relative path an attachment is known by; the media manifest maps it to the stored file"""
     # Sanitize filename
     filename = attachment.get('filename', 'unknown_file')
     filename = os.path.basename(filename)  # Remove path components
@@ -273,15 +314,7 @@ def save_attachment(attachment: Dict[str, Any], page_title: str) -> Optional[str
     
     # Add page prefix to avoid conflicts (using enhanced function)
     page_prefix = FILENAME_SANITIZE_PATTERN.sub('_', page_title.lower())[:MAX_TITLE_PREFIX_LENGTH]
-    filename = f"{page_prefix}_{filename}"
-    
-    # Save file
-    filepath = os.path.join(IMAGES_DIR, filename)
-    with open(filepath, 'wb') as f:
-        f.write(attachment_data)
-    
-    logger.info(f"Saved attachment: {filename} ({len(attachment_data)} bytes)")
-    return f"../images/{filename}"
+    return f"../images/{page_prefix}_{filename}"
 
 def parse_email_content(email_text: str) -> Dict[str, Any]:
     """Parse email content maintaining exact sequential order of text and media"""
@@ -372,7 +405,7 @@ def parse_email_content(email_text: str) -> Dict[str, Any]:
         description = extract_description(content)
         if description:
             # Remove the [Description] tag from content
-            content = re.sub(r'\[Description\](.*?)\[/Description\]', '', content, flags=re.IGNORECASE).strip()
+            content = sub_pairs(content, DESCRIPTION_OPEN, DESCRIPTION_CLOSE, lambda *_: '').strip()
         
         return {
             "title": subject,
@@ -417,11 +450,11 @@ def parse_email_content(email_text: str) -> Dict[str, Any]:
         }
 
 def extract_description(content: str) -> str:
-    """Extract description from [Description] tag in content using pre-compiled pattern"""
-    match = DESCRIPTION_PATTERN.search(content)
-    if match:
+    """Extract description from [Description] tag in content (linear scan, see text_scan.py)"""
+    description = find_pair(content, DESCRIPTION_OPEN, DESCRIPTION_CLOSE)
+    if description is not None:
         # Extract the description and remove any media placeholders
-        description = match.group(1).strip()
+        description = description.strip()
         # Remove any placeholder artefacts (both new and legacy spellings)
         description = re.sub(r'(?:__)?MEDIA_?PLACEHOLDER_?\d+__?', '', description, flags=re.IGNORECASE).strip()
         return description
@@ -432,8 +465,8 @@ def generate_description_from_content(content: str, title: str) -> str:
     try:
         # Remove markdown formatting and HTML tags
         clean_content = re.sub(r'[#*`_]', '', content)
-        clean_content = re.sub(r'<[^>]+>', '', clean_content)
-        clean_content = re.sub(r'\[.*?\]\(.*?\)', '', clean_content)  # Remove links
+        clean_content = strip_tags(clean_content)
+        clean_content = sub_bracket_paren(clean_content, '[', lambda *_: '')  # Remove links
         
         # Get first meaningful sentence
         sentences = re.split(r'[.!?]+', clean_content.strip())
@@ -466,38 +499,38 @@ def process_responsive_tags(content: str) -> str:
         block_content = match.group(1).strip()
         
         # Check for alignment tags within the desktop block
-        alignment_style = ""
+        alignment_class = ""
         if block_content.startswith('[center]'):
             block_content = block_content[8:].strip()  # Remove [center]
-            alignment_style = "text-align: center; "
+            alignment_class = " align-center"
         elif block_content.startswith('[left]'):
             block_content = block_content[6:].strip()  # Remove [left]
-            alignment_style = "text-align: left; "
+            alignment_class = " align-left"
         elif block_content.startswith('[right]'):
             block_content = block_content[7:].strip()  # Remove [right]
-            alignment_style = "text-align: right; "
+            alignment_class = " align-right"
         
-        # Wrap in desktop-only div with media query
-        return f'<div class="desktop-only" style="display: block; {alignment_style}margin: 10px 0;">{block_content}</div>'
+        # Wrap in desktop-only div (shown and hidden by style.css)
+        return f'<div class="desktop-only{alignment_class}">{block_content}</div>'
     
     # Process [Mobile]...[/Mobile] blocks with optional alignment
     def process_mobile_block(match):
         block_content = match.group(1).strip()
         
-        # Check for alignment tags within the mobile block (default to left if none specified)
-        alignment_style = "text-align: left; "  # Default mobile alignment
+        # Check for alignment tags within the mobile block (style.css left-aligns it if none specified)
+        alignment_class = ""
         if block_content.startswith('[center]'):
             block_content = block_content[8:].strip()  # Remove [center]
-            alignment_style = "text-align: center; "
+            alignment_class = " align-center"
         elif block_content.startswith('[left]'):
             block_content = block_content[6:].strip()  # Remove [left]
-            alignment_style = "text-align: left; "
+            alignment_class = " align-left"
         elif block_content.startswith('[right]'):
             block_content = block_content[7:].strip()  # Remove [right]
-            alignment_style = "text-align: right; "
+            alignment_class = " align-right"
         
-        # Wrap in mobile-only div with media query
-        return f'<div class="mobile-only" style="display: none; {alignment_style}margin: 10px 0;">{block_content}</div>'
+        # Wrap in mobile-only div (shown and hidden by style.css)
+        return f'<div class="mobile-only{alignment_class}">{block_content}</div>'
     
     # Replace [Desktop]...[/Desktop] blocks
     content = re.sub(r'\[Desktop\](.*?)\[/Desktop\]', process_desktop_block, content, flags=re.DOTALL | re.IGNORECASE)
@@ -525,24 +558,24 @@ def process_alignment_tags(content: str) -> str:
                 if content_text.startswith('###'):
                     # Convert ### to <h3> and center it
                     header_text = content_text[3:].strip()
-                    processed_lines.append(f'<div style="text-align: center; margin: 10px 0;"><h3>{header_text}</h3></div>')
+                    processed_lines.append(f'<div class="align-center"><h3>{header_text}</h3></div>')
                 elif content_text.startswith('##'):
                     # Convert ## to <h2> and center it
                     header_text = content_text[2:].strip()
-                    processed_lines.append(f'<div style="text-align: center; margin: 10px 0;"><h2>{header_text}</h2></div>')
+                    processed_lines.append(f'<div class="align-center"><h2>{header_text}</h2></div>')
                 elif content_text.startswith('#'):
                     # Convert # to <h1> and center it
                     header_text = content_text[1:].strip()
-                    processed_lines.append(f'<div style="text-align: center; margin: 10px 0;"><h1>{header_text}</h1></div>')
+                    processed_lines.append(f'<div class="align-center"><h1>{header_text}</h1></div>')
                 # Check if content contains media elements (img, video, or media placeholders)
                 elif ('<img ' in content_text or '<video ' in content_text or 
                     '__MEDIA_PLACEHOLDER_' in content_text or 
                     any(content_text.endswith(ext) for ext in ['.jpg', '.jpeg', '.png', '.gif', '.webp', '.mp4', '.mov', '.avi'])):
                     # For media, use flexbox centering for better control
-                    processed_lines.append(f'<div style="display: flex; justify-content: center; margin: 10px 0;">{content_text}</div>')
+                    processed_lines.append(f'<div class="flex-center">{content_text}</div>')
                 else:
                     # For text, use text-align
-                    processed_lines.append(f'<div style="text-align: center; margin: 10px 0;">{content_text}</div>')
+                    processed_lines.append(f'<div class="align-center">{content_text}</div>')
             else:
                 processed_lines.append(original_line)  # Keep original if no content after tag
                 
@@ -554,24 +587,24 @@ def process_alignment_tags(content: str) -> str:
                 if content_text.startswith('###'):
                     # Convert ### to <h3> and left-align it
                     header_text = content_text[3:].strip()
-                    processed_lines.append(f'<div style="text-align: left; margin: 10px 0;"><h3>{header_text}</h3></div>')
+                    processed_lines.append(f'<div class="align-left"><h3>{header_text}</h3></div>')
                 elif content_text.startswith('##'):
                     # Convert ## to <h2> and left-align it
                     header_text = content_text[2:].strip()
-                    processed_lines.append(f'<div style="text-align: left; margin: 10px 0;"><h2>{header_text}</h2></div>')
+                    processed_lines.append(f'<div class="align-left"><h2>{header_text}</h2></div>')
                 elif content_text.startswith('#'):
                     # Convert # to <h1> and left-align it
                     header_text = content_text[1:].strip()
-                    processed_lines.append(f'<div style="text-align: left; margin: 10px 0;"><h1>{header_text}</h1></div>')
+                    processed_lines.append(f'<div class="align-left"><h1>{header_text}</h1></div>')
                 # Check if content contains media elements
                 elif ('<img ' in content_text or '<video ' in content_text or 
                     '__MEDIA_PLACEHOLDER_' in content_text or 
                     any(content_text.endswith(ext) for ext in ['.jpg', '.jpeg', '.png', '.gif', '.webp', '.mp4', '.mov', '.avi'])):
                     # For media, use flexbox left alignment
-                    processed_lines.append(f'<div style="display: flex; justify-content: flex-start; margin: 10px 0;">{content_text}</div>')
+                    processed_lines.append(f'<div class="flex-left">{content_text}</div>')
                 else:
                     # For text, use text-align
-                    processed_lines.append(f'<div style="text-align: left; margin: 10px 0;">{content_text}</div>')
+                    processed_lines.append(f'<div class="align-left">{content_text}</div>')
             else:
                 processed_lines.append(original_line)  # Keep original if no content after tag
                 
@@ -583,24 +616,24 @@ def process_alignment_tags(content: str) -> str:
                 if content_text.startswith('###'):
                     # Convert ### to <h3> and right-align it
                     header_text = content_text[3:].strip()
-                    processed_lines.append(f'<div style="text-align: right; margin: 10px 0;"><h3>{header_text}</h3></div>')
+                    processed_lines.append(f'<div class="align-right"><h3>{header_text}</h3></div>')
                 elif content_text.startswith('##'):
                     # Convert ## to <h2> and right-align it
                     header_text = content_text[2:].strip()
-                    processed_lines.append(f'<div style="text-align: right; margin: 10px 0;"><h2>{header_text}</h2></div>')
+                    processed_lines.append(f'<div class="align-right"><h2>{header_text}</h2></div>')
                 elif content_text.startswith('#'):
                     # Convert # to <h1> and right-align it
                     header_text = content_text[1:].strip()
-                    processed_lines.append(f'<div style="text-align: right; margin: 10px 0;"><h1>{header_text}</h1></div>')
+                    processed_lines.append(f'<div class="align-right"><h1>{header_text}</h1></div>')
                 # Check if content contains media elements
                 elif ('<img ' in content_text or '<video ' in content_text or 
                     '__MEDIA_PLACEHOLDER_' in content_text or 
                     any(content_text.endswith(ext) for ext in ['.jpg', '.jpeg', '.png', '.gif', '.webp', '.mp4', '.mov', '.avi'])):
                     # For media, use flexbox right alignment
-                    processed_lines.append(f'<div style="display: flex; justify-content: flex-end; margin: 10px 0;">{content_text}</div>')
+                    processed_lines.append(f'<div class="flex-right">{content_text}</div>')
                 else:
                     # For text, use text-align
-                    processed_lines.append(f'<div style="text-align: right; margin: 10px 0;">{content_text}</div>')
+                    processed_lines.append(f'<div class="align-right">{content_text}</div>')
             else:
                 processed_lines.append(original_line)  # Keep original if no content after tag
         else:
@@ -609,291 +642,8 @@ def process_alignment_tags(content: str) -> str:
     return '\n'.join(processed_lines)
 
 def markdown_to_html(content: str) -> str:
-    """Convert basic markdown to HTML with media support"""
-    # Don't escape HTML if it contains pre-embedded media tags
-    if '<img ' in content or '<video ' in content:
-        # Content already has HTML, process carefully
-        pass
-    else:
-        # Escape HTML for safety
-        content = html.escape(content)
-    
-    # Process responsive device tags FIRST (before alignment and markdown headers)
-    content = process_responsive_tags(content)
-    
-    # Process custom alignment tags SECOND (before markdown headers)
-    # This allows alignment tags to handle their own markdown
-    content = process_alignment_tags(content)
-    
-    # Convert markdown headers (but skip headers that are already inside alignment divs)
-    lines = content.split('\n')
-    processed_lines = []
-    first_h1_found = False
-    inside_alignment_div = False
-    
-    for line in lines:
-        # Check if we're inside an alignment div
-        if '<div style=' in line and ('text-align:' in line or 'display: flex' in line):
-            inside_alignment_div = True
-            processed_lines.append(line)
-            continue
-        elif line.strip() == '</div>' and inside_alignment_div:
-            inside_alignment_div = False
-            processed_lines.append(line)
-            continue
-        elif inside_alignment_div:
-            # Skip markdown processing for lines inside alignment divs
-            processed_lines.append(line)
-            continue
-        
-        # Process markdown headers only if not inside alignment divs
-        line_stripped = line.strip()
-        if line_stripped.startswith('### '):
-            processed_lines.append('<h3>' + line_stripped[4:] + '</h3>')
-        elif line_stripped.startswith('## '):
-            processed_lines.append('<h2>' + line_stripped[3:] + '</h2>')
-        elif line_stripped.startswith('# ') and not first_h1_found:
-            # Skip the first H1 to avoid duplication with page title
-            first_h1_found = True
-            continue
-        elif line_stripped.startswith('# '):
-            # Convert subsequent H1s to H2s for better hierarchy
-            processed_lines.append('<h2>' + line_stripped[2:] + '</h2>')
-        else:
-            processed_lines.append(line)
-    
-    content = '\n'.join(processed_lines)
-    
-    # Convert markdown formatting using pre-compiled patterns for better performance
-    content = MARKDOWN_BOLD_PATTERN.sub(r'<strong>\1</strong>', content)
-    content = MARKDOWN_ITALIC_PATTERN.sub(r'<em>\1</em>', content)
-    
-    # Convert markdown images: ![alt text](url)
-    content = MARKDOWN_IMAGE_PATTERN.sub(r'<img src="\2" alt="\1" style="max-width: 50vw; height: auto; margin: 10px 0;">', content)
-    
-    # Convert markdown links: [text](url)
-    content = MARKDOWN_LINK_PATTERN.sub(r'<a href="\2" target="_blank">\1</a>', content)
-    
-    # Convert video tags: [VIDEO](url)
-    content = VIDEO_PATTERN.sub(r'<video controls style="max-width: 100%; height: auto; margin: 10px 0; border-radius: 8px;" preload="metadata"><source src="\1" type="video/mp4"><p>Your browser doesn\'t support HTML video. <a href="\1">Download the video</a> instead.</p></video>', content)
-    
-    # Convert YouTube links: [YOUTUBE](video_id or full_url)
-    def youtube_replacer(match):
-        url = match.group(1)
-        # Extract video ID from various YouTube URL formats
-        if 'youtube.com/watch?v=' in url:
-            video_id = url.split('v=')[1].split('&')[0]
-        elif 'youtu.be/' in url:
-            video_id = url.split('youtu.be/')[1].split('?')[0]
-        elif len(url) == 11:  # Direct video ID
-            video_id = url
-        else:
-            video_id = url
-        
-        return f'<div class="video-container" style="position: relative; padding-bottom: 56.25%; height: 0; overflow: hidden; margin: 10px 0;"><iframe src="https://www.youtube.com/embed/{video_id}" frameborder="0" allow="accelerometer; autoplay; clipboard-write; encrypted-media; gyroscope; picture-in-picture" allowfullscreen style="position: absolute; top: 0; left: 0; width: 100%; height: 100%;"></iframe></div>'
-    
-    content = YOUTUBE_PATTERN.sub(youtube_replacer, content)
-    
-    # Process [Carousel][/Carousel] tags for image/video galleries
-    def process_carousel_tags(content):
-        """Process [Carousel] tags to create responsive image/video carousels"""
-        carousel_pattern = r'\[Carousel\](.*?)\[/Carousel\]'
-        
-        def carousel_replacer(match):
-            carousel_content = match.group(1).strip()
-            carousel_items = []
-            
-            # Split content by lines and process each item
-            for line in carousel_content.split('\n'):
-                line = line.strip()
-                if not line:
-                    continue
-                    
-                # Check if line contains media (image or video)
-                if any(line.lower().endswith(ext) for ext in ['.jpg', '.jpeg', '.png', '.gif', '.webp']):
-                    # Image item
-                    if '__MEDIA_PLACEHOLDER_' in line:
-                        carousel_items.append(f'<div class="carousel-item"><img src="{line}" alt="Carousel Image" style="width: 100%; height: auto; border-radius: 8px;"></div>')
-                    else:
-                        carousel_items.append(f'<div class="carousel-item"><img src="../images/{line}" alt="Carousel Image" style="width: 100%; height: auto; border-radius: 8px;"></div>')
-                elif any(line.lower().endswith(ext) for ext in ['.mp4', '.mov', '.avi']):
-                    # Video item - improved compatibility
-                    if '__MEDIA_PLACEHOLDER_' in line:
-                        carousel_items.append(f'<div class="carousel-item"><video controls style="width: 100%; height: auto; border-radius: 8px;" preload="metadata"><source src="{line}" type="video/mp4"><p>Your browser doesn\'t support HTML video. <a href="{line}">Download the video</a> instead.</p></video></div>')
-                    else:
-                        carousel_items.append(f'<div class="carousel-item"><video controls style="width: 100%; height: auto; border-radius: 8px;" preload="metadata"><source src="../images/{line}" type="video/mp4"><p>Your browser doesn\'t support HTML video. <a href="../images/{line}">Download the video</a> instead.</p></video></div>')
-                elif '<img ' in line or '<video ' in line or '__MEDIA_PLACEHOLDER_' in line:
-                    # Already processed media
-                    carousel_items.append(f'<div class="carousel-item">{line}</div>')
-                else:
-                    # Text content or captions
-                    carousel_items.append(f'<div class="carousel-item carousel-text"><p style="text-align: center; margin: 10px 0; font-style: italic;">{line}</p></div>')
-            
-            if not carousel_items:
-                return carousel_content  # Return original if no items found
-            
-            # Generate unique carousel ID
-            import random
-            carousel_id = f"carousel_{random.randint(1000, 9999)}"
-            
-            # Create carousel HTML with navigation
-            carousel_html = f'''
-<div class="carousel-container" id="{carousel_id}" style="position: relative; max-width: 800px; margin: 20px auto; background: #f5f5f5; border-radius: 10px; overflow: hidden; box-shadow: 0 4px 15px rgba(0,0,0,0.1);">
-    <div class="carousel-track" style="display: flex; transition: transform 0.3s ease;">
-        {"".join(carousel_items)}
-    </div>
-    <button class="carousel-btn carousel-prev" onclick="moveCarousel('{carousel_id}', -1)" style="position: absolute; top: 50%; left: 10px; transform: translateY(-50%); background: rgba(0,0,0,0.7); color: white; border: none; padding: 10px 15px; border-radius: 50%; cursor: pointer; font-size: 18px; z-index: 10;">❮</button>
-    <button class="carousel-btn carousel-next" onclick="moveCarousel('{carousel_id}', 1)" style="position: absolute; top: 50%; right: 10px; transform: translateY(-50%); background: rgba(0,0,0,0.7); color: white; border: none; padding: 10px 15px; border-radius: 50%; cursor: pointer; font-size: 18px; z-index: 10;">❯</button>
-    <div class="carousel-indicators" style="text-align: center; padding: 15px;">
-        {" ".join([f'<span class="carousel-dot" onclick="currentSlide(&quot;{carousel_id}&quot;, {i+1})" style="height: 12px; width: 12px; margin: 0 5px; background-color: #bbb; border-radius: 50%; display: inline-block; cursor: pointer; transition: background-color 0.3s;"></span>' for i in range(len(carousel_items))])}
-    </div>
-</div>
-<script>
-if (typeof carouselData === 'undefined') {{
-    var carouselData = {{}};
-}}
-carouselData['{carousel_id}'] = {{currentSlide: 0, totalSlides: {len(carousel_items)}}};
-
-function moveCarousel(carouselId, direction) {{
-    var data = carouselData[carouselId];
-    var track = document.querySelector('#' + carouselId + ' .carousel-track');
-    data.currentSlide += direction;
-    
-    if (data.currentSlide >= data.totalSlides) data.currentSlide = 0;
-    if (data.currentSlide < 0) data.currentSlide = data.totalSlides - 1;
-    
-    track.style.transform = 'translateX(-' + (data.currentSlide * 100) + '%%)';
-    updateDots(carouselId);
-}}
-
-function currentSlide(carouselId, slideIndex) {{
-    var data = carouselData[carouselId];
-    var track = document.querySelector('#' + carouselId + ' .carousel-track');
-    data.currentSlide = slideIndex - 1;
-    track.style.transform = 'translateX(-' + (data.currentSlide * 100) + '%%)';
-    updateDots(carouselId);
-}}
-
-function updateDots(carouselId) {{
-    var data = carouselData[carouselId];
-    var dots = document.querySelectorAll('#' + carouselId + ' .carousel-dot');
-    dots.forEach((dot, index) => {{
-        dot.style.backgroundColor = index === data.currentSlide ? '#333' : '#bbb';
-    }});
-}}
-
-// Initialize carousel
-document.addEventListener('DOMContentLoaded', function() {{
-    updateDots('{carousel_id}');
-}});
-</script>
-<style>
-.carousel-item {{
-    min-width: 100%;
-    padding: 20px;
-    box-sizing: border-box;
-}}
-.carousel-btn:hover {{
-    background: rgba(0,0,0,0.9) !important;
-}}
-.carousel-dot:hover {{
-    background-color: #333 !important;
-}}
-</style>'''
-            
-            return carousel_html
-        
-        return re.sub(carousel_pattern, carousel_replacer, content, flags=re.DOTALL | re.IGNORECASE)
-    
-    content = process_carousel_tags(content)
-    
-    # Convert lists
-    content = re.sub(r'^- (.*?)$', r'<li>\1</li>', content, flags=re.MULTILINE)
-    content = re.sub(r'(<li>.*?</li>)', r'<ul>\1</ul>', content, flags=re.DOTALL)
-    
-    # Convert paragraphs - but preserve all HTML elements
-    paragraphs = content.split('\n\n')
-    html_paragraphs = []
-    
-    for para in paragraphs:
-        para = para.strip()
-        if para:
-            # Split paragraph into lines to check for headers and HTML elements
-            lines = para.split('\n')
-            processed_para_lines = []
-            current_text_block = []
-            inside_html_block = False
-            html_block_tag = None
-            
-            for line in lines:
-                line_stripped = line.strip()
-                
-                # Check if we're starting a multi-line HTML block
-                if not inside_html_block:
-                    # Check for opening tags of multi-line HTML elements
-                    if line_stripped.startswith('<video') and not line_stripped.endswith('</video>'):
-                        inside_html_block = True
-                        html_block_tag = 'video'
-                        # If we have accumulated text, wrap it in a paragraph
-                        if current_text_block:
-                            processed_para_lines.append(f'<p>{" ".join(current_text_block)}</p>')
-                            current_text_block = []
-                        processed_para_lines.append(line)
-                        continue
-                    elif line_stripped.startswith('<div') and not line_stripped.endswith('</div>'):
-                        inside_html_block = True
-                        html_block_tag = 'div'
-                        # If we have accumulated text, wrap it in a paragraph
-                        if current_text_block:
-                            processed_para_lines.append(f'<p>{" ".join(current_text_block)}</p>')
-                            current_text_block = []
-                        processed_para_lines.append(line)
-                        continue
-                
-                # If we're inside an HTML block, continue until we find the closing tag
-                if inside_html_block:
-                    processed_para_lines.append(line)
-                    if line_stripped.endswith(f'</{html_block_tag}>'):
-                        inside_html_block = False
-                        html_block_tag = None
-                    continue
-                
-                # Check if this line is already a single-line HTML element (including headers)
-                if (line_stripped.startswith('<h1>') or line_stripped.startswith('<h2>') or 
-                    line_stripped.startswith('<h3>') or line_stripped.startswith('<h4>') or
-                    line_stripped.startswith('<h5>') or line_stripped.startswith('<h6>') or
-                    line_stripped.startswith('<img') or 
-                    line_stripped.startswith('<ul>') or line_stripped.startswith('<li>') or
-                    line_stripped.startswith('<strong>') or line_stripped.startswith('<em>') or
-                    line_stripped.startswith('<a ') or
-                    line_stripped.endswith('</h1>') or line_stripped.endswith('</h2>') or
-                    line_stripped.endswith('</h3>') or line_stripped.endswith('</h4>') or
-                    line_stripped.endswith('</h5>') or line_stripped.endswith('</h6>') or
-                    line_stripped.endswith('</ul>') or line_stripped.endswith('</li>') or
-                    '<h1>' in line_stripped or '<h2>' in line_stripped or '<h3>' in line_stripped or
-                    '<h4>' in line_stripped or '<h5>' in line_stripped or '<h6>' in line_stripped or
-                    (line_stripped.startswith('<video') and line_stripped.endswith('</video>')) or
-                    (line_stripped.startswith('<div') and line_stripped.endswith('</div>'))):
-                    # If we have accumulated text, wrap it in a paragraph
-                    if current_text_block:
-                        processed_para_lines.append(f'<p>{" ".join(current_text_block)}</p>')
-                        current_text_block = []
-                    # Add the HTML element as-is
-                    processed_para_lines.append(line)
-                else:
-                    # Accumulate text lines that aren't HTML elements
-                    if line.strip():
-                        current_text_block.append(line.strip())
-            
-            # Handle any remaining text
-            if current_text_block:
-                processed_para_lines.append(f'<p>{" ".join(current_text_block)}</p>')
-            
-            html_paragraphs.extend(processed_para_lines)
-        else:
-            html_paragraphs.append(para)
-    
-    return '\n'.join(html_paragraphs)
+    """Convert basic markdown to HTML with media support (config.MARKDOWN_ENGINE, see markdown_engines.py)"""
+    return markdown_engine().render(content)
 
 def get_existing_nav_links() -> str:
     """Get navigation links - proper home icon structure"""
@@ -901,8 +651,24 @@ def get_existing_nav_links() -> str:
     nav_links = ['                <li><a href="../index.html" class="home-icon"><span class="house-silhouette"></span></a></li>']
     return '\n'.join(nav_links)
 
-def process_inline_media(content: str, attachments: List[Dict], title: str) -> tuple:
-    """Process content to embed media inline in exact 1:1 order from email"""
+def media_workers(files: int) -> int:
+    """Threads for `files` attachments: config.MEDIA_WORKERS, or one per CPU, and never more than there are files"""
+    return max(1, min(files, config.MEDIA_WORKERS or os.cpu_count() or 1))
+
+def save_attachments(attachments: List[Dict], title: str) -> List[Optional[str]]:
+    """Save every attachment concurrently; returns the saved paths, index-aligned with `attachments`"""
+    if not attachments:
+        return []
+    with ThreadPoolExecutor(max_workers=media_workers(len(attachments)), thread_name_prefix='media') as pool:
+        return list(pool.map(save_attachment, attachments, [title] * len(attachments)))
+
+def process_inline_media(content: str, attachments: List[Dict], title: str,
+                         saved_paths: Optional[List[Optional[str]]] = None) -> tuple:
+    """Process content to embed media inline in exact 1:1 order from email
+
+    Callers that already wrote the attachments (e.g. concurrently) pass the
+    resulting paths, index-aligned with `attachments`, as `saved_paths`.
+    """
     if not attachments:
         return content, []
     
@@ -911,10 +677,37 @@ def process_inline_media(content: str, attachments: List[Dict], title: str) -> t
     
     print(f"Processing {len(attachments)} media files for exact 1:1 positioning...")
     
-    # Save all attachments and create media HTML in order
+    # Every attachment is saved, then every image probed and given its variants, on one thread
+    # pool (Pillow releases the GIL while decoding, resizing and encoding), so an email's media
+    # takes about as long as its slowest file
+    if saved_paths is None:
+        saved_paths = save_attachments(attachments, title)
+    media_index = MediaIndex()
+    with ThreadPoolExecutor(max_workers=media_workers(len(attachments)), thread_name_prefix='media') as pool:
+        images = [i for i, attachment in enumerate(attachments)
+                  if saved_paths[i] and attachment['content_type'].startswith('image/')]
+        # The same file can be attached twice; it is prepared once
+        unique_paths = list(dict.fromkeys(saved_paths[i] for i in images))
+        prepared = pool.map(prepare_image, unique_paths, [media_index] * len(unique_paths))
+        # Videos only have their size and duration read for the media index
+        videos = [i for i, attachment in enumerate(attachments)
+                  if saved_paths[i] and attachment['content_type'] in VIDEO_TYPES]
+        unique_videos = list(dict.fromkeys(saved_paths[i] for i in videos))
+        probed = pool.map(media_index.video, [os.path.join(IMAGES_DIR, os.path.basename(path)) for path in unique_videos])
+        prepared = dict(zip(unique_paths, prepared))
+        video_info = {path: entry for path, entry in zip(unique_videos, probed) if entry}
+    media_index.save()
+    variants = {path: image_variants for path, (image_variants, _) in prepared.items() if image_variants}
+    image_info = {i: prepared[saved_paths[i]][1] for i in images}
+    
+    # Only the first image in the content can be above the fold
+    positions = {i: content.find(f"__MEDIA_PLACEHOLDER_{i}__") for i in images}
+    first_image = min(images, key=lambda i: (positions[i] < 0, positions[i], i), default=None)
+    
+    # Create media HTML in order
     media_html_map = {}
     for i, attachment in enumerate(attachments):
-        saved_path = save_attachment(attachment, title)
+        saved_path = saved_paths[i]
         if saved_path:
             saved_files.append(saved_path)
             original_filename = attachment['filename']
@@ -923,11 +716,17 @@ def process_inline_media(content: str, attachments: List[Dict], title: str) -> t
             # Create HTML for the media
             if content_type.startswith('image/'):
                 alt_text = os.path.basename(original_filename)
-                media_html = f'<img src="{saved_path}" alt="{alt_text}">'
+                lazy = i != first_image
+                if saved_path in variants:
+                    media_html = picture_html(variants[saved_path], alt_text, image_info[i], lazy)
+                else:
+                    media_html = f'<img src="{saved_path}" alt="{alt_text}"{image_attributes(image_info[i], lazy)}>'
             elif content_type.startswith('video/'):
                 # Improve video compatibility by using mp4 as primary type and original as fallback
                 primary_type = "video/mp4" if content_type == "video/quicktime" else content_type
-                media_html = f'''<video controls style="max-width: 100%; height: auto; margin: 10px 0; border-radius: 8px;" preload="metadata">
+                size = video_info.get(saved_path, {})
+                dimensions = f' width="{size["width"]}" height="{size["height"]}"' if 'width' in size else ''
+                media_html = f'''<video controls{dimensions} class="email-video" preload="metadata">
     <source src="{saved_path}" type="{primary_type}">
     <source src="{saved_path}" type="{content_type}">
     <p>Your browser doesn't support HTML video. <a href="{saved_path}">Download the video</a> instead.</p>
@@ -938,99 +737,147 @@ def process_inline_media(content: str, attachments: List[Dict], title: str) -> t
             # Store media HTML with its index for placeholder replacement
             media_html_map[i] = media_html
     
-    # Replace media placeholders with actual HTML (this preserves exact order)
-    placeholders_replaced = []
-    for i, media_html in media_html_map.items():
-        placeholder = f"__MEDIA_PLACEHOLDER_{i}__"
-        if placeholder in processed_content:
-            processed_content = processed_content.replace(placeholder, media_html)
-            placeholders_replaced.append(i)
-            print(f"Replaced media placeholder {i} with inline media at exact position")
+    # Replace media placeholders with actual HTML in one pass (this preserves exact order)
+    placeholders_replaced = set()
+    
+    def replace_placeholder(match: re.Match) -> str:
+        i = int(match.group(1))
+        if i not in media_html_map:
+            return match.group(0)
+        placeholders_replaced.add(i)
+        print(f"Replaced media placeholder {i} with inline media at exact position")
+        return media_html_map[i]
+    
+    processed_content = MEDIA_PLACEHOLDER_PATTERN.sub(replace_placeholder, processed_content)
     
     # Also handle explicit filename references for backwards compatibility (but not for already replaced placeholders)
+    references = {}
     for i, attachment in enumerate(attachments):
-        if i not in placeholders_replaced:  # Only process if placeholder wasn't already replaced
-            original_filename = attachment['filename']
-            if i in media_html_map:
-                media_html = media_html_map[i]
-                
-                # Look for explicit references to replace
-                patterns_to_replace = [
-                    original_filename,  # Direct filename reference
-                    f"[{original_filename}]",  # Markdown-style reference
-                    f"![{original_filename}]",  # Markdown image reference
-                    f"<{original_filename}>",  # Angle bracket reference
-                ]
-                
-                for pattern in patterns_to_replace:
-                    if pattern in processed_content:
-                        processed_content = processed_content.replace(pattern, media_html)
-                        print(f"Replaced '{pattern}' with inline media at exact position")
+        original_filename = attachment['filename']
+        if i in media_html_map and i not in placeholders_replaced and original_filename:
+            for reference in (f"![{original_filename}]",  # Markdown image reference
+                              f"[{original_filename}]",  # Markdown-style reference
+                              f"<{original_filename}>",  # Angle bracket reference
+                              original_filename):  # Direct filename reference
+                references.setdefault(reference, media_html_map[i])
+    if references:
+        # Longest first, so a bracketed reference is replaced whole; inserted HTML is never rescanned
+        reference_pattern = re.compile('|'.join(re.escape(reference) for reference in sorted(references, key=len, reverse=True)))
+        
+        def replace_reference(match: re.Match) -> str:
+            print(f"Replaced '{match.group(0)}' with inline media at exact position")
+            return references[match.group(0)]
+        
+        processed_content = reference_pattern.sub(replace_reference, processed_content)
+    
+    # Variants follow the originals, so the first saved file is still the first attachment
+    for image_variants in variants.values():
+        saved_files.extend(image_variants.files())
     
     return processed_content, saved_files
 
-def create_html_page(title: str, content: str, filename: str, attachments: Optional[List[Dict]] = None) -> tuple:
+def prepare_image(saved_path: str, media_index: MediaIndex) -> Tuple[Optional[Variants], Optional[Dict[str, Any]]]:
+    """Responsive variants (if enabled) and media index entry of one saved image"""
+    source = os.path.join(IMAGES_DIR, os.path.basename(saved_path))
+    entry = media_index.image(source)
+    image_variants = build_variants([saved_path]).get(saved_path) if config.IMAGE_VARIANTS else None
+    return image_variants, entry
+
+def stream_html_page(title: str, content: str, filename: str, attachments: Optional[List[Dict]] = None,
+                     saved_paths: Optional[List[Optional[str]]] = None, created: Optional[date] = None) -> tuple:
+    """Render a page with inline media embedded in content, returns (chunks, saved_files) without writing the page
+
+    Media is saved up front; the markup is only rendered as `chunks` is
+    consumed, so a page is never held in memory whole (see write_page).
+    `created` is the first-published date shown on the page; it defaults to
+    the one on record for `filename` so a rebuild reproduces the same bytes.
+    """
+    # Process attachments and embed them inline in content
+    processed_content, saved_media_files = process_inline_media(content, attachments or [], title, saved_paths)
+    
+    # Convert content to HTML lazily (this will process the embedded media HTML)
+    content_chunks = markdown_engine().stream(processed_content)
+    
+    # Get navigation links
+    nav_links = get_existing_nav_links()
+    
+    # Determine the best image for social media (first image from saved files or default)
+    page_image = DEFAULT_IMAGE  # Default fallback
+    if saved_media_files:
+        # Use the first saved image file
+        for file_path in saved_media_files:
+            if any(file_path.lower().endswith(ext) for ext in ['.jpg', '.jpeg', '.png', '.webp', '.gif']):
+                page_image = file_path.replace('../', '')
+                break
+    
+    # Extract a meaningful description from the content
+    description = extract_description(content)
+    if not description:
+        description = f"Learn about {title} in Cody's portfolio"
+    
+    # ------------------------------------------------------------------
+    # 🆕 Prefer Jinja2 template rendering (overrides legacy string above)
+    # ------------------------------------------------------------------
+    chunks = stream_template(
+        'page.html',
+        title=title,
+        description=description,
+        page_image=page_image,
+        filename=filename,
+        nav_links=nav_links,
+        content_chunks=content_chunks,
+        youtube_embeds=embeds_youtube(processed_content),
+        created_at=(created or first_published(filename)).strftime('%B %d, %Y')
+    )
+    # Minify last, as the page streams out
+    if config.MINIFY_HTML:
+        chunks = MinifiedStream(chunks)
+    return chunks, saved_media_files
+
+def build_html_page(title: str, content: str, filename: str, attachments: Optional[List[Dict]] = None,
+                    saved_paths: Optional[List[Optional[str]]] = None, created: Optional[date] = None) -> tuple:
+    """Render a page with inline media embedded in content, returns (html, saved_files) without writing the page"""
+    chunks, saved_media_files = stream_html_page(title, content, filename, attachments, saved_paths, created)
+    return ''.join(chunks), saved_media_files
+
+def write_page(filepath: str, chunks: Iterable[str]):
+    """Stream `chunks` into a temp file beside `filepath`, then rename it into place
+
+    Readers (and a crash halfway through rendering) only ever see the old
+    page or the complete new one.
+    """
+    # Two renders of one page (job queue workers, bulk import) never share a temp file
+    tmp_path = f"{filepath}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.writelines(chunks)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def report_minified(filepath: str, chunks: Iterable[str]):
+    """Print the bytes minification took off a file just written from `chunks`"""
+    if isinstance(chunks, MinifiedStream) and chunks.bytes_saved:
+        saved = chunks.bytes_saved
+        total = os.path.getsize(filepath) + saved
+        print(f"Minified {os.path.basename(filepath)}: {saved:,} of {total:,} bytes saved ({saved / total:.0%})")
+
+def write_index(content: str, index_path: str = "../index.html"):
+    """Write the home page through a temp file (see write_page)
+
+    index.html is hand-maintained source that tiles are spliced into, so it
+    is written verbatim: minifying it would strip its indentation and the
+    comments the tile code looks for. MINIFY_HTML applies to Pages/ only.
+    """
+    write_page(index_path, [content])
+
+def create_html_page(title: str, content: str, filename: str, attachments: Optional[List[Dict]] = None,
+                     created: Optional[date] = None, saved_paths: Optional[List[Optional[str]]] = None) -> tuple:
     """Create HTML page with inline media embedded in content, returns (success, saved_files)"""
     try:
-        # Process attachments and embed them inline in content
-        processed_content, saved_media_files = process_inline_media(content, attachments or [], title)
-        
-        # Convert content to HTML (this will process the embedded media HTML)
-        content_html = markdown_to_html(processed_content)
-        
-        # Get navigation links
-        nav_links = get_existing_nav_links()
-        
-        # Determine the best image for social media (first image from saved files or default)
-        page_image = DEFAULT_IMAGE  # Default fallback
-        if saved_media_files:
-            # Use the first saved image file
-            for file_path in saved_media_files:
-                if any(file_path.lower().endswith(ext) for ext in ['.jpg', '.jpeg', '.png', '.webp', '.gif']):
-                    page_image = file_path.replace('../', '')
-                    break
-        
-        # Extract a meaningful description from the content
-        description = extract_description(content)
-        if not description:
-            description = f"Learn about {title} in Cody's portfolio"
-        
-        # CSS for responsive device styling
-        responsive_css = """
-        /* Desktop-only content: visible on screens 769px and larger */
-        @media (min-width: 769px) {
-            .desktop-only {
-                display: block !important;
-            }
-            .mobile-only {
-                display: none !important;
-            }
-        }
-        
-        /* Mobile-only content: visible on screens 768px and smaller */
-        @media (max-width: 768px) {
-            .desktop-only {
-                display: none !important;
-            }
-            .mobile-only {
-                display: block !important;
-            }
-        }"""
-        
-        # ------------------------------------------------------------------
-        # 🆕 Prefer Jinja2 template rendering (overrides legacy string above)
-        # ------------------------------------------------------------------
-        html_template = render_template(
-            'page.html',
-            title=title,
-            description=description,
-            page_image=page_image,
-            filename=filename,
-            nav_links=nav_links,
-            content_html=content_html,
-            responsive_css=responsive_css,
-            created_at=datetime.now().strftime('%B %d, %Y')
-        )
+        chunks, saved_media_files = stream_html_page(title, content, filename, attachments, saved_paths, created)
         
         # Write to Pages directory
         pages_dir = PAGES_DIR
@@ -1038,10 +885,10 @@ def create_html_page(title: str, content: str, filename: str, attachments: Optio
             os.makedirs(pages_dir)
         
         filepath = os.path.join(pages_dir, filename)
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(html_template)
+        write_page(filepath, chunks)
         
         print(f"Successfully created: {filepath}")
+        report_minified(filepath, chunks)
         if saved_media_files:
             print(f"Saved {len(saved_media_files)} media files: {', '.join(os.path.basename(f) for f in saved_media_files)}")
         
@@ -1072,8 +919,7 @@ def update_main_index_navigation():
         updated_content = re.sub(nav_pattern, new_nav, content, flags=re.DOTALL)
         
         # Write back
-        with open(index_path, 'w', encoding='utf-8') as f:
-            f.write(updated_content)
+        write_index(updated_content, index_path)
         
         print("Updated navigation in main index.html")
         return True
@@ -1103,23 +949,8 @@ def add_research_tile(title: str, description: str, filename: str, tile_image: O
             with open(index_path, 'r', encoding='utf-8') as f:
                 content = f.read()
         
-        # Clean description - remove any media placeholders
-        if description:
-            description = re.sub(r'__MEDIA_PLACEHOLDER_\d+__', '', description).strip()
-        else:
-            description = f"Learn about {title} in Cody's portfolio"
-        
-        # Set default image if none provided
-        if not tile_image:
-            tile_image = DEFAULT_IMAGE  # Default fallback image
-        
         # Prepare new tile HTML
-        tile_html = f'''            <div class="project">
-                <img src="{tile_image}" alt="{html.escape(title)}">
-                <h3>{html.escape(title)}</h3>
-                <p>{html.escape(description)}</p>
-                <a href="Pages/{filename}">Read On...</a>
-            </div>'''
+        tile_html = build_tile_html(title, description, filename, tile_image)
         
         # More flexible approach - find the project container without requiring specific comment format
         if '<div id="project-container" class="project-container">' in content:
@@ -1138,9 +969,8 @@ def add_research_tile(title: str, description: str, filename: str, tile_image: O
             
             print(f"DEBUG: Inserting tile at position {end_of_div_tag}")
             
-            # Write updated content
-            with open(index_path, 'w', encoding='utf-8') as f:
-                f.write(updated_content)
+            # Write updated content; the tile pushed out of the first row now loads lazily
+            write_index(mark_lazy_tiles(updated_content), index_path)
                 
             print(f"Successfully added research tile for: {title}")
             return True
@@ -1153,69 +983,129 @@ def add_research_tile(title: str, description: str, filename: str, tile_image: O
         print(f"Error adding research tile: {e}")
         return False
 
-def commit_and_push_changes(filename: str, title: str, media_files: Optional[List[str]] = None) -> bool:
-    """Commit and push the new page and media files to GitHub"""
+def build_tile_html(title: str, description: str, filename: str, tile_image: Optional[str] = None) -> str:
+    """Return the markup for one Research tile"""
+    # Clean description - remove any media placeholders
+    if description:
+        description = re.sub(r'__MEDIA_PLACEHOLDER_\d+__', '', description).strip()
+    else:
+        description = f"Learn about {title} in Cody's portfolio"
+    
+    # Set default image if none provided
+    if not tile_image:
+        tile_image = DEFAULT_IMAGE  # Default fallback image
+    
+    return f'''            <div class="project">
+                {tile_img_html(tile_image, html.escape(title), lazy=False)}
+                <h3>{html.escape(title)}</h3>
+                <p>{html.escape(description)}</p>
+                <a href="Pages/{filename}">Read On...</a>
+            </div>'''
+
+def add_research_tiles(pages: List[Dict[str, Any]]) -> bool:
+    """Add tiles for many pages with a single index.html rewrite.
+
+    `pages` holds render_page_from_parsed results ordered oldest first, so
+    the result matches calling add_research_tile once per page.
+    """
     try:
-        # Change to the main directory (parent of MCP)
-        main_dir = ".."
+        index_path = "../index.html"
+        if not os.path.exists(index_path):
+            print(f"Warning: Index file not found at {index_path}")
+            return False
         
-        # Add the new page file
-        result = subprocess.run([
-            'git', 'add', f'Pages/{filename}'
-        ], cwd=main_dir, capture_output=True, text=True)
+        with open(index_path, 'r', encoding='utf-8') as f:
+            content = f.read()
         
-        if result.returncode != 0:
-            print(f"Git add page failed: {result.stderr}")
+        # Drop tiles that are about to be replaced
+        for page in pages:
+            content, _ = remove_tile_markup(content, page["filename"])
+        
+        container_tag = '<div id="project-container" class="project-container">'
+        container_index = content.find(container_tag)
+        if container_index == -1:
+            print("Could not find insertion point for tiles")
             return False
+        end_of_div_tag = content.find('>', container_index) + 1
         
-        # Add index.html if it was modified (for research tiles)
-        result = subprocess.run([
-            'git', 'add', 'index.html'
-        ], cwd=main_dir, capture_output=True, text=True)
+        # Newest first, each with the same marker comment add_research_tile writes
+        new_tiles = ''.join(
+            '\n              <!-- Project items -->\n' +
+            build_tile_html(page["title"], page["description"], page["filename"], page.get("tile_image"))
+            for page in reversed(pages)
+        )
+        updated_content = content[:end_of_div_tag] + new_tiles + content[end_of_div_tag:]
         
-        if result.returncode != 0:
-            print(f"Git add index.html failed: {result.stderr}")
-            # Continue anyway, this is not critical
-        
-        # Add media files if any
-        if media_files:
-            for media_file in media_files:
-                # Convert relative path to git path
-                git_path = media_file.replace('../', '')
-                result = subprocess.run([
-                    'git', 'add', git_path
-                ], cwd=main_dir, capture_output=True, text=True)
-                
-                if result.returncode != 0:
-                    print(f"Git add media failed for {git_path}: {result.stderr}")
-                    # Continue with other files
+        write_index(mark_lazy_tiles(updated_content), index_path)
         
-        # Commit the changes
-        if media_files:
-            commit_message = f"Add new page with media: {title}\n\nAutomatically generated from email\nIncludes {len(media_files)} media file(s)"
-        else:
-            commit_message = f"Add new page: {title}\n\nAutomatically generated from email"
-            
-        result = subprocess.run([
-            'git', 'commit', '-m', commit_message
-        ], cwd=main_dir, capture_output=True, text=True)
+        print(f"Successfully added {len(pages)} research tiles")
+        return True
         
+    except Exception as e:
+        print(f"Error adding research tiles: {e}")
+        return False
+
+def media_state_paths() -> List[str]:
+    """Repository paths of the media index and the manifest, which always change together"""
+    return [os.path.relpath(str(path), str(config.BASE_DIR)) for path in (config.MEDIA_INDEX_PATH, config.MEDIA_MANIFEST_PATH)]
+
+def state_paths() -> List[str]:
+    """Repository paths of the state files every publish commits: render cache, title index, media index and manifest"""
+    return [os.path.relpath(str(path), str(config.BASE_DIR))
+            for path in (config.RENDER_CACHE_PATH, config.TITLE_INDEX_PATH)] + media_state_paths()
+
+def commit_and_push_changes(filename: str, title: str, media_files: Optional[List[str]] = None) -> bool:
+    """Commit and push the new page and media files to GitHub"""
+    paths = [f'Pages/{filename}', 'index.html'] + state_paths()
+    # Convert relative media paths to git paths
+    paths.extend(media_file.replace('../', '') for media_file in media_files or [])
+
+    if media_files:
+        commit_message = f"Add new page with media: {title}\n\nAutomatically generated from email\nIncludes {len(media_files)} media file(s)"
+    else:
+        commit_message = f"Add new page: {title}\n\nAutomatically generated from email"
+
+    if not commit_and_push_paths(paths, commit_message):
+        return False
+    if media_files:
+        print(f"Pushed {len(media_files)} media files along with the page")
+    return True
+
+def commit_and_push_paths(paths: List[str], commit_message: str) -> bool:
+    """Stage `paths` (relative to the repo root), make one commit and push it"""
+    try:
+        main_dir = ".."
+
+        # Drop paths git never saw that are gone again (page created, then deleted)
+        tracked = subprocess.run(['git', 'ls-files', '--'] + paths, cwd=main_dir, capture_output=True, text=True)
+        tracked_paths = set(tracked.stdout.splitlines())
+        paths = [p for p in paths if p in tracked_paths or os.path.exists(os.path.join(main_dir, p))]
+
+        # git add accepts many paths at once; one call keeps large imports fast
+        result = subprocess.run(['git', 'add', '--'] + paths, cwd=main_dir, capture_output=True, text=True)
         if result.returncode != 0:
-            print(f"Git commit failed: {result.stderr}")
+            print(f"Git add failed: {result.stderr}")
             return False
+
+        # Nothing staged means an earlier attempt already committed; just retry the push.
+        # Both look at `paths` only, so whatever else is staged stays out of this commit
+        staged = subprocess.run(['git', 'diff', '--cached', '--quiet', '--'] + paths, cwd=main_dir,
+                                capture_output=True, text=True)
+        if not paths or staged.returncode == 0:
+            print("Nothing new to commit, pushing existing commits")
+        else:
+            result = subprocess.run(['git', 'commit', '-m', commit_message, '--'] + paths, cwd=main_dir,
+                                    capture_output=True, text=True)
+            if result.returncode != 0:
+                print(f"Git commit failed: {result.stderr}")
+                return False
         
-        # Push to GitHub
-        result = subprocess.run([
-            'git', 'push'
-        ], cwd=main_dir, capture_output=True, text=True)
-        
+        result = subprocess.run(['git', 'push'], cwd=main_dir, capture_output=True, text=True)
         if result.returncode != 0:
             print(f"Git push failed: {result.stderr}")
             return False
         
-        print(f"Successfully pushed '{title}' to GitHub!")
-        if media_files:
-            print(f"Pushed {len(media_files)} media files along with the page")
+        print(f"Successfully pushed {len(paths)} path(s) to GitHub!")
         return True
         
     except Exception as e:
@@ -1264,12 +1154,32 @@ def delete_page_and_tile(page_identifier: str) -> bool:
         else:
             print(f"Warning: Could not remove tile from home page")
         
+        # Re-sending the same draft publishes the page again
+        from title_index import TitleVersionIndex  # title_index imports this module
+        title_index = TitleVersionIndex()
+        title_index.forget(filename)
+        title_index.save()
+        
         return True
         
     except Exception as e:
         print(f"Error deleting page and tile: {e}")
         return False
 
+def remove_tile_markup(content: str, filename: str) -> Tuple[str, bool]:
+    """Remove the tile linking to Pages/<filename> from index.html content"""
+    # Look for the tile with the specific filename
+    tile_pattern = rf'<div class="project">\s*<img[^>]*>\s*<h3>[^<]*</h3>\s*<p>[^<]*</p>\s*<a href="Pages/{re.escape(filename)}"[^>]*>Read On\.\.\.</a>\s*</div>'
+    anchor_pattern = rf'<a href="Pages/{re.escape(filename)}"'
+
+    # Only the tile opener nearest each link is tried, so a large index with
+    # many tiles stays a single pass
+    span = find_tile(content, TILE_OPEN, re.compile(anchor_pattern, re.IGNORECASE),
+                     re.compile(tile_pattern, re.DOTALL | re.IGNORECASE))
+    if not span:
+        return content, False
+    return content.replace(content[span[0]:span[1]], ''), True
+
 def remove_research_tile(filename: str, title: Optional[str] = None) -> bool:
     """Remove a research tile from the home page"""
     try:
@@ -1284,19 +1194,11 @@ def remove_research_tile(filename: str, title: Optional[str] = None) -> bool:
             content = f.read()
         
         # Find and remove the tile
-        # Look for the tile with the specific filename
-        tile_pattern = rf'<div class="project">\s*<img[^>]*>\s*<h3>[^<]*</h3>\s*<p>[^<]*</p>\s*<a href="Pages/{re.escape(filename)}"[^>]*>Read On\.\.\.</a>\s*</div>'
+        updated_content, removed = remove_tile_markup(content, filename)
         
-        # Try to find the tile
-        match = re.search(tile_pattern, content, re.DOTALL | re.IGNORECASE)
-        
-        if match:
-            # Remove the tile
-            updated_content = content.replace(match.group(0), '')
-            
-            # Write back
-            with open(index_path, 'w', encoding='utf-8') as f:
-                f.write(updated_content)
+        if removed:
+            # Write back; a tile may have moved up into the first row
+            write_index(mark_lazy_tiles(updated_content), index_path)
             
             print(f"Removed tile for: {filename}")
             return True
@@ -1362,61 +1264,150 @@ def is_delete_command(subject: str, content: str) -> tuple[bool, str]:
 
 def commit_delete_changes(filename: str, title: str) -> bool:
     """Commit and push page deletion to GitHub"""
+    # Staging the missing page records its removal; the title index entry is gone too
+    paths = [f'Pages/{filename}', 'index.html'] + state_paths()
+    commit_message = f"Delete page: {title or filename}\n\nAutomatically deleted via email command\nRemoved page and corresponding home page tile"
+    return commit_and_push_paths(paths, commit_message)
+
+def find_tile_image(parsed: Dict[str, Any], saved_media_files: List[str], saved_paths: List[Optional[str]]) -> str:
+    """Pick the home page tile image: the first image in email body order
+
+    `saved_paths` are the paths save_attachment returned, index-aligned with
+    the parsed attachments.
+    """
+    # Find the first image in the email body order (not just first in attachments)
+    tile_image = None
+    ordered_content = parsed.get("ordered_content", [])
+    attachments = parsed.get("attachments", [])
+    
+    print(f"DEBUG: Found {len(ordered_content)} ordered content items")
+    print(f"DEBUG: Found {len(attachments)} attachments")
+    
+    # Look through ordered content to find the first image
+    for item in ordered_content:
+        if item.get('type') == 'media':
+            attachment_index = item.get('attachment_index')
+            if attachment_index is not None and attachment_index < len(attachments):
+                attachment = attachments[attachment_index]
+                print(f"DEBUG: Checking attachment {attachment_index}: {attachment.get('filename')} - {attachment.get('content_type')}")
+                
+                if attachment.get('content_type', '').startswith('image/') and saved_paths[attachment_index]:
+                    # Found the first image in body order
+                    tile_image = saved_paths[attachment_index].replace('../', '')
+                    print(f"DEBUG: Found first image: {tile_image}")
+                    
+                    # Once we find the first image, we're done
+                    break
+                    
+    # If no image was found in the content order, look directly at saved media files for images
+    if not tile_image and saved_media_files:
+        for saved_file in saved_media_files:
+            if any(saved_file.lower().endswith(ext) for ext in ['.jpg', '.jpeg', '.png', '.gif', '.webp']):
+                tile_image = saved_file.replace('../', '')
+                print(f"DEBUG: Using first saved image file: {tile_image}")
+                break
+    
+    return tile_image or DEFAULT_IMAGE  # Default fallback image
+
+def render_page_from_parsed(parsed: Dict[str, Any], render_cache: Optional[RenderCache] = None) -> Optional[Dict[str, Any]]:
+    """Write the page and media for a parsed email, leaving index.html and git alone.
+
+    Returns the fields needed for the page's home page tile, or None on failure.
+    When the render cache says the page is already built from identical
+    inputs nothing is written and the cached fields come back with "cached"
+    set; new renders carry the "cache_key" to store once published.
+    """
+    filename = sanitize_filename(parsed["title"])
+    render_cache = render_cache or RenderCache()
+    key = render_key('simple', parsed)
+    cached = render_cache.lookup(filename, key)
+    if cached:
+        print(f"Unchanged since last render, leaving Pages/{filename} untouched")
+        return cached
+    created = first_published(filename, render_cache)
+    
+    # Create HTML page with attachments
+    saved_paths = save_attachments(parsed.get("attachments") or [], parsed["title"])
+    success, saved_media_files = create_html_page(parsed["title"], parsed["content"], filename, parsed.get("attachments"),
+                                                  created, saved_paths)
+    if not success:
+        return None
+    
+    # Always describe the tile: auto-generate from content if [Description] was not provided
+    description = parsed.get("description", "")
+    if not description:
+        description = generate_description_from_content(parsed["content"], parsed["title"])
+    
+    # The tile's thumbnail is published along with the page's media
+    tile_image = find_tile_image(parsed, saved_media_files, saved_paths)
+    saved_media_files = saved_media_files + thumbnail_files(tile_image)
+    
+    return {
+        "title": parsed["title"],
+        "filename": filename,
+        "description": description,
+        "tile_image": tile_image,
+        "saved_files": saved_media_files,
+        "cache_key": key,
+        "created": created.isoformat(),
+        "source": page_source('simple', parsed, saved_paths),
+    }
+
+def page_source(builder: str, parsed: Dict[str, Any], saved_paths: List[Optional[str]]) -> Dict[str, Any]:
+    """What verify_pages.py needs to rebuild a page: the parsed email, with attachments as saved paths"""
+    return {
+        "builder": builder,
+        "engine": config.MARKDOWN_ENGINE,
+        "minified": config.MINIFY_HTML,
+        "image_variants": config.IMAGE_VARIANTS,
+        "title": parsed["title"],
+        "description": parsed.get("description", ""),
+        "content": parsed["content"],
+        "attachments": [
+            {
+                "filename": attachment["filename"],
+                "content_type": attachment["content_type"],
+                "path": path,
+            }
+            for attachment, path in zip(parsed.get("attachments") or [], saved_paths)
+        ],
+    }
+
+def has_research_tile(filename: str) -> bool:
+    """True when index.html already has a tile linking to Pages/<filename>"""
     try:
-        # Change to the main directory (parent of MCP)
-        main_dir = ".."
-        
-        # Remove the deleted page file from git
-        result = subprocess.run([
-            'git', 'rm', f'Pages/{filename}'
-        ], cwd=main_dir, capture_output=True, text=True)
-        
-        if result.returncode != 0:
-            print(f"Git rm page failed: {result.stderr}")
-            return False
-        
-        # Add updated index.html (for tile removal)
-        result = subprocess.run([
-            'git', 'add', 'index.html'
-        ], cwd=main_dir, capture_output=True, text=True)
-        
-        if result.returncode != 0:
-            print(f"Git add index.html failed: {result.stderr}")
-            return False
-        
-        # Commit the changes
-        commit_message = f"Delete page: {title or filename}\n\nAutomatically deleted via email command\nRemoved page and corresponding home page tile"
-            
-        result = subprocess.run([
-            'git', 'commit', '-m', commit_message
-        ], cwd=main_dir, capture_output=True, text=True)
-        
-        if result.returncode != 0:
-            print(f"Git commit failed: {result.stderr}")
-            return False
-        
-        # Push to GitHub
-        result = subprocess.run([
-            'git', 'push'
-        ], cwd=main_dir, capture_output=True, text=True)
-        
-        if result.returncode != 0:
-            print(f"Git push failed: {result.stderr}")
-            return False
-        
-        print(f"Successfully pushed deletion of '{title or filename}' to GitHub!")
-        return True
-        
-    except Exception as e:
-        print(f"Error with git operations: {e}")
+        with open("../index.html", 'r', encoding='utf-8') as f:
+            return remove_tile_markup(f.read(), filename)[1]
+    except OSError:
         return False
 
+def store_rendered_pages(pages: List[Dict[str, Any]], render_cache: Optional[RenderCache] = None):
+    """Record freshly written pages in the render cache (call from the single index.html writer)"""
+    render_cache = render_cache or RenderCache()
+    for page in pages:
+        if not page.get("cached"):
+            render_cache.store(page)
+    render_cache.save()
+
 def process_email_to_page(email_content: str) -> bool:
     """Process email content - either create web page or delete existing page"""
     try:
         # Parse email
         parsed = parse_email_content(email_content)
-        
+        return process_parsed_email(parsed)
+
+    except Exception as e:
+        print(f"Error processing email: {e}")
+        return False
+
+def process_parsed_email(parsed: Dict[str, Any]) -> bool:
+    """Publish an email already run through parse_email_content.
+
+    Split out of process_email_to_page so callers that parse off the main
+    thread (ingest_server.py) can still share the publish half, which
+    touches index.html and git and therefore must not run concurrently.
+    """
+    try:
         # Check if this is a delete command
         is_delete, page_identifier = is_delete_command(parsed["title"], parsed["content"])
         
@@ -1451,86 +1442,23 @@ def process_email_to_page(email_content: str) -> bool:
                 return False
         
         # Regular page creation logic
-        # Generate filename
-        filename = sanitize_filename(parsed["title"])
+        page = render_page_from_parsed(parsed)
         
-        # Create HTML page with attachments
-        success, saved_media_files = create_html_page(parsed["title"], parsed["content"], filename, parsed.get("attachments"))
+        if page and page.get("cached") and has_research_tile(page["filename"]):
+            print(f"✅ Page '{parsed['title']}' is unchanged; nothing to publish")
+            return True
         
-        if success:
+        if page:
+            filename = page["filename"]
+            description = page["description"]
+            saved_media_files = page["saved_files"]
+            store_rendered_pages([page])
             
             # Update navigation
             update_main_index_navigation()
             
-            # Always add research tile to home page (FIXED: no longer conditional on description)
-            description = parsed.get("description", "")
-            if not description:
-                # Auto-generate description from content if not provided
-                description = generate_description_from_content(parsed["content"], parsed["title"])
-            
-            # Find the first image in the email body order (not just first in attachments)
-            tile_image = DEFAULT_IMAGE  # Default fallback image
-            ordered_content = parsed.get("ordered_content", [])
-            attachments = parsed.get("attachments", [])
-            
-            print(f"DEBUG: Found {len(ordered_content)} ordered content items")
-            print(f"DEBUG: Found {len(attachments)} attachments")
-            
-            # Look through ordered content to find the first image
-            for item in ordered_content:
-                if item.get('type') == 'media':
-                    attachment_index = item.get('attachment_index')
-                    if attachment_index is not None and attachment_index < len(attachments):
-                        attachment = attachments[attachment_index]
-                        print(f"DEBUG: Checking attachment {attachment_index}: {attachment.get('filename')} - {attachment.get('content_type')}")
-                        
-                        if attachment.get('content_type', '').startswith('image/'):
-                            # Found the first image in body order - get its saved path
-                            page_prefix = re.sub(r'[^a-zA-Z0-9]', '_', parsed["title"].lower())[:20]
-                            # Sanitize attachment filename the same way save_attachment does
-                            sanitized_attachment_filename = re.sub(r'[^a-zA-Z0-9._-]', '_', attachment['filename'])
-                            expected_filename = f"{page_prefix}_{sanitized_attachment_filename}"
-                            
-                            print(f"DEBUG: Found first image: {expected_filename}")
-                            
-                            # Check if file exists directly in the saved files
-                            for saved_file in saved_media_files:
-                                base_saved_file = os.path.basename(saved_file)
-                                print(f"DEBUG: Checking saved file: {base_saved_file}")
-                                
-                                if base_saved_file == expected_filename:
-                                    tile_image = saved_file.replace('../', '')
-                                    print(f"DEBUG: MATCH! Setting tile image to: {tile_image}")
-                                    break
-                            
-                            # If we didn't find an exact match, check for partial filename matches
-                            if not tile_image:
-                                for saved_file in saved_media_files:
-                                    base_saved_file = os.path.basename(saved_file)
-                                    # Check if sanitized filename is part of saved file
-                                    if sanitized_attachment_filename in base_saved_file:
-                                        tile_image = saved_file.replace('../', '')
-                                        print(f"DEBUG: Partial Match! Setting tile image to: {tile_image}")
-                                        break
-                            
-                            # If we still didn't find a match, use the expected path
-                            if not tile_image:
-                                tile_image = f"images/{expected_filename}"
-                                print(f"DEBUG: No match found, defaulting to expected path: {tile_image}")
-                                
-                            # Once we find the first image, we're done
-                            break
-                            
-            # If no image was found in the content order, look directly at saved media files for images
-            if not tile_image and saved_media_files:
-                for saved_file in saved_media_files:
-                    if any(saved_file.lower().endswith(ext) for ext in ['.jpg', '.jpeg', '.png', '.gif', '.webp']):
-                        tile_image = saved_file.replace('../', '')
-                        print(f"DEBUG: Using first saved image file: {tile_image}")
-                        break
-            
             # ALWAYS create the tile (this was the main bug - tiles only created with [Description])
-            add_research_tile(parsed["title"], description, filename, tile_image)
+            add_research_tile(parsed["title"], description, filename, page["tile_image"])
             print(f"✅ Research tile added to home page: {parsed['title']} - {description}")
             
             # Check if we're running in GitHub Actions
@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""
+SVG Optimizer for Portfolio Website
+SVGs straight out of an editor carry a lot the browser never uses: editor
+metadata and namespaces (Inkscape, Sodipodi, Illustrator, Sketch, RDF),
+comments, coordinates with six or more decimals, chains of transforms and
+gradients nobody references. They can also carry script, which runs with
+the site's origin when the file is opened directly.
+
+optimize_svg() parses the file and:
+- drops <metadata>, comments, editor elements and attributes, and the
+  whitespace between elements (text content is left alone)
+- rounds path data, points and numeric attributes to config.SVG_PRECISION
+  decimals, writing path data in its shortest form
+- collapses each transform list into a single transform (or none)
+- removes <defs> children that nothing references
+- removes <script>, <foreignObject>, on* handlers, javascript: links and
+  animations that set them
+
+save_attachment runs it on every attached SVG before storing it, and the
+media index records the bytes saved. This script does the same for the
+hand-placed SVGs in images/, rewriting them in place (content-addressed
+files are left alone, see optimize_files):
+
+Usage:
+    python svg_optimizer.py [--dry-run] [--no-commit]
+"""
+
+import os
+import re
+import sys
+import math
+import logging
+import threading
+import argparse
+import xml.etree.ElementTree as ET
+from typing import Dict, List, Optional, Set, Tuple
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from media_index import MediaIndex
+from media_store import is_stored_name
+
+try:
+    import config  # Local import when running from CMS directory
+except ModuleNotFoundError:
+    from . import config  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+SVG_NS = 'http://www.w3.org/2000/svg'
+XLINK_NS = 'http://www.w3.org/1999/xlink'
+ET.register_namespace('', SVG_NS)
+ET.register_namespace('xlink', XLINK_NS)
+
+# Namespaces only editors read
+EDITOR_NAMESPACES = (
+    'http://www.inkscape.org/namespaces/inkscape',
+    'http://sodipodi.sourceforge.net/DTD/sodipodi-0.dtd',
+    'http://www.bohemiancoding.com/sketch/ns',
+    'http://ns.adobe.com/',
+    'http://www.serif.com/',
+    'http://www.w3.org/1999/02/22-rdf-syntax-ns#',
+    'http://creativecommons.org/ns#',
+    'http://purl.org/dc/elements/1.1/',
+)
+
+UNSAFE_ELEMENTS = {'script', 'foreignObject'}
+ANIMATION_ELEMENTS = {'animate', 'set', 'animateMotion', 'animateTransform'}
+# Whitespace inside these is content
+TEXT_ELEMENTS = {'text', 'tspan', 'textPath', 'style', 'title', 'desc'}
+
+NUMERIC_ATTRIBUTES = {'x', 'y', 'width', 'height', 'cx', 'cy', 'r', 'rx', 'ry', 'fx', 'fy',
+                      'x1', 'y1', 'x2', 'y2', 'stroke-width', 'offset'}
+TRANSFORM_ATTRIBUTES = {'transform', 'gradientTransform', 'patternTransform'}
+
+NUMBER = re.compile(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+SEPARATOR = re.compile(r'[\s,]*')
+UNIT_NUMBER = re.compile(rf'({NUMBER.pattern})(px|%|em|ex|pt|mm|cm|in)?')
+TRANSFORM = re.compile(r'\s*(matrix|translate|scale|rotate|skewX|skewY)\s*\(([^)]*)\)[\s,]*')
+REFERENCE = re.compile(r'url\(\s*[\'"]?#([^\'")\s]+)')
+UNSAFE_URL = re.compile(r'^(?:javascript|vbscript|data:text/html)', re.IGNORECASE)
+
+# Arguments taken by each path command
+PATH_ARGUMENTS = {'m': 2, 'l': 2, 'h': 1, 'v': 1, 'c': 6, 's': 4, 'q': 4, 't': 2, 'a': 7, 'z': 0}
+# Matrix entries keep more decimals than coordinates: they multiply them
+MATRIX_EXTRA_PRECISION = 2
+
+Matrix = Tuple[float, float, float, float, float, float]
+IDENTITY: Matrix = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+
+def local_name(name: str) -> str:
+    return name.rsplit('}', 1)[-1]
+
+
+def namespace(name: str) -> str:
+    return name[1:].split('}', 1)[0] if name.startswith('{') else ''
+
+
+def is_editor_name(name: str) -> bool:
+    return namespace(name).startswith(EDITOR_NAMESPACES)
+
+
+def number(value: float, precision: int) -> str:
+    """Shortest text for `value` rounded to `precision` decimals: 0.500 -> .5, -0.0 -> 0"""
+    text = f"{round(value, precision):.{precision}f}"
+    if '.' in text:
+        text = text.rstrip('0').rstrip('.')
+    if text in ('-0', ''):
+        return '0'
+    if text.startswith('0.'):
+        return text[1:]
+    if text.startswith('-0.'):
+        return '-' + text[2:]
+    return text
+
+
+def join_tokens(tokens: List[str]) -> str:
+    """Numbers (and path command letters) with a separator only where the parser needs one"""
+    parts = []
+    previous = ''
+    for token in tokens:
+        if previous and not token[0].isalpha() and not previous[-1].isalpha() and not token.startswith('-'):
+            # A number has one point, so "1.5.5" reads as 1.5 and .5, but "1" and ".5" need the space
+            if not (token.startswith('.') and '.' in previous):
+                parts.append(' ')
+        parts.append(token)
+        previous = token
+    return ''.join(parts)
+
+
+def parse_path(d: str) -> Optional[List[Tuple[str, List[float]]]]:
+    """Path data as (command, arguments) pairs, implicit repeats made explicit; None if it doesn't parse"""
+    commands: List[Tuple[str, List[float]]] = []
+    command = None
+    pos = 0
+    while True:
+        pos = SEPARATOR.match(d, pos).end()
+        if pos >= len(d):
+            return commands
+        if d[pos].isalpha():
+            command = d[pos]
+            pos += 1
+            if command.lower() not in PATH_ARGUMENTS:
+                return None
+            if command.lower() == 'z':
+                commands.append((command, []))
+                continue
+        elif command is None or command.lower() == 'z':
+            return None
+        arguments: List[float] = []
+        for k in range(PATH_ARGUMENTS[command.lower()]):
+            pos = SEPARATOR.match(d, pos).end()
+            if command.lower() == 'a' and k in (3, 4):
+                # Arc flags are one digit and need no separator: "a1 1 0 0110 10"
+                if pos >= len(d) or d[pos] not in '01':
+                    return None
+                arguments.append(float(d[pos]))
+                pos += 1
+                continue
+            match = NUMBER.match(d, pos)
+            if not match:
+                return None
+            arguments.append(float(match.group()))
+            pos = match.end()
+        commands.append((command, arguments))
+        # Coordinates after a moveto are linetos
+        if command in 'Mm':
+            command = 'l' if command == 'm' else 'L'
+
+
+def format_path(commands: List[Tuple[str, List[float]]], precision: int) -> str:
+    tokens = []
+    previous = None
+    for command, arguments in commands:
+        # A repeated command (or a lineto after a moveto) needs no letter; coordinates after a
+        # moveto are linetos, so a second moveto does
+        repeated = command == previous and command not in 'Mm'
+        if command in 'Zz' or not (repeated or (previous, command) in (('M', 'L'), ('m', 'l'))):
+            tokens.append(command)
+        tokens += [str(int(value)) if command in 'Aa' and k in (3, 4) else number(value, precision)
+                   for k, value in enumerate(arguments)]
+        previous = command
+    return join_tokens(tokens)
+
+
+def multiply(m: Matrix, n: Matrix) -> Matrix:
+    a1, b1, c1, d1, e1, f1 = m
+    a2, b2, c2, d2, e2, f2 = n
+    return (a1 * a2 + c1 * b2, b1 * a2 + d1 * b2, a1 * c2 + c1 * d2, b1 * c2 + d1 * d2,
+            a1 * e2 + c1 * f2 + e1, b1 * e2 + d1 * f2 + f1)
+
+
+def transform_matrix(name: str, values: List[float]) -> Matrix:
+    if name == 'matrix' and len(values) == 6:
+        return tuple(values)  # type: ignore
+    if name == 'translate' and len(values) in (1, 2):
+        return (1.0, 0.0, 0.0, 1.0, values[0], values[1] if len(values) == 2 else 0.0)
+    if name == 'scale' and len(values) in (1, 2):
+        return (values[0], 0.0, 0.0, values[-1], 0.0, 0.0)
+    if name == 'rotate' and len(values) in (1, 3):
+        angle = math.radians(values[0])
+        cos, sin = math.cos(angle), math.sin(angle)
+        rotation = (cos, sin, -sin, cos, 0.0, 0.0)
+        if len(values) == 1:
+            return rotation
+        cx, cy = values[1], values[2]
+        return multiply(multiply((1.0, 0.0, 0.0, 1.0, cx, cy), rotation), (1.0, 0.0, 0.0, 1.0, -cx, -cy))
+    if name == 'skewX' and len(values) == 1:
+        return (1.0, 0.0, math.tan(math.radians(values[0])), 1.0, 0.0, 0.0)
+    if name == 'skewY' and len(values) == 1:
+        return (1.0, math.tan(math.radians(values[0])), 0.0, 1.0, 0.0, 0.0)
+    raise ValueError(f"bad {name}() transform")
+
+
+def collapse_transform(value: str, precision: int) -> Optional[str]:
+    """A transform list as one transform, '' when it does nothing; None if it doesn't parse"""
+    matrix = IDENTITY
+    pos = 0
+    while pos < len(value.rstrip()):
+        match = TRANSFORM.match(value, pos)
+        if not match:
+            return None
+        try:
+            step = transform_matrix(match.group(1), [float(v) for v in NUMBER.findall(match.group(2))])
+        except ValueError:
+            return None
+        matrix = multiply(matrix, step)
+        pos = match.end()
+
+    linear = [round(v, precision + MATRIX_EXTRA_PRECISION) + 0.0 for v in matrix[:4]]
+    a, b, c, d = linear
+    e, f = (round(v, precision) + 0.0 for v in matrix[4:])
+    fmt_linear = [number(v, precision + MATRIX_EXTRA_PRECISION) for v in linear]
+    if (a, b, c, d) == (1, 0, 0, 1):
+        if e == 0 and f == 0:
+            return ''
+        return f"translate({' '.join([number(e, precision)] + ([number(f, precision)] if f else []))})"
+    if e == 0 and f == 0:
+        if b == 0 and c == 0:
+            return f"scale({' '.join(fmt_linear[:1] + (fmt_linear[3:] if d != a else []))})"
+        if a == d and b == -c and abs(a * a + b * b - 1) < 10 ** -(precision + 1):
+            return f"rotate({number(math.degrees(math.atan2(b, a)), precision)})"
+    return f"matrix({' '.join(fmt_linear + [number(e, precision), number(f, precision)])})"
+
+
+def round_numbers(value: str, precision: int) -> str:
+    """Every number in a list (points, viewBox) rounded; unchanged if it holds anything else"""
+    if SEPARATOR.sub('', NUMBER.sub('', value)):
+        return value
+    return ' '.join(number(float(token), precision) for token in NUMBER.findall(value))
+
+
+def is_unsafe(element: ET.Element) -> bool:
+    name = local_name(element.tag)
+    if name in UNSAFE_ELEMENTS:
+        return True
+    if name in ANIMATION_ELEMENTS:
+        # <set attributeName="xlink:href" to="javascript:..."> turns a safe link into a script
+        if element.get('attributeName', '').split(':')[-1].strip().lower() == 'href':
+            return True
+        values = [value for key in ('to', 'from', 'values', 'by') for value in element.get(key, '').split(';')]
+        return any(is_unsafe_url(value) for value in values)
+    return False
+
+
+def is_unsafe_url(value: str) -> bool:
+    # Browsers skip whitespace and control characters inside the scheme: "java&#x09;script:"
+    return bool(UNSAFE_URL.match(re.sub(r'[\s\x00-\x1f]', '', value)))
+
+
+def clean_attributes(element: ET.Element, precision: int):
+    for key in list(element.attrib):
+        value = element.attrib[key]
+        name = local_name(key)
+        if is_editor_name(key) or name.lower().startswith('on'):
+            del element.attrib[key]
+        elif name == 'href' and is_unsafe_url(value):
+            del element.attrib[key]
+        elif name == 'd':
+            commands = parse_path(value)
+            if commands is not None:
+                element.set(key, format_path(commands, precision))
+        elif name in ('points', 'viewBox'):
+            element.set(key, round_numbers(value, precision))
+        elif name in TRANSFORM_ATTRIBUTES:
+            collapsed = collapse_transform(value, precision)
+            if collapsed == '':
+                del element.attrib[key]
+            elif collapsed is not None:
+                element.set(key, collapsed)
+        elif name in NUMERIC_ATTRIBUTES:
+            match = UNIT_NUMBER.fullmatch(value.strip())
+            if match:
+                unit = match.group(2) or ''
+                element.set(key, number(float(match.group(1)), precision) + ('' if unit == 'px' else unit))
+
+
+def clean(element: ET.Element, precision: int, in_text: bool = False):
+    """Strip, sanitize and round `element` and everything under it"""
+    clean_attributes(element, precision)
+    in_text = in_text or local_name(element.tag) in TEXT_ELEMENTS
+    for child in list(element):
+        if (not isinstance(child.tag, str) or is_editor_name(child.tag)
+                or local_name(child.tag) == 'metadata' or is_unsafe(child)):
+            # Keep the text that followed the removed element
+            if child.tail and in_text:
+                index = list(element).index(child)
+                if index:
+                    element[index - 1].tail = (element[index - 1].tail or '') + child.tail
+                else:
+                    element.text = (element.text or '') + child.tail
+            element.remove(child)
+            continue
+        clean(child, precision, in_text)
+    if not in_text:
+        if element.text and not element.text.strip():
+            element.text = None
+        for child in element:
+            if child.tail and not child.tail.strip():
+                child.tail = None
+
+
+def referenced_ids(root: ET.Element) -> Set[str]:
+    ids: Set[str] = set()
+    for element in root.iter():
+        for key, value in element.attrib.items():
+            if local_name(key) == 'href' and value.startswith('#'):
+                ids.add(value[1:])
+            ids.update(REFERENCE.findall(value))
+        if element.text:
+            ids.update(REFERENCE.findall(element.text))
+    return ids
+
+
+def remove_unused_defs(root: ET.Element):
+    """Drop <defs> children that nothing points at, until dropping one frees no others"""
+    while True:
+        used = referenced_ids(root)
+        removed = False
+        for defs in [element for element in root.iter() if local_name(element.tag) == 'defs']:
+            for child in list(defs):
+                if child.get('id') and child.get('id') not in used and local_name(child.tag) != 'style':
+                    defs.remove(child)
+                    removed = True
+        if not removed:
+            break
+    for parent in list(root.iter()):
+        for child in list(parent):
+            if local_name(child.tag) == 'defs' and len(child) == 0 and not (child.text or '').strip():
+                parent.remove(child)
+
+
+def optimize_svg(data: bytes, precision: Optional[int] = None) -> bytes:
+    """`data` stripped, rounded and made safe; unchanged when it isn't a parseable SVG"""
+    precision = config.SVG_PRECISION if precision is None else precision
+    try:
+        # Comments, processing instructions and the DOCTYPE are not kept;
+        # internal entities are expanded before the script check sees the tree
+        root = ET.fromstring(data)
+    except ET.ParseError as e:
+        logger.warning(f"Not optimizing SVG, it doesn't parse: {e}")
+        return data
+    if local_name(root.tag) != 'svg':
+        logger.warning(f"Not optimizing SVG, its root is <{local_name(root.tag)}>")
+        return data
+    clean(root, precision)
+    remove_unused_defs(root)
+    return ET.tostring(root, encoding='unicode').encode('utf-8')
+
+
+def record_savings(path: str, original_bytes: int):
+    """Note in the media index how much smaller the stored SVG at `path` is than what was received"""
+    media_index = MediaIndex()
+    media_index.svg(path, original_bytes)
+    media_index.save()
+
+
+def svg_files() -> List[str]:
+    found = []
+    for directory, _, names in os.walk(config.IMAGES_DIR):
+        found += [os.path.join(directory, name) for name in sorted(names) if name.lower().endswith('.svg')]
+    return sorted(found)
+
+
+def optimize_files(paths: List[str], dry_run: bool = False) -> Dict[str, Tuple[int, int]]:
+    """Optimize each SVG in place; maps each path to its (before, after) size
+
+    Content-addressed files (images/<sha256 prefix>.svg, see media_store.py)
+    are skipped: their name promises their bytes, and attachments are
+    optimized before they are stored anyway.
+    """
+    media_index = MediaIndex()
+    sizes = {}
+    for path in paths:
+        if is_stored_name(os.path.basename(path)):
+            continue
+        with open(path, 'rb') as f:
+            data = f.read()
+        optimized = optimize_svg(data)
+        sizes[path] = (len(data), len(optimized))
+        if dry_run:
+            continue
+        if optimized != data:
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(optimized)
+            os.replace(tmp_path, path)
+        media_index.svg(path, len(data))
+    media_index.save()
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Optimize and sanitize every SVG in images/ in place")
+    parser.add_argument('--dry-run', action='store_true', help="only report what would be saved")
+    parser.add_argument('--no-commit', action='store_true', help="write the files but don't commit or push")
+    args = parser.parse_args()
+
+    sizes = optimize_files(svg_files(), args.dry_run)
+    changed = [path for path, (before, after) in sizes.items() if before != after]
+    for path in changed:
+        before, after = sizes[path]
+        print(f"   {os.path.relpath(path, config.IMAGES_DIR):<60} {before:>10,} -> {after:>10,} bytes")
+    saved = sum(before - after for before, after in sizes.values())
+    print(f"✅ {len(sizes)} SVG(s), {len(changed)} rewritten, {saved:,} bytes saved{' (dry run)' if args.dry_run else ''}")
+
+    if changed and not args.dry_run and not args.no_commit:
+        from simple_email_processor import commit_and_push_paths, media_state_paths
+        paths = media_state_paths()
+        paths += [os.path.relpath(path, str(config.BASE_DIR)) for path in changed]
+        if not commit_and_push_paths(paths, "Optimize SVGs in images/"):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,562 @@
+#!/usr/bin/env python3
+"""
+Tag Renderer for Portfolio Website
+Single-pass renderer for the email markdown/tag dialect.
+
+The original markdown_to_html (kept in legacy_renderer.py) rescanned the
+whole page about a dozen times: responsive tags, alignment tags, headers,
+bold, italic, images, links, videos, YouTube, carousels, two list regexes and
+a paragraph splitter that tried ~30 prefixes on every line. This renderer
+reads each line once:
+
+1. tokenize: every line becomes one token - heading, aligned line, list item,
+   or text/HTML. [Desktop]/[Mobile] and [Carousel] blocks are collected as
+   they stream past and expanded in place.
+2. inline rules (emphasis, images, links, YouTube) only run on lines that
+   contain their trigger characters.
+3. emit: tokens are grouped into paragraph blocks as they arrive; tokens
+   already known to be HTML skip the paragraph classifier.
+
+Delimited constructs ([Tag]...[/Tag] blocks, <li> pairs, images, links and
+[VIDEO]() targets) are matched with the scanners in text_scan.py, which give
+the same result as the old lazy regexes in time linear in the input, however
+many openers go unclosed.
+
+``` fenced code blocks are passed through verbatim and highlighted at build
+time by code_highlight.py (the legacy renderer has no fences).
+
+The output is byte-for-byte identical to the legacy renderer for the dialect
+in email_tags_reference.md (test_tag_renderer.py checks this), including
+[text](url) links hard-wrapped across lines. One difference: an unclosed
+<li> in raw HTML no longer pairs with a </li> further down the page.
+Carousel ids come from a hash of the carousel's content (both renderers
+share carousel_html), so rendering the same email twice gives the same bytes.
+"""
+
+import re
+import html
+import hashlib
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from text_scan import sub_pairs, sub_bracket_paren, sub_prefixed_paren, sub_links
+from code_highlight import fence_language, highlight
+
+# Token kinds: TEXT still needs the paragraph classifier, HTML is known markup
+TEXT = 0
+HTML = 1
+
+# stream() hands out output in batches of this many finished lines
+CHUNK_LINES = 256
+
+# Block tags
+RESPONSIVE_TAG = re.compile(r'\[(/?)(desktop|mobile)\]', re.IGNORECASE)
+DESKTOP_OPEN = re.compile(r'\[Desktop\]', re.IGNORECASE)
+DESKTOP_CLOSE = re.compile(r'\[/Desktop\]', re.IGNORECASE)
+MOBILE_OPEN = re.compile(r'\[Mobile\]', re.IGNORECASE)
+MOBILE_CLOSE = re.compile(r'\[/Mobile\]', re.IGNORECASE)
+CAROUSEL_TAG = re.compile(r'\[(/?)(carousel)\]', re.IGNORECASE)
+CAROUSEL_OPEN = re.compile(r'\[Carousel\]', re.IGNORECASE)
+CAROUSEL_CLOSE = re.compile(r'\[/Carousel\]', re.IGNORECASE)
+
+SITE_DIR = Path(__file__).resolve().parent.parent
+
+
+def module_script(name: str) -> str:
+    """<script> for a page loading the site-root module `name`; the query string
+    follows its content, so browsers can keep it cached until it changes"""
+    digest = hashlib.sha256((SITE_DIR / name).read_bytes()).hexdigest()[:8]
+    return f'<script type="module" src="../{name}?v={digest}"></script>'
+
+
+# Shared runtimes for carousels and YouTube facades
+CAROUSEL_SCRIPT = module_script('carousel.js')
+YOUTUBE_SCRIPT = module_script('youtube.js')
+
+# Alignment: (tag, side); text lines get the align-<side> utility class from
+# style.css, media lines flex-<side>
+ALIGN_TAGS = (('[center]', 'center'), ('[left]', 'left'), ('[right]', 'right'))
+ALIGN_MEDIA_SUFFIXES = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.mp4', '.mov', '.avi')
+
+# Inline rules, applied in this order
+BOLD = re.compile(r'\*\*(.*?)\*\*')
+ITALIC = re.compile(r'\*(.*?)\*')
+YOUTUBE = re.compile(r'https?://(?:www\.)?youtube\.com/watch\?v=([a-zA-Z0-9_-]{11})')
+
+# ![alt](src), [text](url) and [VIDEO](src) are matched by text_scan.py;
+# images and videos are sized by .email-image and .email-video in style.css
+IMAGE_HTML = r'<img src="{1}" alt="{0}" class="email-image">'
+LINK_HTML = r'<a href="{1}" target="_blank">{0}</a>'
+VIDEO_HTML = (r'<video controls class="email-video" preload="metadata"><source src="{0}" type="video/mp4">'
+              r'<p>Your browser doesn\'t support HTML video. <a href="{0}">Download the video</a> instead.</p></video>')
+# A YouTube link is a facade: the video's thumbnail, swapped for the
+# youtube-nocookie player by youtube.js on click (a plain link without it).
+# Module scripts run once per page however many facades load youtube.js.
+YOUTUBE_HTML = ('<div class="video-container youtube-facade"><a href="https://youtu.be/{0}" target="_blank" '
+                'data-youtube="{0}" aria-label="Play video"><img src="https://i.ytimg.com/vi/{0}/hqdefault.jpg" '
+                'alt="YouTube video" loading="lazy"></a>' + YOUTUBE_SCRIPT + '</div>')
+
+# Lists: every item becomes its own <ul>
+LIST_ITEM_OPEN = re.compile(r'<li>')
+LIST_ITEM_CLOSE = re.compile(r'</li>')
+
+# Paragraph classifier for lines that may already be HTML
+HTML_LINE_PREFIXES = ('<img', '<picture>', '<ul>', '<li>', '<strong>', '<em>', '<a ')
+HTML_LINE_SUFFIXES = ('</h1>', '</h2>', '</h3>', '</h4>', '</h5>', '</h6>', '</ul>', '</li>')
+HEADING_OPEN = re.compile(r'<h[1-6]>')
+
+
+def is_html_line(stripped: str) -> bool:
+    """True when the paragraph splitter should pass a (stripped) line through as-is"""
+    return (stripped.startswith(HTML_LINE_PREFIXES) or stripped.endswith(HTML_LINE_SUFFIXES)
+            or HEADING_OPEN.search(stripped) is not None
+            or (stripped.startswith('<video') and stripped.endswith('</video>'))
+            or (stripped.startswith('<div') and stripped.endswith('</div>')))
+
+
+def update_open_tags(line: str, pattern: re.Pattern, state: Dict[str, bool]) -> bool:
+    """Advance non-greedy [Tag]...[/Tag] pairing over `line`; True while any tag is unclosed"""
+    for match in pattern.finditer(line):
+        name = match.group(2).lower()
+        closing = bool(match.group(1))
+        if not state.get(name) and not closing:
+            state[name] = True
+        elif state.get(name) and closing:
+            state[name] = False
+    return any(state.values())
+
+
+def wrap_list_items(text: str) -> str:
+    """Wrap every <li>...</li> pair in its own <ul>"""
+    return sub_pairs(text, LIST_ITEM_OPEN, LIST_ITEM_CLOSE, lambda item, _: f'<ul>{item}</ul>')
+
+
+# =============================================================================
+# BLOCK EXPANSION
+# =============================================================================
+
+def responsive_classes(block_content: str, css_class: str) -> Tuple[str, str]:
+    """(class attribute, content) of a [Desktop]/[Mobile] block whose content may start with an alignment tag"""
+    block_content = block_content.strip()
+    for tag, align in ALIGN_TAGS:
+        if block_content.startswith(tag):
+            return f'{css_class} align-{align}', block_content[len(tag):].strip()
+    return css_class, block_content
+
+
+def _desktop_block(_: str, block_content: str) -> str:
+    css_class, block_content = responsive_classes(block_content, 'desktop-only')
+    return f'<div class="{css_class}">{block_content}</div>'
+
+
+def _mobile_block(_: str, block_content: str) -> str:
+    css_class, block_content = responsive_classes(block_content, 'mobile-only')
+    return f'<div class="{css_class}">{block_content}</div>'
+
+
+def iter_lines(text: str) -> Iterator[str]:
+    """text.split('\\n') without building the list"""
+    start = 0
+    while True:
+        end = text.find('\n', start)
+        if end < 0:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = end + 1
+
+
+def expand_responsive(lines: Iterable[str]) -> Iterator[str]:
+    """Yield lines with [Desktop]/[Mobile] blocks expanded; lines outside blocks pass straight through"""
+    block: Optional[List[str]] = None
+    state: Dict[str, bool] = {}
+    for line in lines:
+        if block is None:
+            if '[' not in line or not RESPONSIVE_TAG.search(line):
+                yield line
+                continue
+            block = []
+        block.append(line)
+        if not update_open_tags(line, RESPONSIVE_TAG, state):
+            yield from _expand_responsive_text('\n'.join(block))
+            block = None
+    if block is not None:
+        yield from _expand_responsive_text('\n'.join(block))
+
+
+def _expand_responsive_text(text: str) -> List[str]:
+    text = sub_pairs(text, DESKTOP_OPEN, DESKTOP_CLOSE, _desktop_block)
+    text = sub_pairs(text, MOBILE_OPEN, MOBILE_CLOSE, _mobile_block)
+    return text.split('\n')
+
+
+def carousel_id(carousel_content: str, seen: Dict[str, int]) -> str:
+    """Stable element id from the carousel's content; repeats on one page get a suffix"""
+    base = f"carousel_{hashlib.sha256(carousel_content.encode('utf-8')).hexdigest()[:8]}"
+    seen[base] = seen.get(base, 0) + 1
+    return base if seen[base] == 1 else f"{base}_{seen[base]}"
+
+
+def carousel_slide(line: str, lazy: bool) -> Optional[str]:
+    """One carousel line -> its slide; every slide after the first loads lazily"""
+    loading = ' loading="lazy"' if lazy else ''
+    preload = 'none' if lazy else 'metadata'
+    if line.lower().endswith(('.jpg', '.jpeg', '.png', '.gif', '.webp')):
+        src = line if '__MEDIA_PLACEHOLDER_' in line else f'../images/{line}'
+        return f'<div class="carousel-item"><img src="{src}" alt="Carousel Image"{loading}></div>'
+    if line.lower().endswith(('.mp4', '.mov', '.avi')):
+        src = line if '__MEDIA_PLACEHOLDER_' in line else f'../images/{line}'
+        return (f'<div class="carousel-item"><video controls preload="{preload}"><source src="{src}" type="video/mp4">'
+                f'<p>Your browser doesn\'t support HTML video. <a href="{src}">Download the video</a> instead.</p>'
+                f'</video></div>')
+    if '<img ' in line or '<video ' in line or '__MEDIA_PLACEHOLDER_' in line:
+        # Already processed media
+        if lazy:
+            # The media stage already marks images below the fold lazy
+            if 'loading="lazy"' not in line:
+                line = line.replace('<img ', '<img loading="lazy" ')
+            line = line.replace('preload="metadata"', 'preload="none"')
+        return f'<div class="carousel-item">{line}</div>'
+    # Text content or captions
+    return f'<div class="carousel-item carousel-text"><p>{line}</p></div>'
+
+
+def carousel_html(carousel_content: str, seen: Optional[Dict[str, int]] = None) -> str:
+    """[Carousel] block content -> carousel markup (one item per line)
+
+    The markup is declarative and on a single line, so the paragraph splitter
+    passes it through whole. carousel.js drives every carousel on the page;
+    the first carousel loads it and later ones reuse it.
+    """
+    carousel_content = carousel_content.strip()
+    lines = [line.strip() for line in carousel_content.split('\n') if line.strip()]
+    carousel_items = [carousel_slide(line, lazy=i > 0) for i, line in enumerate(lines)]
+    
+    if not carousel_items:
+        return carousel_content  # Return original if no items found
+    
+    # Unique on the page and identical across renders
+    seen = {} if seen is None else seen
+    script = CAROUSEL_SCRIPT if not seen else ''
+    element_id = carousel_id(carousel_content, seen)
+    
+    dots = ''.join(f'<span class="carousel-dot" data-slide="{i}"></span>' for i in range(len(carousel_items)))
+    return (f'<div class="carousel-container" id="{element_id}">'
+            f'<div class="carousel-track">{"".join(carousel_items)}</div>'
+            f'<button class="carousel-btn carousel-prev" data-step="-1" aria-label="Previous slide">❮</button>'
+            f'<button class="carousel-btn carousel-next" data-step="1" aria-label="Next slide">❯</button>'
+            f'<div class="carousel-indicators">{dots}</div>{script}</div>')
+
+
+# =============================================================================
+# LINE RULES
+# =============================================================================
+
+def align_line(line: str) -> Optional[str]:
+    """[center]/[left]/[right] line -> aligned div, or None if the line has no alignment tag"""
+    stripped = line.strip()
+    for tag, align in ALIGN_TAGS:
+        if stripped.startswith(tag):
+            text = stripped[len(tag):].strip()
+            if not text:
+                return None
+            if text.startswith('###'):
+                return f'<div class="align-{align}"><h3>{text[3:].strip()}</h3></div>'
+            if text.startswith('##'):
+                return f'<div class="align-{align}"><h2>{text[2:].strip()}</h2></div>'
+            if text.startswith('#'):
+                return f'<div class="align-{align}"><h1>{text[1:].strip()}</h1></div>'
+            if ('<img ' in text or '<video ' in text or '__MEDIA_PLACEHOLDER_' in text
+                    or text.endswith(ALIGN_MEDIA_SUFFIXES)):
+                return f'<div class="flex-{align}">{text}</div>'
+            return f'<div class="align-{align}">{text}</div>'
+    return None
+
+
+def opens_alignment_div(line: str) -> bool:
+    """True for a line holding an alignment div, ours or inline-styled HTML already in the content"""
+    return ('<div class="align-' in line or '<div class="flex-' in line
+            or ('<div style=' in line and ('text-align:' in line or 'display: flex' in line)))
+
+
+def render_emphasis(line: str) -> str:
+    """Bold, italic and images; each rule runs only if its trigger is present"""
+    if '*' in line:
+        if '**' in line:
+            line = BOLD.sub(r'<strong>\1</strong>', line)
+        if '*' in line:
+            line = ITALIC.sub(r'<em>\1</em>', line)
+    if '![' in line and '](' in line:
+        line = sub_bracket_paren(line, '![', IMAGE_HTML.format)
+    return line
+
+
+def render_links(text: str) -> str:
+    """Links, [VIDEO]() and YouTube URLs; `text` may hold several lines of one wrapped link"""
+    if '](' in text:
+        text = sub_links(text, LINK_HTML.format)
+        if '[VIDEO](' in text:
+            text = sub_prefixed_paren(text, '[VIDEO](', VIDEO_HTML.format)
+    if 'youtube.com/watch?v=' in text:
+        text = YOUTUBE.sub(youtube_html, text)
+    return text
+
+
+def youtube_html(match: re.Match) -> str:
+    return YOUTUBE_HTML.format(match.group(1))
+
+
+def embeds_youtube(content: str) -> bool:
+    """True when rendering `content` produces a YouTube facade (the page then preconnects to YouTube)"""
+    return 'youtube.com/watch?v=' in content and YOUTUBE.search(content) is not None
+
+
+def link_continues(line: str, open_bracket: bool = False, open_paren: bool = False) -> Tuple[bool, bool]:
+    """Track whether a [text](url) link could still be open after `line`.
+
+    Returns (unclosed '[', unclosed '](') - while either is set the next line
+    may complete a link that started above.
+    """
+    close_bracket = line.rfind(']')
+    if close_bracket >= 0:
+        open_bracket = line.rfind('[') > close_bracket
+    elif '[' in line:
+        open_bracket = True
+    close_paren = line.rfind(')')
+    if close_paren >= 0:
+        open_paren = line.rfind('](') > close_paren
+    elif '](' in line:
+        open_paren = True
+    return open_bracket, open_paren
+
+
+# =============================================================================
+# RENDERER
+# =============================================================================
+
+class TagRenderer:
+    """One-walk renderer: feed lines in order, then close() for the HTML.
+
+    stream() hands the HTML out as paragraphs complete, so a long page never
+    has to be held in memory whole.
+    """
+
+    def __init__(self):
+        self.first_h1_found = False
+        self.inside_alignment_div = False
+        self.link: Optional[List[str]] = None
+        self.link_state = (False, False)
+        self.carousel: Optional[List[str]] = None
+        self.carousel_state: Dict[str, bool] = {}
+        self.carousel_ids: Dict[str, int] = {}
+        self.fence: Optional[List[str]] = None
+        self.fence_language = ''
+        self.escaped = False
+        # Paragraph assembly
+        self.output: List[str] = []
+        self.paragraph: List[Tuple[str, int]] = []
+        self.empty_lines = 0
+        self.started = False
+        self.drained = False
+
+    def render(self, content: str) -> str:
+        for line in expand_responsive(self.prepare(content).split('\n')):
+            self.feed(line)
+        return self.close()
+
+    def stream(self, content: str) -> Iterator[str]:
+        for line in expand_responsive(iter_lines(self.prepare(content))):
+            self.feed(line)
+            if len(self.output) >= CHUNK_LINES:
+                yield self.drain()
+        yield self.close()
+
+    # -- tokenize --------------------------------------------------------------
+
+    def prepare(self, content: str) -> str:
+        # Pre-embedded media means the content is already HTML
+        self.escaped = '<img ' not in content and '<video ' not in content
+        return html.escape(content) if self.escaped else content
+
+    def feed(self, line: str):
+        if self.fence is not None or '```' in line:
+            if self.feed_fence(line):
+                return
+        kind = TEXT
+        aligned = align_line(line) if '[' in line else None
+        if aligned is not None:
+            line, kind = aligned, HTML
+            self.inside_alignment_div = True
+        elif opens_alignment_div(line):
+            self.inside_alignment_div = True
+        elif self.inside_alignment_div:
+            # Headers stay raw until a bare </div> line (long-standing renderer behaviour)
+            if line.strip() == '</div>':
+                self.inside_alignment_div = False
+        elif '#' in line:
+            stripped = line.strip()
+            if stripped.startswith('### '):
+                line, kind = '<h3>' + stripped[4:] + '</h3>', HTML
+            elif stripped.startswith('## '):
+                line, kind = '<h2>' + stripped[3:] + '</h2>', HTML
+            elif stripped.startswith('# '):
+                if not self.first_h1_found:
+                    # The first H1 duplicates the page title
+                    self.first_h1_found = True
+                    return
+                line, kind = '<h2>' + stripped[2:] + '</h2>', HTML
+
+        line = render_emphasis(line)
+
+        if self.link is None:
+            if '[' not in line or not any(link_continues(line)):
+                self.feed_block(render_links(line), kind)
+                return
+            self.link = []
+        # A link may be hard-wrapped over several lines
+        self.link.append(line)
+        self.link_state = link_continues(line, *self.link_state)
+        if not any(self.link_state):
+            self.flush_link()
+
+    def feed_fence(self, line: str) -> bool:
+        """Collect ``` code blocks verbatim; True if `line` belonged to one"""
+        language = fence_language(line)
+        if self.fence is None:
+            if language is None:
+                return False
+            if self.link is not None:
+                self.flush_link()
+            self.fence, self.fence_language = [], language
+        elif language == '':
+            self.flush_fence()
+        else:
+            self.fence.append(line.rstrip('\r'))
+        return True
+
+    def flush_fence(self):
+        code = '\n'.join(self.fence)
+        self.fence = None
+        # Highlighting escapes the code itself
+        block = highlight(html.unescape(code) if self.escaped else code, self.fence_language)
+        if self.carousel is None:
+            self.emit(block, HTML)
+        else:
+            self.feed_block(block, HTML)
+
+    def flush_link(self):
+        text = render_links('\n'.join(self.link))
+        self.link = None
+        self.link_state = (False, False)
+        for line in text.split('\n'):
+            self.feed_block(line, TEXT)
+
+    def feed_block(self, line: str, kind: int):
+        if self.carousel is None and ('[' not in line or not CAROUSEL_TAG.search(line)):
+            self.emit(line, kind)
+            return
+        if self.carousel is None:
+            self.carousel = []
+        self.carousel.append(line)
+        if not update_open_tags(line, CAROUSEL_TAG, self.carousel_state):
+            self.flush_carousel()
+
+    def flush_carousel(self):
+        text = sub_pairs('\n'.join(self.carousel), CAROUSEL_OPEN, CAROUSEL_CLOSE,
+                         lambda _, content: carousel_html(content, self.carousel_ids))
+        self.carousel = None
+        for line in text.split('\n'):
+            self.emit(line, TEXT)
+
+    # -- emit ------------------------------------------------------------------
+
+    def emit(self, line: str, kind: int):
+        if line.startswith('- '):
+            item = f'<li>{line[2:]}</li>'
+            line, kind = (wrap_list_items(item) if '<' in line else f'<ul>{item}</ul>'), HTML
+        elif '<li>' in line:
+            line = wrap_list_items(line)
+
+        # Paragraphs are separated by "\n\n" in the joined text
+        if line == '':
+            self.empty_lines += 1
+            return
+        breaks = (self.empty_lines + 1 if self.started else self.empty_lines) // 2
+        if breaks:
+            if self.started:
+                self.flush_paragraph()
+                breaks -= 1
+            self.output.extend([''] * breaks)
+        self.paragraph.append((line, kind))
+        self.empty_lines = 0
+        self.started = True
+
+    def close(self) -> str:
+        if self.fence is not None:
+            self.flush_fence()
+        if self.link is not None:
+            self.flush_link()
+        if self.carousel is not None:
+            self.flush_carousel()
+        if self.started:
+            self.flush_paragraph()
+            self.output.extend([''] * (self.empty_lines // 2))
+        else:
+            self.output.extend([''] * ((self.empty_lines - 1) // 2 + 1))
+        return self.drain()
+
+    def drain(self) -> str:
+        """Output lines finished so far; chunks concatenate to the '\\n'-joined page"""
+        text = '\n'.join(self.output)
+        if self.drained:
+            text = '\n' + text
+        self.drained = True
+        self.output = []
+        return text
+
+    def flush_paragraph(self):
+        lines = self.paragraph
+        self.paragraph = []
+        first = next((i for i, (line, _) in enumerate(lines) if line.strip()), None)
+        if first is None:
+            self.output.append('')
+            return
+        last = next(i for i in range(len(lines) - 1, -1, -1) if lines[i][0].strip())
+        lines = lines[first:last + 1]
+        lines[0] = (lines[0][0].lstrip(), lines[0][1])
+        lines[-1] = (lines[-1][0].rstrip(), lines[-1][1])
+
+        output = self.output
+        text_block: List[str] = []
+        closing_tag = None
+        for line, kind in lines:
+            stripped = line.strip()
+            if closing_tag:
+                output.append(line)
+                if stripped.endswith(closing_tag):
+                    closing_tag = None
+                continue
+            if kind == TEXT and stripped.startswith('<'):
+                if stripped.startswith('<video') and not stripped.endswith('</video>'):
+                    closing_tag = '</video>'
+                elif stripped.startswith('<div') and not stripped.endswith('</div>'):
+                    closing_tag = '</div>'
+            if kind == HTML or closing_tag or ('<' in stripped and is_html_line(stripped)):
+                if text_block:
+                    output.append(f'<p>{" ".join(text_block)}</p>')
+                    text_block = []
+                output.append(line)
+            elif stripped:
+                text_block.append(stripped)
+        if text_block:
+            output.append(f'<p>{" ".join(text_block)}</p>')
+
+
+def render_markdown(content: str) -> str:
+    """Convert the email markdown/tag dialect to HTML in a single walk"""
+    return TagRenderer().render(content)
+
+
+def stream_markdown(content: str) -> Iterator[str]:
+    """render_markdown() as a stream of chunks, one or more paragraphs each"""
+    return TagRenderer().stream(content)
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test Async Email Processor
+The overlapped runner downloads only the newest page email of each title,
+falls back when that one is not a page email, and leaves emails of a failed
+render for the next run
+"""
+
+import os
+import asyncio
+
+from async_email_processor import AsyncEmailProcessor
+from render_cache import RenderCache
+from test_title_index import FakeMailbox, Site, message
+
+
+def run(site: Site, mailbox: FakeMailbox, publish) -> AsyncEmailProcessor:
+    processor = site.processor(mailbox, AsyncEmailProcessor)
+    processor.render_cache = RenderCache(os.path.join(site.cms, 'render_cache.json'))
+    processor.publish = publish
+    github_actions = os.environ.get('GITHUB_ACTIONS')
+    os.environ['GITHUB_ACTIONS'] = 'true'  # no git in tests
+    try:
+        asyncio.run(processor.process_new_emails_async())
+    finally:
+        if github_actions is None:
+            os.environ.pop('GITHUB_ACTIONS', None)
+        else:
+            os.environ['GITHUB_ACTIONS'] = github_actions
+    return processor
+
+
+def test_async_runner_downloads_only_winners():
+    with Site() as site:
+        mailbox = FakeMailbox({
+            '1': message('Garden', 10, '# Old draft'),
+            '2': message('Garden', 11, '# New draft'),
+            '3': message('Abc', 12, '# Short title, markdown body'),
+            '4': message('Abc', 13, 'plain words'),  # newest, but not a page email
+            '5': message('[DELETE CONFIRM] Garden', 14, ''),
+        })
+        published = []
+
+        async def publish(raw_msg, candidate):
+            published.append(raw_msg.get_payload().strip())
+            return None  # unchanged: nothing to commit
+
+        processor = run(site, mailbox, publish)
+        assert sorted(mailbox.bodies) == ['2', '3', '4']
+        assert sorted(published) == ['# New draft', '# Short title, markdown body']
+        assert processor.processed_emails == {f'inbox:{seq}' for seq in '12345'}
+
+
+def test_failed_render_is_retried_next_run():
+    with Site() as site:
+        mailbox = FakeMailbox({
+            '1': message('Garden', 10, '# Old draft'),
+            '2': message('Garden', 11, '# New draft'),
+            '3': message('Pond', 12, '# Fish'),
+        })
+
+        async def publish(raw_msg, candidate):
+            if candidate['subject'] == 'Garden':
+                raise RuntimeError("page rendering failed")
+            return None
+
+        processor = run(site, mailbox, publish)
+        assert processor.processed_emails == {'inbox:3'}
+
+
+if __name__ == "__main__":
+    test_async_runner_downloads_only_winners()
+    test_failed_render_is_retried_next_run()
+    print("✅ Async runner fetches winners only and retries failed renders")
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test Bulk Import
+Archives are read from .eml directories and mbox files, and only the newest
+email of each page is selected for rendering
+"""
+
+import os
+import mailbox
+import tempfile
+from datetime import datetime, timezone
+
+from bulk_import import read_archive, message_date, select_latest
+from title_index import TitleVersionIndex
+
+
+def message(subject: str, hour: int = None, body: str = '# Body') -> bytes:
+    date = f"Date: Mon, 01 Jan 2024 {hour:02d}:00:00 +0000\r\n" if hour is not None else ""
+    return f"From: a@example.com\r\nSubject: {subject}\r\n{date}\r\n{body}\r\n".encode('utf-8')
+
+
+def test_read_archive_directory_and_mbox():
+    with tempfile.TemporaryDirectory() as tmp:
+        os.makedirs(os.path.join(tmp, 'eml', 'nested'))
+        for name, raw in (('a.eml', message('Garden', 10)), ('nested/b.EML', message('Pond', 11)),
+                          ('notes.txt', b'not an email')):
+            with open(os.path.join(tmp, 'eml', name), 'wb') as f:
+                f.write(raw)
+        assert sorted(os.path.basename(source) for source, _ in read_archive(os.path.join(tmp, 'eml'))) == ['a.eml', 'b.EML']
+
+        box_path = os.path.join(tmp, 'archive.mbox')
+        box = mailbox.mbox(box_path)
+        box.add(message('Garden', 10))
+        box.add(message('Pond', 11))
+        box.close()
+        messages = read_archive(box_path)
+        assert [source for source, _ in messages] == ['archive.mbox#0', 'archive.mbox#1']
+        assert b'Subject: Pond' in messages[1][1]
+
+
+def test_message_date_falls_back_to_file_time():
+    assert message_date(message('Garden', 10), 'x') == datetime(2024, 1, 1, 10, tzinfo=timezone.utc)
+    with tempfile.NamedTemporaryFile() as f:
+        os.utime(f.name, (0, 86400))
+        assert message_date(message('Garden'), f.name) == datetime(1970, 1, 2, tzinfo=timezone.utc)
+
+
+def test_select_latest_per_page():
+    with tempfile.TemporaryDirectory() as tmp:
+        index = TitleVersionIndex(os.path.join(tmp, 'title_versions.json'))
+        index.record('Pond', datetime(2024, 1, 1, 12, tzinfo=timezone.utc), 'digest')
+        messages = [
+            ('1', message('Garden', 11)),
+            ('2', message('Garden', 10)),
+            ('3', message('garden!', 9)),  # same page file as "Garden"
+            ('4', message('Pond', 11)),  # older than the published version
+            ('5', message('Bees', 8)),
+            ('6', message('[DELETE CONFIRM] Bees', 12)),
+        ]
+        winners, deletes = select_latest(messages, index)
+        assert [source for _, (source, _) in winners] == ['5', '1']
+        assert deletes == 1
+
+
+if __name__ == "__main__":
+    test_read_archive_directory_and_mbox()
+    test_message_date_falls_back_to_file_time()
+    test_select_latest_per_page()
+    print("✅ Bulk import reads archives and keeps the newest email per page")
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Test Code Highlighter
+Fenced blocks become classed spans, rendered once per block hash
+"""
+
+import os
+import tempfile
+
+import config
+import code_highlight
+from markdown_engines import get_engine
+
+EMAIL = "Some code:\n\n```python\ndef add(a, b):\n    return a + 1  # <sum>\n```\n\nDone."
+
+
+def test_fenced_blocks_are_highlighted():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        config.CODE_CACHE_DIR, code_cache_dir = cache_dir, config.CODE_CACHE_DIR
+        try:
+            for name in ('tags', 'python-markdown'):
+                rendered = get_engine(name).render(EMAIL)
+                assert ('<pre><code class="language-python"><span class="tok-kw">def</span> '
+                        '<span class="tok-fn">add</span>(a, b):') in rendered, name
+                assert '<span class="tok-com"># &lt;sum&gt;</span></code></pre>' in rendered, name
+                assert '<p>Done.</p>' in rendered, name
+        finally:
+            config.CODE_CACHE_DIR = code_cache_dir
+
+
+def test_blocks_are_cached_by_hash():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        config.CODE_CACHE_DIR, code_cache_dir = cache_dir, config.CODE_CACHE_DIR
+        tokenize = code_highlight.tokenize
+        calls = []
+        code_highlight.tokenize = lambda code, language: calls.append(code) or tokenize(code, language)
+        try:
+            block = code_highlight.highlight('x = "cached"', 'py')
+            assert len(os.listdir(cache_dir)) == 1
+            # A fresh process finds the block on disk
+            code_highlight._memory.clear()
+            assert code_highlight.highlight('x = "cached"', 'py') == block
+            assert len(calls) == 1
+        finally:
+            code_highlight.tokenize = tokenize
+            config.CODE_CACHE_DIR = code_cache_dir
+
+
+if __name__ == "__main__":
+    test_fenced_blocks_are_highlighted()
+    test_blocks_are_cached_by_hash()
+    print("✅ Code blocks are highlighted at build time")
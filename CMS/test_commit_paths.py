@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Test Commit Paths
+A published or deleted page is committed together with the state files that
+describe it, media manifest included, and nothing else that happens to be staged
+"""
+
+import os
+import subprocess
+import tempfile
+from pathlib import Path
+
+import config
+from simple_email_processor import commit_and_push_changes, commit_delete_changes
+
+STATE = ('RENDER_CACHE_PATH', 'TITLE_INDEX_PATH', 'MEDIA_INDEX_PATH', 'MEDIA_MANIFEST_PATH')
+
+
+def git(root: str, *args: str) -> str:
+    return subprocess.run(['git', *args], cwd=root, capture_output=True, text=True, check=True).stdout
+
+
+def test_page_commits_include_state_files():
+    with tempfile.TemporaryDirectory() as root:
+        saved = (os.getcwd(), config.BASE_DIR) + tuple(getattr(config, name) for name in STATE)
+        try:
+            git(root, 'init', '-q')
+            git(root, 'config', 'user.email', 'test@example.com')
+            git(root, 'config', 'user.name', 'Test')
+            for name in ('CMS', 'Pages', 'images'):
+                os.makedirs(os.path.join(root, name))
+            files = ['Pages/garden.html', 'index.html', 'images/leaf.jpg', 'notes.txt',
+                     'CMS/render_cache.json', 'CMS/title_versions.json',
+                     'CMS/media_index.json', 'CMS/media_manifest.json']
+            for name in files:
+                Path(root, name).write_text('x', encoding='utf-8')
+            git(root, 'add', 'notes.txt')  # staged by hand, not part of the publish
+
+            config.BASE_DIR = Path(root)
+            for name, filename in zip(STATE, files[4:]):
+                setattr(config, name, Path(root, filename))
+            os.chdir(os.path.join(root, 'CMS'))
+
+            # There is no remote, so the push fails after the commit is made
+            assert not commit_and_push_changes('garden.html', 'Garden', ['../images/leaf.jpg'])
+            committed = git(root, 'show', '--name-only', '--format=', 'HEAD').split()
+            assert sorted(committed) == sorted(name for name in files if name != 'notes.txt')
+            assert git(root, 'diff', '--cached', '--name-only').split() == ['notes.txt']
+
+            os.remove(os.path.join(root, 'Pages', 'garden.html'))
+            Path(root, 'CMS/media_manifest.json').write_text('y', encoding='utf-8')
+            assert not commit_delete_changes('garden.html', 'Garden')
+            committed = git(root, 'show', '--name-status', '--format=', 'HEAD').splitlines()
+            assert sorted(committed) == ['D\tPages/garden.html', 'M\tCMS/media_manifest.json']
+        finally:
+            os.chdir(saved[0])
+            config.BASE_DIR = saved[1]
+            for name, value in zip(STATE, saved[2:]):
+                setattr(config, name, value)
+
+
+if __name__ == "__main__":
+    test_page_commits_include_state_files()
+    print("✅ Page commits carry the render cache, title index and media state")
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test Responsive Image Variants
+Photos are saved upright without EXIF, get WebP/JPEG variants at the
+configured widths, and a second build reuses the variants on disk
+"""
+
+import io
+import os
+import tempfile
+
+from PIL import Image
+
+import config
+from image_variants import clean_original, build_variants, picture_html
+
+
+def encoded(image: Image.Image, image_format: str, **params) -> bytes:
+    out = io.BytesIO()
+    image.save(out, image_format, **params)
+    return out.getvalue()
+
+
+def test_clean_original():
+    exif = Image.Exif()
+    exif[0x0112] = 6  # stored sideways: rotate 90° clockwise to display
+    exif[0x010f] = 'Camera maker'
+    photo = encoded(Image.new('RGB', (40, 20)), 'JPEG', exif=exif.tobytes())
+    with Image.open(io.BytesIO(clean_original(photo))) as cleaned:
+        assert cleaned.size == (20, 40)
+        assert not cleaned.getexif()
+
+    # Nothing to strip: the bytes are kept as they are
+    plain = encoded(Image.new('RGB', (40, 20)), 'PNG')
+    assert clean_original(plain) == plain
+    assert clean_original(b'not an image') == b'not an image'
+
+
+def test_build_variants():
+    images_dir, widths = config.IMAGES_DIR, config.IMAGE_VARIANT_WIDTHS
+    with tempfile.TemporaryDirectory() as tmp:
+        config.IMAGES_DIR, config.IMAGE_VARIANT_WIDTHS = tmp, [100, 200]
+        try:
+            for name, data in (('photo.jpg', encoded(Image.new('RGB', (300, 150)), 'JPEG')),
+                               ('logo.png', encoded(Image.new('RGBA', (150, 50)), 'PNG')),
+                               ('anim.gif', encoded(Image.new('P', (50, 50)), 'GIF'))):
+                with open(os.path.join(tmp, name), 'wb') as f:
+                    f.write(data)
+            paths = ['../images/photo.jpg', '../images/logo.png', '../images/anim.gif']
+
+            variants = build_variants(paths)
+            assert set(variants) == {'../images/photo.jpg', '../images/logo.png'}
+            photo, logo = variants['../images/photo.jpg'], variants['../images/logo.png']
+            assert photo.widths == (100, 200) and photo.fallback == 'jpg'
+            assert logo.widths == (100, 150) and logo.fallback == 'png'
+            with Image.open(os.path.join(tmp, 'variants', os.path.basename(photo.url(100, 'webp')))) as small:
+                assert small.format == 'WEBP' and small.size == (100, 50)
+
+            markup = picture_html(photo, 'A <photo>')
+            assert markup.startswith('<picture><source type="image/webp" srcset="')
+            assert f'{photo.url(200, "jpg")} 200w' in markup and 'alt="A &lt;photo&gt;"' in markup
+
+            # A rebuild finds every variant on disk and writes nothing
+            mtimes = {name: os.path.getmtime(os.path.join(tmp, 'variants', name))
+                      for name in os.listdir(os.path.join(tmp, 'variants'))}
+            assert len(mtimes) == 8
+            assert build_variants(paths) == variants
+            assert mtimes == {name: os.path.getmtime(os.path.join(tmp, 'variants', name)) for name in mtimes}
+        finally:
+            config.IMAGES_DIR, config.IMAGE_VARIANT_WIDTHS = images_dir, widths
+
+
+if __name__ == "__main__":
+    test_clean_original()
+    test_build_variants()
+    print("✅ Attached images get cached responsive variants")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test Ingest Server
+The HTTP front end accepts, refuses and sheds load with the right status codes,
+and the --stdin hook only asks the MTA to retry when a retry can help
+"""
+
+import io
+import os
+import sys
+import json
+import asyncio
+
+import ingest_server
+from ingest_server import IngestServer, process_stdin, EX_DATAERR, EX_TEMPFAIL
+
+MESSAGE = b"From: a@example.com\r\nSubject: Garden\r\n\r\n# Body\r\n"
+
+
+async def post(port: int, body: bytes = MESSAGE, headers: str = None):
+    """Send one request; returns (status, JSON payload, headers)"""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    if headers is None:
+        headers = f"Content-Length: {len(body)}\r\n"
+    writer.write(f"POST /messages HTTP/1.1\r\nHost: localhost\r\n{headers}\r\n".encode('latin-1') + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    fields = dict(line.split(': ', 1) for line in lines[1:])
+    return int(lines[0].split()[1]), json.loads(payload), fields
+
+
+async def exercise_server():
+    # No workers run, so the queue fills up and stays full
+    server = IngestServer(queue_size=1, workers=1, max_bytes=1024, enqueue_timeout=0.05)
+    listener = await asyncio.start_server(server.handle_connection, '127.0.0.1', 0)
+    port = listener.sockets[0].getsockname()[1]
+    try:
+        status, payload, _ = await post(port)
+        assert status == 202 and payload == {"id": 1, "queued": 1}
+
+        status, payload, fields = await post(port)
+        assert status == 503 and fields['Retry-After'] == '1'
+
+        status, _, _ = await post(port, headers="")
+        assert status == 411
+        status, _, _ = await post(port, b'x' * 2048)
+        assert status == 413
+
+        assert server.queue.qsize() == 1
+        assert server.stats == {"accepted": 1, "rejected": 1, "published": 0, "failed": 0}
+
+        # Backpressure clears as soon as a message leaves the queue
+        await server.queue.get()
+        server.queue.task_done()
+        status, payload, _ = await post(port)
+        assert status == 202 and payload["id"] == 3
+    finally:
+        listener.close()
+        await listener.wait_closed()
+
+
+def test_http_status_codes_and_backpressure():
+    asyncio.run(exercise_server())
+
+
+class Stdin:
+    def __init__(self, raw: bytes):
+        self.buffer = io.BytesIO(raw)
+
+
+def run_stdin(raw: bytes, render=None, push=True) -> int:
+    """process_stdin with the pipeline stages replaced; `render` raises or returns the job result"""
+    saved = (sys.stdin, ingest_server.run_render, ingest_server.run_index, ingest_server.commit_and_push_paths)
+    github_actions = os.environ.pop('GITHUB_ACTIONS', None)
+    try:
+        sys.stdin = Stdin(raw)
+        ingest_server.run_render = render or (lambda job: {"action": "page", "title": "Garden", "filename": "garden.html"})
+        ingest_server.run_index = lambda result: None
+        ingest_server.commit_and_push_paths = lambda paths, message: push
+        return process_stdin()
+    finally:
+        sys.stdin, ingest_server.run_render, ingest_server.run_index, ingest_server.commit_and_push_paths = saved
+        if github_actions is not None:
+            os.environ['GITHUB_ACTIONS'] = github_actions
+
+
+def fail_with(error: Exception):
+    def render(job):
+        raise error
+    return render
+
+
+def test_stdin_exit_codes():
+    assert run_stdin(MESSAGE) == 0
+    assert run_stdin(b"  \r\n") == EX_DATAERR
+    assert run_stdin(MESSAGE, fail_with(RuntimeError("Rendering failed for 'Garden'"))) == EX_DATAERR
+    assert run_stdin(MESSAGE, fail_with(OSError("No space left on device"))) == EX_TEMPFAIL
+    assert run_stdin(MESSAGE, push=False) == EX_TEMPFAIL
+
+
+if __name__ == "__main__":
+    test_http_status_codes_and_backpressure()
+    test_stdin_exit_codes()
+    print("✅ Ingest server answers 202/411/413/503 and exits 65 or 75 as it should")
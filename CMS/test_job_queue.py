@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test Job Queue
+A message is queued once per source and content, the newest email of a page
+wins before anything renders, and one page never has two renders in flight
+"""
+
+import os
+import json
+import sqlite3
+import tempfile
+
+from job_queue import JobQueue
+
+
+def message(subject: str, hour: int, body: str = '# Body') -> bytes:
+    return (f"From: a@example.com\r\nSubject: {subject}\r\n"
+            f"Date: Mon, 01 Jan 2024 {hour:02d}:00:00 +0000\r\n\r\n{body}\r\n").encode('utf-8')
+
+
+def test_enqueue_keys_on_content():
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = JobQueue(os.path.join(tmp, 'jobs.sqlite3'))
+        try:
+            assert queue.enqueue(message('Garden', 10), '/mail/garden.eml')
+            assert queue.enqueue(message('Garden', 10), '/mail/garden.eml') is None
+            # The file edited in place is a new message
+            assert queue.enqueue(message('Garden', 10, '# Edited'), '/mail/garden.eml')
+        finally:
+            queue.close()
+
+
+def test_latest_wins_and_one_render_per_page():
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = JobQueue(os.path.join(tmp, 'jobs.sqlite3'))
+        try:
+            newer = queue.enqueue(message('Garden', 11), 'a')
+            older = queue.enqueue(message('Garden', 10), 'b')  # arrived late
+            other = queue.enqueue(message('Pond', 10), 'c')
+            assert [job['id'] for job in queue.claim('render', limit=10)] == [newer, other]
+            superseded = queue.db.execute("SELECT stage, result FROM jobs WHERE id = ?", (older,)).fetchone()
+            assert superseded['stage'] == 'done' and json.loads(superseded['result']) == {"action": "superseded"}
+
+            # A newer email for a page that is rendering waits for that render
+            newest = queue.enqueue(message('Garden', 12), 'd')
+            assert queue.claim('render', limit=10) == []
+            queue.advance(newer, 'render', {"action": "page"})
+            assert [job['id'] for job in queue.claim('render', limit=10)] == [newest]
+        finally:
+            queue.close()
+
+
+def test_older_database_is_upgraded():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'jobs.sqlite3')
+        db = sqlite3.connect(path)
+        db.execute("CREATE TABLE jobs (id INTEGER PRIMARY KEY AUTOINCREMENT, source TEXT NOT NULL UNIQUE, "
+                   "raw BLOB NOT NULL, stage TEXT NOT NULL DEFAULT 'render', state TEXT NOT NULL DEFAULT 'pending', "
+                   "attempts INTEGER NOT NULL DEFAULT 0, result TEXT, error TEXT, lease_until REAL, "
+                   "created_at REAL NOT NULL, updated_at REAL NOT NULL)")
+        db.execute("INSERT INTO jobs (source, raw, created_at, updated_at) VALUES ('old', x'00', 0, 0)")
+        db.commit()
+        db.close()
+
+        queue = JobQueue(path)
+        try:
+            assert queue.enqueue(message('Garden', 10), 'new')
+            assert len(queue.claim('render', limit=10)) == 2
+        finally:
+            queue.close()
+
+
+if __name__ == "__main__":
+    test_enqueue_keys_on_content()
+    test_latest_wins_and_one_render_per_page()
+    test_older_database_is_upgraded()
+    print("✅ Job queue renders each page once, newest first")
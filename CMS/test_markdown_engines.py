@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test Markdown Engines
+Every engine renders the bracket tags; the default engine is the tag renderer
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmark_corpus import TAG_REFERENCE_EMAIL
+from benchmark_engines import LEFTOVER_TAG
+from markdown_engines import ENGINES, MarkdownEngine, get_engine
+from tag_renderer import render_markdown
+
+
+def test_every_engine_renders_the_tags():
+    for name in ENGINES:
+        rendered = get_engine(name).render(TAG_REFERENCE_EMAIL)
+        assert not LEFTOVER_TAG.search(rendered), name
+        assert 'carousel-container' in rendered and 'desktop-only' in rendered, name
+        # The first heading repeats the page title
+        assert 'Welcome to My Project' not in rendered, name
+        assert ''.join(get_engine(name).stream(TAG_REFERENCE_EMAIL)) == rendered, name
+
+
+def test_python_markdown_engine_extensions():
+    rendered = get_engine('python-markdown').render(
+        "[Desktop]\n**bold** inside\n[/Desktop]\n\n[docs](https://example.com) [VIDEO](../images/v.mp4)\n\n![Pond](p.jpg)")
+    assert '<div class="desktop-only">' in rendered
+    assert '<strong>bold</strong>' in rendered
+    assert '<a href="https://example.com" target="_blank">docs</a>' in rendered
+    assert '<source src="../images/v.mp4" type="video/mp4">' in rendered
+    # Sized by style.css classes, like the tag renderer's media
+    assert '<video controls class="email-video"' in rendered and '<img alt="Pond" class="email-image" src="p.jpg"' in rendered
+    assert 'style=' not in rendered
+
+
+def test_shared_engine_renders_in_threads():
+    # get_engine() hands the render threads one engine; each page must come out as if rendered alone
+    pages = [f"{TAG_REFERENCE_EMAIL}\n\nPage **{n}** ends here.\n" for n in range(16)]
+    for name in ENGINES:
+        engine = get_engine(name)
+        expected = [engine.render(page) for page in pages]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            assert list(pool.map(engine.render, pages * 4)) == expected * 4, name
+
+    try:
+        MarkdownEngine()
+    except TypeError:
+        pass
+    else:
+        assert False, "engine without render() instantiated"
+
+
+def test_default_engine_is_the_tag_renderer():
+    assert get_engine('tags').render(TAG_REFERENCE_EMAIL) == render_markdown(TAG_REFERENCE_EMAIL)
+    try:
+        get_engine('no-such-engine')
+    except ValueError:
+        pass
+    else:
+        assert False, "unknown engine accepted"
+
+
+if __name__ == "__main__":
+    test_every_engine_renders_the_tags()
+    test_python_markdown_engine_extensions()
+    test_shared_engine_renders_in_threads()
+    test_default_engine_is_the_tag_renderer()
+    print("✅ Markdown engines render the email dialect")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test Media Metadata Index
+Images are probed once for their size and placeholder, the index merges
+with what other processes saved, and inline media carries the results
+"""
+
+import os
+import time
+import tempfile
+
+from PIL import Image
+
+import config
+import simple_email_processor
+from media_index import MediaIndex
+
+
+def test_media_index():
+    with tempfile.TemporaryDirectory() as tmp:
+        photo, logo = os.path.join(tmp, 'photo.jpg'), os.path.join(tmp, 'logo.png')
+        exif = Image.Exif()
+        exif[0x0112] = 8  # stored sideways
+        Image.new('RGB', (300, 200), (200, 40, 40)).save(photo, exif=exif.tobytes())
+        Image.new('RGBA', (50, 30)).save(logo)
+
+        index = MediaIndex(os.path.join(tmp, 'media_index.json'))
+        entry = index.image(photo)
+        assert (entry['width'], entry['height'], entry['color']) == (200, 300, '#c82828')
+        assert entry['placeholder'].startswith('data:image/webp;base64,') and len(entry['placeholder']) < 400
+        logo_entry = index.image(logo)
+        assert (logo_entry['width'], logo_entry['height'], logo_entry['path']) == (50, 30, 'images/logo.png')
+        assert 'placeholder' not in logo_entry and logo_entry['phash'] is None  # transparent and blank
+        assert index.image(os.path.join(tmp, 'missing.png')) is None
+
+        # Another process saved first: both sets of entries survive
+        other = MediaIndex(index.path)
+        other.image(logo)
+        index.save()
+        other.save()
+        assert len(MediaIndex(index.path).entries) == 2
+        reloaded = MediaIndex(index.path)
+        assert reloaded.image(photo) == entry and not reloaded.added
+
+
+def test_inline_images_carry_metadata():
+    saved = (simple_email_processor.IMAGES_DIR, config.IMAGES_DIR, config.MEDIA_INDEX_PATH, config.IMAGE_VARIANTS)
+    with tempfile.TemporaryDirectory() as tmp:
+        simple_email_processor.IMAGES_DIR = config.IMAGES_DIR = tmp
+        config.MEDIA_INDEX_PATH = os.path.join(tmp, 'media_index.json')
+        config.IMAGE_VARIANTS = False
+        try:
+            for name in ('first.png', 'second.png'):
+                Image.new('RGB', (40, 20), (0, 0, 255)).save(os.path.join(tmp, name))
+            attachments = [{'filename': name, 'content_type': 'image/png'} for name in ('second.png', 'first.png')]
+            content, _ = simple_email_processor.process_inline_media(
+                "__MEDIA_PLACEHOLDER_1__\ntext\n__MEDIA_PLACEHOLDER_0__", attachments, 'T',
+                ['../images/second.png', '../images/first.png'])
+            first, second = content.split('\ntext\n')
+            # Only the image further down the page waits until it is scrolled to
+            assert first.startswith('<img src="../images/first.png" alt="first.png" width="40" height="20" '
+                                    'decoding="async" style="background: #0000ff url(data:image/webp;base64,')
+            assert 'loading="lazy"' not in first and ' decoding="async" loading="lazy" style=' in second
+        finally:
+            (simple_email_processor.IMAGES_DIR, config.IMAGES_DIR, config.MEDIA_INDEX_PATH,
+             config.IMAGE_VARIANTS) = saved
+
+
+def test_inline_media_is_saved_in_parallel():
+    saved = (simple_email_processor.IMAGES_DIR, simple_email_processor.save_attachment, config.IMAGES_DIR,
+             config.MEDIA_INDEX_PATH, config.IMAGE_VARIANTS, config.MEDIA_WORKERS)
+    with tempfile.TemporaryDirectory() as tmp:
+        simple_email_processor.IMAGES_DIR = config.IMAGES_DIR = tmp
+        config.MEDIA_INDEX_PATH = os.path.join(tmp, 'media_index.json')
+        config.IMAGE_VARIANTS = False
+        config.MEDIA_WORKERS = 0
+        # One thread per CPU by default, never more than there are files
+        assert simple_email_processor.media_workers(100) == (os.cpu_count() or 1)
+        assert simple_email_processor.media_workers(1) == 1
+        config.MEDIA_WORKERS = 12
+
+        def slow_save(attachment, title):
+            time.sleep(0.2)
+            Image.new('RGB', (8, 8), (0, 128, 0)).save(os.path.join(tmp, attachment['filename']))
+            return f"../images/{attachment['filename']}"
+
+        simple_email_processor.save_attachment = slow_save
+        try:
+            attachments = [{'filename': f'photo{i}.png', 'content_type': 'image/png'} for i in range(12)]
+            content = ' '.join(f'__MEDIA_PLACEHOLDER_{i}__' for i in range(10)) + ' ![photo10.png] photo11.png'
+            started = time.perf_counter()
+            content, saved_files = simple_email_processor.process_inline_media(content, attachments, 'T')
+            assert time.perf_counter() - started < 1.2  # twelve 0.2s saves, side by side
+            assert saved_files == [f'../images/photo{i}.png' for i in range(12)]
+            # Every reference replaced in order, whole, and the alt text of inserted images left alone
+            sources = [part.split('"')[0] for part in content.split('<img src="')[1:]]
+            assert sources == [f'../images/photo{i}.png' for i in range(12)]
+            assert '__MEDIA_PLACEHOLDER_' not in content and '![' not in content
+        finally:
+            (simple_email_processor.IMAGES_DIR, simple_email_processor.save_attachment, config.IMAGES_DIR,
+             config.MEDIA_INDEX_PATH, config.IMAGE_VARIANTS, config.MEDIA_WORKERS) = saved
+
+
+if __name__ == "__main__":
+    test_media_index()
+    test_inline_images_carry_metadata()
+    test_inline_media_is_saved_in_parallel()
+    print("✅ Media index sizes and placeholders reach the page")
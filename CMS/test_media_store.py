@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test Content-Addressed Media Store
+Identical bytes are stored once whatever page sends them, a re-send writes
+and prepares nothing, and the manifest resolves the old names
+"""
+
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import config
+from media_index import MediaIndex
+from media_store import MediaManifest, store
+
+
+def test_store():
+    saved = config.IMAGES_DIR, config.MEDIA_MANIFEST_PATH
+    with tempfile.TemporaryDirectory() as tmp:
+        config.IMAGES_DIR, config.MEDIA_MANIFEST_PATH = tmp, os.path.join(tmp, 'media_manifest.json')
+        try:
+            prepared = []
+
+            def prepare(data: bytes) -> bytes:
+                prepared.append(data)
+                return data.upper()
+
+            path = store(b'photo bytes', 'images/page_one_photo.JPG', 'image/jpeg', prepare)
+            assert path.startswith('images/') and path.endswith('.jpg') and path != 'images/page_one_photo.JPG'
+            with open(os.path.join(tmp, os.path.basename(path)), 'rb') as f:
+                assert f.read() == b'PHOTO BYTES'
+            mtime = os.path.getmtime(os.path.join(tmp, os.path.basename(path)))
+
+            # Re-sent, and sent again for another page: same file, nothing rewritten or re-prepared
+            assert store(b'photo bytes', 'images/page_one_photo.JPG', 'image/jpeg', prepare) == path
+            assert store(b'photo bytes', 'images/page_two_photo.jpg', 'image/jpeg', prepare) == path
+            assert len(prepared) == 1
+            assert os.path.getmtime(os.path.join(tmp, os.path.basename(path))) == mtime
+            assert sorted(os.listdir(tmp)) == sorted([os.path.basename(path), 'media_manifest.json', 'media_manifest.json.lock'])
+
+            manifest = MediaManifest()
+            assert manifest.resolve('../images/page_two_photo.jpg') == f'../{path}'
+            assert manifest.resolve('images/never_sent.png') == 'images/never_sent.png'
+
+            # No extension in the name: taken from the content type
+            assert store(b'<svg/>', 'images/inline', 'image/svg+xml').endswith('.svg')
+        finally:
+            config.IMAGES_DIR, config.MEDIA_MANIFEST_PATH = saved
+
+
+def record_many(manifest_path: str, index_path: str, worker: int):
+    for i in range(50):
+        MediaManifest(manifest_path).record(f'images/{worker}_{i}.jpg', f'images/{worker}{i:04d}.jpg', 'digest')
+        index = MediaIndex(index_path)
+        index.added[f'{worker}-{i}'] = {'path': f'images/{worker}{i:04d}.jpg'}
+        index.save()
+
+
+def test_parallel_processes_keep_every_entry():
+    with tempfile.TemporaryDirectory() as tmp:
+        manifest_path, index_path = os.path.join(tmp, 'media_manifest.json'), os.path.join(tmp, 'media_index.json')
+        with ProcessPoolExecutor(max_workers=8) as pool:
+            list(pool.map(record_many, [manifest_path] * 8, [index_path] * 8, range(8)))
+        assert len(MediaManifest(manifest_path).entries) == 400
+        assert len(MediaIndex(index_path).entries) == 400
+
+
+if __name__ == "__main__":
+    test_store()
+    test_parallel_processes_keep_every_entry()
+    print("✅ Media is stored once per content hash")
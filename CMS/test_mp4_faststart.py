@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test MP4 Faststart
+The moov box moves in front of mdat with every chunk offset still pointing
+at the same bytes, and the media index gets the video's duration and size
+"""
+
+import os
+import struct
+import tempfile
+
+import config
+import simple_email_processor
+from media_index import MediaIndex
+from mp4_faststart import boxes, faststart, probe_video
+
+ROTATE_90 = (0, 0x10000, 0, -0x10000, 0, 0, 0, 0, 0x40000000)
+IDENTITY = (0x10000, 0, 0, 0, 0x10000, 0, 0, 0, 0x40000000)
+
+
+def box(box_type: bytes, *parts: bytes) -> bytes:
+    body = b''.join(parts)
+    return struct.pack('>I4s', 8 + len(body), box_type) + body
+
+
+def track(handler: bytes, matrix: tuple, size: tuple, table: bytes) -> bytes:
+    tkhd = struct.pack('>I5I8x4H9i2I', 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, *matrix, size[0] << 16, size[1] << 16)
+    hdlr = struct.pack('>II4s12x', 0, 0, handler) + b'\0'
+    return box(b'trak', box(b'tkhd', tkhd), box(b'mdia', box(b'hdlr', hdlr),
+                                                     box(b'minf', box(b'stbl', table))))
+
+
+def phone_video(chunks: list) -> bytes:
+    """ftyp, mdat, moov - as a phone writes it - with one video track (stco) and one audio track (co64)"""
+    ftyp = box(b'ftyp', b'qt  ', b'\0\0\0\0', b'qt  ')
+    offsets = []
+    position = len(ftyp) + 8
+    for chunk in chunks:
+        offsets.append(position)
+        position += len(chunk)
+    mdat = box(b'mdat', *chunks)
+    stco = box(b'stco', struct.pack('>II', 0, len(offsets)), *(struct.pack('>I', o) for o in offsets))
+    co64 = box(b'co64', struct.pack('>II', 0, len(offsets)), *(struct.pack('>Q', o) for o in offsets))
+    mvhd = box(b'mvhd', struct.pack('>IIIII', 0, 0, 0, 600, 1500), bytes(80))
+    moov = box(b'moov', mvhd,
+               track(b'soun', IDENTITY, (0, 0), co64),
+               track(b'vide', ROTATE_90, (1920, 1080), stco))
+    return ftyp + mdat + moov
+
+
+def chunk_offsets(data: bytes) -> list:
+    """Every stco/co64 entry of a file, in table order"""
+    found = []
+
+    def walk(start: int, end: int):
+        for child in boxes(data, start, end):
+            body = child.start + child.header
+            if child.type in (b'stco', b'co64'):
+                fmt = '>I' if child.type == b'stco' else '>Q'
+                count = struct.unpack_from('>I', data, body + 4)[0]
+                found.extend(struct.unpack_from(f'>{count}{fmt[1]}', data, body + 8))
+            elif child.type in (b'moov', b'trak', b'mdia', b'minf', b'stbl'):
+                walk(body, child.end)
+
+    walk(0, len(data))
+    return found
+
+
+def test_faststart():
+    chunks = [b'frame-one!', b'frame-two!!', b'frame-three']
+    original = phone_video(chunks)
+    rewritten = faststart(original)
+    assert [b.type for b in boxes(rewritten)] == [b'ftyp', b'moov', b'mdat']
+    assert len(rewritten) == len(original)
+    # Same bytes at every offset, for both tracks
+    assert [rewritten[o:o + len(c)] for o, c in zip(chunk_offsets(rewritten), chunks * 2)] == chunks * 2
+    assert faststart(rewritten) is rewritten
+    assert faststart(b'not a video at all') == b'not a video at all'
+
+
+def test_ingest_and_index():
+    saved = (simple_email_processor.IMAGES_DIR, config.IMAGES_DIR, config.MEDIA_MANIFEST_PATH, config.MEDIA_INDEX_PATH)
+    with tempfile.TemporaryDirectory() as tmp:
+        simple_email_processor.IMAGES_DIR = config.IMAGES_DIR = tmp
+        config.MEDIA_MANIFEST_PATH = os.path.join(tmp, 'media_manifest.json')
+        config.MEDIA_INDEX_PATH = os.path.join(tmp, 'media_index.json')
+        try:
+            attachments = [{'filename': 'clip.MOV', 'content_type': 'video/quicktime',
+                            'data': phone_video([b'frame'] * 4)}]
+            content, saved_files = simple_email_processor.process_inline_media('__MEDIA_PLACEHOLDER_0__', attachments, 'T')
+            stored = os.path.join(tmp, os.path.basename(saved_files[0]))
+            with open(stored, 'rb') as f:
+                assert [b.type for b in boxes(f.read())] == [b'ftyp', b'moov', b'mdat']
+            # Recorded upright: the rotation swaps the stored frame size
+            assert content.startswith('<video controls width="1080" height="1920" class="email-video"')
+
+            entry = probe_video(stored)
+            assert entry == {'kind': 'video', 'format': 'mov', 'faststart': True,
+                             'duration': 2.5, 'width': 1080, 'height': 1920}
+            assert MediaIndex().video(stored) == dict(entry, path=f'images/{os.path.basename(stored)}')
+        finally:
+            (simple_email_processor.IMAGES_DIR, config.IMAGES_DIR, config.MEDIA_MANIFEST_PATH,
+             config.MEDIA_INDEX_PATH) = saved
+
+
+if __name__ == "__main__":
+    test_faststart()
+    test_ingest_and_index()
+    print("✅ Videos are stored faststart and indexed")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test Perceptual Hash
+A re-encoded photo hashes within a few bits of the original and, when reuse
+is turned on, a same-size JPEG re-send is stored as the original; the BK-tree
+finds exactly what a linear scan does
+"""
+
+import io
+import os
+import random
+import tempfile
+
+import numpy as np
+from PIL import Image
+
+import config
+from media_store import store, near_duplicate_groups
+from perceptual_hash import BKTree, distance, perceptual_hash
+
+
+def photo(seed: int, size=(640, 480)) -> Image.Image:
+    rng = np.random.default_rng(seed)
+    pixels = np.kron(rng.integers(0, 256, (6, 8, 3)), np.ones((80, 80, 1))).astype(np.uint8)
+    return Image.fromarray(pixels).resize(size)
+
+
+def jpeg(img: Image.Image, quality: int = 90) -> bytes:
+    out = io.BytesIO()
+    img.save(out, 'JPEG', quality=quality)
+    return out.getvalue()
+
+
+def test_bk_tree():
+    rng = random.Random(0)
+    values = [rng.getrandbits(64) for _ in range(500)]
+    tree: BKTree = BKTree()
+    for i, value in enumerate(values):
+        tree.add(value, i)
+    for query in values[:20] + [rng.getrandbits(64) for _ in range(20)]:
+        expected = sorted((distance(query, value), i) for i, value in enumerate(values) if distance(query, value) <= 20)
+        assert sorted(tree.find(query, 20)) == expected
+
+
+def test_near_duplicates_are_reused():
+    original = photo(1)
+    resent = Image.open(io.BytesIO(jpeg(original.resize((480, 360)), quality=60)))
+    assert distance(perceptual_hash(original), perceptual_hash(resent)) <= 4
+    assert distance(perceptual_hash(original), perceptual_hash(photo(2))) > 16
+    assert perceptual_hash(Image.new('RGB', (64, 64), (9, 9, 9))) is None
+
+    saved = (config.IMAGES_DIR, config.MEDIA_MANIFEST_PATH, config.MEDIA_INDEX_PATH, config.REUSE_NEAR_DUPLICATES)
+    with tempfile.TemporaryDirectory() as tmp:
+        config.IMAGES_DIR = tmp
+        config.MEDIA_MANIFEST_PATH = os.path.join(tmp, 'media_manifest.json')
+        config.MEDIA_INDEX_PATH = os.path.join(tmp, 'media_index.json')
+        try:
+            # Off by default: a re-encoded re-send is stored as sent
+            assert not config.REUSE_NEAR_DUPLICATES
+            assert store(jpeg(original, quality=70), 'images/zero_photo.jpg') != store(jpeg(original), 'images/one_photo.jpg')
+
+            config.REUSE_NEAR_DUPLICATES = True
+            first = store(jpeg(original, quality=95), 'images/one_photo.jpg')
+            # Re-compressed at the same size: the photo stored earlier in this run is used
+            assert store(jpeg(original, quality=80), 'images/two_photo.jpg') == first
+            # Resized, cropped, turned grey, a different picture, or a PNG: stored on its own
+            assert store(jpeg(original.resize((480, 360))), 'images/three_photo.jpg') != first
+            assert store(jpeg(original.crop((0, 0, 640, 360))), 'images/four_photo.jpg') != first
+            assert store(jpeg(original.convert('L').convert('RGB')), 'images/five_photo.jpg') != first
+            assert store(jpeg(photo(2)), 'images/six_photo.jpg') != first
+            png = io.BytesIO()
+            original.save(png, 'PNG')
+            assert store(png.getvalue(), 'images/seven_photo.png') != first
+
+            # The report groups the copies already on disk
+            for name in os.listdir(tmp):
+                if name.endswith(('.jpg', '.png')) and os.path.join('images', name) != first:
+                    os.remove(os.path.join(tmp, name))
+            original.save(os.path.join(tmp, 'legacy.png'))
+            groups = near_duplicate_groups(6)
+            assert [sorted(entry['path'] for entry in group) for group in groups] == [sorted([first, 'images/legacy.png'])]
+        finally:
+            (config.IMAGES_DIR, config.MEDIA_MANIFEST_PATH, config.MEDIA_INDEX_PATH,
+             config.REUSE_NEAR_DUPLICATES) = saved
+
+
+if __name__ == "__main__":
+    test_bk_tree()
+    test_near_duplicates_are_reused()
+    print("✅ Near-duplicate images are found and reused")
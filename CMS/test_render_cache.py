@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test Render Cache
+A page built from identical inputs is a hit until its inputs or its file change
+"""
+
+import os
+import json
+import tempfile
+from datetime import date
+
+import config
+from render_cache import RenderCache, render_key, first_published
+
+PARSED = {
+    'title': 'Cache Test',
+    'description': '',
+    'content': 'Hello **world**',
+    'attachments': [{'filename': 'a.png', 'content_type': 'image/png', 'content': b'\x89PNG' * 40}],
+}
+
+
+def test_hit_until_inputs_or_page_change():
+    with tempfile.TemporaryDirectory() as site:
+        pages_dir = config.PAGES_DIR
+        config.PAGES_DIR = site
+        try:
+            page_path = os.path.join(site, 'cachetest.html')
+            with open(page_path, 'w', encoding='utf-8') as f:
+                f.write('<html>page</html>')
+
+            cache = RenderCache(os.path.join(site, 'render_cache.json'))
+            key = render_key('simple', PARSED)
+            assert cache.lookup('cachetest.html', key) is None
+
+            cache.store({'title': 'Cache Test', 'filename': 'cachetest.html', 'description': 'Hello',
+                         'tile_image': None, 'saved_files': [], 'cache_key': key})
+            cache.save()
+            cache = RenderCache(cache.path)
+            assert cache.lookup('cachetest.html', key)['cached']
+
+            # Any input change is a different key
+            changed = dict(PARSED, attachments=[dict(PARSED['attachments'][0], content=b'\x89PNG' * 41)])
+            assert render_key('simple', changed) != key
+            assert render_key('enhanced', PARSED) != key
+
+            # A page edited since the build must be rebuilt
+            with open(page_path, 'a', encoding='utf-8') as f:
+                f.write('\n')
+            assert cache.lookup('cachetest.html', key) is None
+        finally:
+            config.PAGES_DIR = pages_dir
+
+
+def test_source_stays_out_of_the_committed_cache():
+    with tempfile.TemporaryDirectory() as site:
+        pages_dir = config.PAGES_DIR
+        config.PAGES_DIR = site
+        try:
+            with open(os.path.join(site, 'cachetest.html'), 'w', encoding='utf-8') as f:
+                f.write('<html>page</html>')
+            source = {'builder': 'simple', 'title': 'Cache Test', 'content': PARSED['content'], 'attachments': []}
+            cache = RenderCache(os.path.join(site, 'render_cache.json'))
+            cache.store({'title': 'Cache Test', 'filename': 'cachetest.html', 'description': 'Hello', 'tile_image': None,
+                         'saved_files': [], 'cache_key': render_key('simple', PARSED), 'source': source})
+            cache.save()
+
+            with open(cache.path, 'r', encoding='utf-8') as f:
+                committed = f.read()
+            assert 'source_hash' in committed and 'Hello **world**' not in committed
+            assert RenderCache(cache.path).source('cachetest.html') == source
+
+            # A local source from some other build is not used to verify this one
+            with open(cache.sources_path, 'w', encoding='utf-8') as f:
+                json.dump({'cachetest.html': dict(source, content='Older draft')}, f)
+            assert RenderCache(cache.path).source('cachetest.html') is None
+        finally:
+            config.PAGES_DIR = pages_dir
+
+
+def test_first_published_date_is_kept():
+    """Recorded date first, then the Created line of the page on disk"""
+    with tempfile.TemporaryDirectory() as site:
+        pages_dir = config.PAGES_DIR
+        config.PAGES_DIR = site
+        try:
+            with open(os.path.join(site, 'old.html'), 'w', encoding='utf-8') as f:
+                f.write('<p><em>Created: June 01, 2025</em></p>')
+            cache = RenderCache(os.path.join(site, 'render_cache.json'))
+            assert first_published('old.html', cache) == date(2025, 6, 1)
+
+            cache.entries['old.html'] = {'created': '2024-02-03'}
+            assert first_published('old.html', cache) == date(2024, 2, 3)
+            assert first_published('new.html', cache) == date.today()
+        finally:
+            config.PAGES_DIR = pages_dir
+
+
+if __name__ == "__main__":
+    test_hit_until_inputs_or_page_change()
+    test_source_stays_out_of_the_committed_cache()
+    test_first_published_date_is_kept()
+    print("✅ Render cache hits only for unchanged pages")
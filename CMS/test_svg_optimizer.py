@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Test SVG Optimizer
+Editor leftovers and script are removed, numbers are rounded without
+changing what the path says, and the bytes saved reach the media index
+"""
+
+import os
+import random
+import tempfile
+
+import config
+import simple_email_processor
+from media_index import MediaIndex
+from svg_optimizer import collapse_transform, format_path, optimize_files, optimize_svg, parse_path
+
+EDITOR_SVG = b'''<?xml version="1.0" encoding="UTF-8"?>
+<!-- Created with Inkscape -->
+<!DOCTYPE svg [<!ENTITY hidden "<script>alert(2)</script>">]>
+<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink"
+     xmlns:inkscape="http://www.inkscape.org/namespaces/inkscape"
+     width="120.000000" height="80px" inkscape:version="1.3" onload="alert(1)">
+  <metadata><title>editor only</title></metadata>
+  <defs>
+    <linearGradient id="used"><stop offset="0.500000"/></linearGradient>
+    <linearGradient id="unused" xlink:href="#only-used-by-unused"/>
+    <linearGradient id="only-used-by-unused"/>
+  </defs>
+  <script>alert(3)</script>
+  &hidden;
+  <g transform="translate(5,5) translate(-5,-5)" inkscape:label="Layer 1">
+    <path fill="url(#used)" d="M 10.123456,20.000001 L 30.5,40.25 A 5,5 0 0 1 60.000,70.000 Z"/>
+    <a xlink:href=" java&#x09;script:alert(4)"><text x="1.00000">Two  <tspan>words</tspan></text></a>
+    <set attributeName="href" to="javascript:alert(5)"/>
+    <a><set attributeName="xlink:href" to="java&#x09;script:alert(6)"/></a>
+    <a><animate attributeName="fill" values="red; java&#x0a;script:alert(7)"/></a>
+  </g>
+</svg>
+'''
+
+
+def test_optimize():
+    optimized = optimize_svg(EDITOR_SVG).decode('utf-8')
+    assert len(optimized) < len(EDITOR_SVG) * 0.7
+    for gone in ('Inkscape', 'inkscape', 'metadata', 'alert', 'script', 'unused', '<!--', 'transform'):
+        assert gone not in optimized, gone
+    assert 'id="used"' in optimized and 'offset=".5"' in optimized
+    assert 'd="M10.123 20 30.5 40.25A5 5 0 0 1 60 70Z"' in optimized
+    assert '<text x="1">Two  <tspan>words</tspan></text>' in optimized
+    assert 'width="120" height="80"' in optimized
+    assert optimize_svg(optimized.encode('utf-8')) == optimized.encode('utf-8')
+    assert optimize_svg(b'<svg><unclosed></svg>') == b'<svg><unclosed></svg>'
+
+    assert collapse_transform('translate(10) translate(-10)', 3) == ''
+    assert collapse_transform('rotate(90) scale(2)', 3) == 'matrix(0 2 -2 0 0 0)'
+    assert collapse_transform('scale(2) scale(1.5, 1)', 3) == 'scale(3 2)'
+
+
+def test_paths_round_trip():
+    rng = random.Random(0)
+    for _ in range(200):
+        commands = []
+        for command in rng.choices('MmLlHhVvCcSsQqTtAaZz', k=12):
+            count = {'m': 2, 'l': 2, 'h': 1, 'v': 1, 'c': 6, 's': 4, 'q': 4, 't': 2, 'a': 7, 'z': 0}[command.lower()]
+            arguments = [rng.choice([rng.uniform(-100, 100), rng.uniform(-1, 1), float(rng.randint(-9, 9))])
+                         for _ in range(count)]
+            if command in 'Aa':
+                arguments[3:5] = [rng.randint(0, 1), rng.randint(0, 1)]
+            commands.append((command, arguments))
+        commands[0] = ('M', [1.0, 2.0])
+        d = ' '.join(f"{command} {' '.join(map(str, arguments))}" for command, arguments in commands)
+        reparsed = parse_path(format_path(parse_path(d), 3))
+        expected = [(command, [round(value, 3) for value in arguments]) for command, arguments in commands]
+        # Linetos written after a moveto without their letter come back as linetos
+        assert [(command, [round(value, 3) for value in arguments]) for command, arguments in reparsed] == expected
+
+
+def test_attached_svg_is_optimized_and_indexed():
+    saved = (simple_email_processor.IMAGES_DIR, config.IMAGES_DIR, config.MEDIA_MANIFEST_PATH, config.MEDIA_INDEX_PATH)
+    with tempfile.TemporaryDirectory() as tmp:
+        simple_email_processor.IMAGES_DIR = config.IMAGES_DIR = tmp
+        config.MEDIA_MANIFEST_PATH = os.path.join(tmp, 'media_manifest.json')
+        config.MEDIA_INDEX_PATH = os.path.join(tmp, 'media_index.json')
+        try:
+            attachment = {'filename': 'diagram.svg', 'content_type': 'image/svg+xml', 'data': EDITOR_SVG}
+            path = simple_email_processor.save_attachment(attachment, 'T')
+            stored = os.path.join(tmp, os.path.basename(path))
+            with open(stored, 'rb') as f:
+                assert f.read() == optimize_svg(EDITOR_SVG)
+            entry = MediaIndex().image(stored)
+            assert (entry['format'], entry['width'], entry['height']) == ('svg', 120, 80)
+            assert entry['original_bytes'] == len(EDITOR_SVG)
+            assert entry['saved_bytes'] == len(EDITOR_SVG) - os.path.getsize(stored) > 0
+
+            # Batch mode: a hand-placed SVG is rewritten in place and indexed, a content-addressed
+            # one is left alone (its name is its bytes' hash); a second run changes nothing
+            hand_placed, unoptimized = os.path.join(tmp, 'logo.svg'), os.path.join(tmp, '0123456789abcdef.svg')
+            for name in (hand_placed, unoptimized):
+                with open(name, 'wb') as f:
+                    f.write(EDITOR_SVG)
+            sizes = optimize_files([hand_placed, stored, unoptimized])
+            assert list(sizes) == [hand_placed] and sizes[hand_placed][1] < sizes[hand_placed][0]
+            assert os.path.getsize(unoptimized) == len(EDITOR_SVG)
+            assert MediaIndex().image(hand_placed)['saved_bytes'] == sizes[hand_placed][0] - sizes[hand_placed][1]
+            assert all(before == after for before, after in optimize_files([hand_placed]).values())
+        finally:
+            (simple_email_processor.IMAGES_DIR, config.IMAGES_DIR, config.MEDIA_MANIFEST_PATH,
+             config.MEDIA_INDEX_PATH) = saved
+
+
+if __name__ == "__main__":
+    test_optimize()
+    test_paths_round_trip()
+    test_attached_svg_is_optimized_and_indexed()
+    print("✅ SVGs are optimized, sanitized and indexed")
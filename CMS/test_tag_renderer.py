@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test Tag Renderer
+The single-pass renderer must produce exactly what the legacy renderer does
+"""
+
+import re
+
+from benchmark_corpus import sample_emails, mixed_emails
+from legacy_renderer import markdown_to_html as legacy_markdown_to_html
+from tag_renderer import render_markdown, stream_markdown, embeds_youtube
+
+
+def render_both(content):
+    return legacy_markdown_to_html(content), render_markdown(content)
+
+
+def test_sample_emails_match_legacy():
+    """Every corpus email (LF and CRLF) renders identically"""
+    for name, content in sample_emails():
+        expected, actual = render_both(content)
+        assert actual == expected, name
+
+
+def test_mixed_emails_match_legacy():
+    """Shuffled corpus lines (stray tags, wrapped links, blank runs) render identically"""
+    for i, content in enumerate(mixed_emails(300)):
+        expected, actual = render_both(content)
+        assert actual == expected, f"mixed email {i}: {content!r}"
+
+
+def test_rendering_is_deterministic():
+    """Same content, same bytes; repeated carousels on one page keep distinct ids"""
+    for name, content in sample_emails():
+        assert render_markdown(content) == render_markdown(content), name
+    carousel = "[Carousel]\na.jpg\nb.jpg\n[/Carousel]"
+    rendered = render_markdown(f"{carousel}\n\n{carousel}")
+    first, second = sorted(set(re.findall(r'id="(carousel_\w+)"', rendered)))
+    assert second == f"{first}_2"
+
+
+def test_stream_matches_render():
+    """Streamed chunks join to the rendered page, and a long page arrives in pieces"""
+    for i, content in enumerate(mixed_emails(300)):
+        assert ''.join(stream_markdown(content)) == render_markdown(content), f"mixed email {i}: {content!r}"
+    long_page = "A paragraph.\n\n" * 10000
+    assert sum(1 for _ in stream_markdown(long_page)) > 10
+
+
+def test_layout_uses_stylesheet_classes():
+    """Alignment and device blocks are styled by style.css, not inline"""
+    rendered = render_markdown("[center]Hi\n[right]## Title\n[left]photo.jpg\n[Mobile][center]m[/Mobile]\n[Desktop]d[/Desktop]")
+    assert 'style=' not in rendered
+    for css_class in ('align-center', 'align-right', 'flex-left', 'mobile-only align-center', 'desktop-only'):
+        assert f'<div class="{css_class}">' in rendered, css_class
+
+    rendered = render_markdown("![Pond](../images/pond.jpg)")
+    assert rendered == '<img src="../images/pond.jpg" alt="Pond" class="email-image">'
+
+
+def test_carousels_share_one_runtime():
+    """Carousels are declarative markup; the first loads carousel.js and later slides load lazily"""
+    rendered = render_markdown("[Carousel]\na.jpg\nb.jpg\nc.mp4\n[/Carousel]\n\n[Carousel]\nd.jpg\n[/Carousel]")
+    assert rendered.count('src="../carousel.js?v=') == 1
+    assert 'onclick=' not in rendered and 'style=' not in rendered and '<style>' not in rendered
+    assert '<img src="../images/a.jpg" alt="Carousel Image">' in rendered
+    assert '<img src="../images/b.jpg" alt="Carousel Image" loading="lazy">' in rendered
+    assert '<video controls preload="none">' in rendered
+
+
+def test_youtube_links_render_facades():
+    """A YouTube link is a thumbnail until clicked; no player iframe is in the page"""
+    content = "Watch https://www.youtube.com/watch?v=dQw4w9WgXcQ now"
+    rendered = render_markdown(content)
+    assert '<iframe' not in rendered
+    assert 'data-youtube="dQw4w9WgXcQ"' in rendered and 'i.ytimg.com/vi/dQw4w9WgXcQ/' in rendered
+    assert 'src="../youtube.js?v=' in rendered
+    assert embeds_youtube(content) and not embeds_youtube("no video here")
+
+
+if __name__ == "__main__":
+    test_sample_emails_match_legacy()
+    test_mixed_emails_match_legacy()
+    test_rendering_is_deterministic()
+    test_stream_matches_render()
+    test_layout_uses_stylesheet_classes()
+    test_carousels_share_one_runtime()
+    test_youtube_links_render_facades()
+    print("✅ Tag renderer matches the legacy renderer")
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Test Text Scanners
+Each linear-time scanner must agree with the regex it replaced
+"""
+
+import re
+import random
+
+from text_scan import sub_pairs, find_pair, sub_bracket_paren, sub_prefixed_paren, sub_links, strip_tags
+
+ALPHABET = ['[', ']', '(', ')', '!', '<', '>', '\n', 'a', ' ', '![', '](', '[VIDEO](', '<li>', '</li>', '[b]', '[/b]', '[B]']
+
+
+def random_texts(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield ''.join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 40)))
+
+
+def test_scanners_match_regexes():
+    pairs = re.compile(r'\[b\](.*?)\[/b\]', re.DOTALL | re.IGNORECASE)
+    items = re.compile(r'(<li>.*?</li>)', re.DOTALL)
+    images = re.compile(r'!\[(.*?)\]\((.*?)\)')
+    videos = re.compile(r'\[VIDEO\]\((.*?)\)')
+    links = re.compile(r'\[([^\]]+)\]\(([^)]+)\)')
+    tags = re.compile(r'<[^>]+>')
+    b_open, b_close = re.compile(r'\[b\]', re.IGNORECASE), re.compile(r'\[/b\]', re.IGNORECASE)
+
+    for text in random_texts(5000):
+        assert sub_pairs(text, b_open, b_close, lambda _, inner: f'<{inner}>') == pairs.sub(r'<\1>', text), text
+        assert (sub_pairs(text, re.compile('<li>'), re.compile('</li>'), lambda item, _: f'<ul>{item}</ul>')
+                == items.sub(r'<ul>\1</ul>', text)), text
+        match = pairs.search(text)
+        assert find_pair(text, b_open, b_close) == (match.group(1) if match else None), text
+        assert sub_bracket_paren(text, '![', '{0}|{1}'.format) == images.sub(r'\1|\2', text), text
+        assert sub_prefixed_paren(text, '[VIDEO](', '<{0}>'.format) == videos.sub(r'<\1>', text), text
+        assert sub_links(text, '{0}|{1}'.format) == links.sub(r'\1|\2', text), text
+        assert strip_tags(text) == tags.sub('', text), text
+
+
+if __name__ == "__main__":
+    test_scanners_match_regexes()
+    print("✅ Text scanners match the regexes they replace")
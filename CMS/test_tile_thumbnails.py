@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test Tile Thumbnails
+Backfilling index.html points each tile at a cropped 1x/2x thumbnail, and a
+second backfill finds nothing left to do; only the tiles in the first row load
+with the page
+"""
+
+import os
+import tempfile
+
+from PIL import Image
+
+import config
+from tile_thumbnails import backfill, mark_lazy_tiles
+from simple_email_processor import remove_tile_markup
+
+INDEX = '''<div id="project-container" class="project-container">
+            <div class="project">
+                <img src="images/wide.png" alt="Wide &amp; tall" loading="lazy">
+                <h3>Wide</h3>
+                <p>One</p>
+                <a href="Pages/wide.html">Read On...</a>
+            </div>
+            <div class="project">
+                <img src="https://example.com/remote.png" alt="Remote">
+                <h3>Remote</h3>
+                <p>Two</p>
+                <a href="Pages/remote.html">Read On...</a>
+            </div>
+</div>'''
+
+
+def test_backfill():
+    images_dir, media_index, eager_tiles = config.IMAGES_DIR, config.MEDIA_INDEX_PATH, config.EAGER_TILES
+    with tempfile.TemporaryDirectory() as tmp:
+        config.IMAGES_DIR, config.MEDIA_INDEX_PATH = tmp, os.path.join(tmp, 'media_index.json')
+        config.EAGER_TILES = 1
+        try:
+            Image.new('RGB', (1000, 300), (10, 120, 200)).save(os.path.join(tmp, 'wide.png'))
+            updated, files = backfill(INDEX)
+            assert len(files) == 2
+            assert '<img src="images/variants/' in updated and '-tile-800x500.webp 2x"' in updated
+            assert 'alt="Wide &amp; tall" width="400" height="250" decoding="async" style=' in updated
+            assert 'style="background: #0a78c8 url(data:image/webp;base64,' in updated
+            assert '<img src="https://example.com/remote.png" alt="Remote" loading="lazy">' in updated
+            with Image.open(os.path.join(tmp, 'variants', os.path.basename(files[1]))) as retina:
+                assert retina.size == (800, 500)
+
+            # Tiles stay removable, and a second pass changes nothing
+            assert remove_tile_markup(updated, 'wide.html')[1]
+            assert backfill(updated) == (updated, [])
+
+            # A new tile at the top pushes the old first tile below the fold
+            container = '<div id="project-container" class="project-container">'
+            pushed = mark_lazy_tiles(updated.replace(container, container + '''
+            <div class="project">
+                <img src="images/new.png" alt="New" decoding="async">
+            </div>'''))
+            assert '<img src="images/new.png" alt="New" decoding="async">' in pushed
+            assert 'alt="Wide &amp; tall" width="400" height="250" decoding="async" loading="lazy" style=' in pushed
+            assert mark_lazy_tiles(pushed) == pushed
+        finally:
+            config.IMAGES_DIR, config.MEDIA_INDEX_PATH, config.EAGER_TILES = images_dir, media_index, eager_tiles
+
+
+if __name__ == "__main__":
+    test_backfill()
+    print("✅ Tiles point at cached thumbnails")
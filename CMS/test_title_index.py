@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Test Title Version Index
+Stale and unchanged emails are skipped, a page deleted from the site can be
+published again, and the sequential runner only downloads the bodies it needs
+"""
+
+import os
+import tempfile
+from datetime import datetime, timezone
+
+import config
+from github_actions_email_processor import GitHubActionsEmailProcessor
+from title_index import TitleVersionIndex
+
+TILE = '''<div class="project">
+    <img src="images/python.jpg" alt="Garden">
+    <h3>Garden</h3>
+    <p>Plants</p>
+    <a href="Pages/garden.html">Read On...</a>
+</div>'''
+
+
+def message(subject: str, hour: int, body: str) -> bytes:
+    return (f"From: {os.getenv('AUTHORIZED_SENDER', 'cyohn55@yahoo.com')}\r\nSubject: {subject}\r\n"
+            f"Date: Mon, 01 Jan 2024 {hour:02d}:00:00 +0000\r\n\r\n{body}\r\n").encode('utf-8')
+
+
+class FakeMailbox:
+    """imaplib stand-in with `messages` (sequence number -> bytes) in its inbox; records body downloads"""
+
+    def __init__(self, messages: dict):
+        self.messages = messages
+        self.bodies = []
+
+    def select(self, folder):
+        return ('OK', [b'']) if folder == 'inbox' else ('NO', [b''])
+
+    def search(self, charset, criteria):
+        return 'OK', [' '.join(self.messages).encode()]
+
+    def fetch(self, ids, parts):
+        if parts == '(RFC822)':
+            self.bodies.append(ids)
+            return 'OK', [(f'{ids} (RFC822'.encode(), self.messages[ids])]
+        return 'OK', [(f'{seq} (BODY[HEADER]'.encode(), self.messages[seq].split(b'\r\n\r\n')[0] + b'\r\n\r\n')
+                      for seq in ids.split(',')]
+
+    def copy(self, seq, folder):
+        return 'OK', []
+
+    def close(self):
+        pass
+
+    def logout(self):
+        pass
+
+
+class Site:
+    """A throwaway site (CMS/, Pages/, index.html) to run from, as the runners run from CMS/"""
+
+    def __enter__(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp.name
+        self.cms, self.pages = os.path.join(root, 'CMS'), os.path.join(root, 'Pages')
+        os.makedirs(self.cms)
+        os.makedirs(self.pages)
+        self.index = os.path.join(root, 'index.html')
+        self.write_index('')
+        self.saved = (os.getcwd(), config.PAGES_DIR, os.environ.get('GMAIL_PASSWORD'))
+        os.environ['GMAIL_PASSWORD'] = 'test'
+        os.chdir(self.cms)
+        config.PAGES_DIR = self.pages
+        return self
+
+    def __exit__(self, *exc):
+        os.chdir(self.saved[0])
+        config.PAGES_DIR = self.saved[1]
+        if self.saved[2] is None:
+            os.environ.pop('GMAIL_PASSWORD', None)
+        else:
+            os.environ['GMAIL_PASSWORD'] = self.saved[2]
+        self.tmp.cleanup()
+
+    def write_index(self, tiles: str):
+        with open(self.index, 'w', encoding='utf-8') as f:
+            f.write(f'<div id="project-container" class="project-container">{tiles}</div>')
+
+    def processor(self, mailbox: FakeMailbox, processor_class=GitHubActionsEmailProcessor):
+        processor = processor_class()
+        processor.processed_emails = set()
+        processor.processed_emails_file = os.path.join(self.cms, 'processed_emails_cloud.json')
+        processor.title_index = TitleVersionIndex(os.path.join(self.cms, 'title_versions.json'))
+        processor.connect_to_email = lambda: mailbox
+        return processor
+
+
+def test_unchanged_only_while_the_page_is_on_the_site():
+    with Site() as site:
+        index = TitleVersionIndex(os.path.join(site.cms, 'title_versions.json'))
+        index.record('Garden', datetime(2024, 1, 1, tzinfo=timezone.utc), 'digest')
+        assert not index.is_unchanged('Garden', 'digest')  # never written
+
+        with open(os.path.join(site.pages, 'garden.html'), 'w', encoding='utf-8') as f:
+            f.write('<html></html>')
+        site.write_index(TILE)
+        assert index.is_unchanged('Garden', 'digest')
+        assert not index.is_unchanged('Garden', 'other digest')
+
+        # Deleted by hand: the tile (or the page) is gone, so the same draft publishes again
+        site.write_index('')
+        assert not index.is_unchanged('Garden', 'digest')
+
+        index.forget('garden.html')
+        assert not index.is_stale('Garden', datetime(2023, 1, 1, tzinfo=timezone.utc))
+
+
+def test_sequential_runner_downloads_only_winners():
+    with Site() as site:
+        mailbox = FakeMailbox({
+            '1': message('Garden', 10, '# Old draft'),
+            '2': message('Garden', 11, '# New draft'),
+            '3': message('Abc', 12, '# Short title, markdown body'),
+            '4': message('Abc', 13, 'plain words'),  # newest, but not a page email
+            '5': message('[DELETE CONFIRM] Garden', 14, ''),
+        })
+        processor = site.processor(mailbox)
+        published = []
+
+        def create_page_from_email(raw_msg):
+            published.append(raw_msg.get_payload().strip())
+            return {'success': True}
+
+        processor.create_page_from_email = create_page_from_email
+        processor.process_new_emails()
+
+        # The older Garden draft is never downloaded; Abc falls back to its older page email
+        assert sorted(mailbox.bodies) == ['2', '3', '4']
+        assert sorted(published) == ['# New draft', '# Short title, markdown body']
+        assert processor.processed_emails == {f'inbox:{seq}' for seq in '12345'}
+
+        # The same draft re-sent after its page was deleted is published again
+        mailbox.messages = {'6': message('Garden', 15, '# New draft')}
+        published.clear()
+        processor.process_new_emails()
+        assert published == ['# New draft']
+
+        # ...but not while the page and its tile are still there
+        with open(os.path.join(site.pages, 'garden.html'), 'w', encoding='utf-8') as f:
+            f.write('<html></html>')
+        site.write_index(TILE)
+        mailbox.messages = {'7': message('Garden', 16, '# New draft')}
+        published.clear()
+        processor.process_new_emails()
+        assert published == [] and 'inbox:7' in processor.processed_emails
+
+
+if __name__ == "__main__":
+    test_unchanged_only_while_the_page_is_on_the_site()
+    test_sequential_runner_downloads_only_winners()
+    print("✅ Title index skips only what is still published")
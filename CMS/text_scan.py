@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Linear-Time Text Scanners for Portfolio Website
+Drop-in replacements for the delimiter regexes the renderer used to run.
+
+Patterns like `\\[Carousel\\](.*?)\\[/Carousel\\]`, `(<li>.*?</li>)`,
+`!\\[(.*?)\\]\\((.*?)\\)` or `<[^>]+>` are fine on well-formed input but go
+quadratic (the image pattern cubic) when their closing delimiter never comes:
+the regex engine retries from every opener and rescans to the end of the text
+each time. A few kilobytes of unmatched `![a](` took seconds.
+
+Each function here produces exactly what the regex substitution produced, but
+uses the fact that a lazy match's first closer is shared by every opener in
+front of it: once the closer is missing, no later opener can match either, so
+the scan stops (or skips to the next line for single-line patterns) instead of
+retrying. Every character is looked at a bounded number of times.
+
+benchmark_adversarial.py times every rendering entry point on inputs built to
+trigger the old blow-ups.
+"""
+
+import re
+from typing import Callable, List, Optional, Tuple
+
+
+def sub_pairs(text: str, opener: re.Pattern, closer: re.Pattern,
+              replace: Callable[[str, str], str]) -> str:
+    """Like re.sub(opener (.*?) closer, DOTALL) with `replace(whole, inner)`"""
+    out: List[str] = []
+    pos = 0
+    while True:
+        start = opener.search(text, pos)
+        if not start:
+            break
+        end = closer.search(text, start.end())
+        if not end:
+            # Every later opener would look for the same missing closer
+            break
+        out.append(text[pos:start.start()])
+        out.append(replace(text[start.start():end.end()], text[start.end():end.start()]))
+        pos = end.end()
+    if not out:
+        return text
+    out.append(text[pos:])
+    return ''.join(out)
+
+
+def find_pair(text: str, opener: re.Pattern, closer: re.Pattern) -> Optional[str]:
+    """Inner text of the first opener (.*?) closer match (DOTALL), like re.search(...).group(1)"""
+    start = opener.search(text)
+    if not start:
+        return None
+    end = closer.search(text, start.end())
+    return text[start.end():end.start()] if end else None
+
+
+def sub_bracket_paren(text: str, opener: str, replace: Callable[[str, str], str]) -> str:
+    """Like re.sub(re.escape(opener) + r'(.*?)\\]\\((.*?)\\)', ...) with `replace(label, target)`.
+
+    Both groups stop at a newline, so when one line has no match left the
+    scan moves straight on to the next line.
+    """
+    out: List[str] = []
+    pos = search = 0
+    eol = -1
+    while True:
+        start = text.find(opener, search)
+        if start < 0:
+            break
+        if start > eol:
+            eol = text.find('\n', start)
+            if eol < 0:
+                eol = len(text)
+        middle = text.find('](', start + len(opener), eol)
+        close = text.find(')', middle + 2, eol) if middle >= 0 else -1
+        if close < 0:
+            # No later opener on this line can find a closer either
+            search = eol + 1
+            if search >= len(text):
+                break
+            continue
+        out.append(text[pos:start])
+        out.append(replace(text[start + len(opener):middle], text[middle + 2:close]))
+        pos = search = close + 1
+    if not out:
+        return text
+    out.append(text[pos:])
+    return ''.join(out)
+
+
+def sub_prefixed_paren(text: str, opener: str, replace: Callable[[str], str]) -> str:
+    """Like re.sub(re.escape(opener) + r'(.*?)\\)', ...) with `replace(inner)`; `opener` ends in '('"""
+    out: List[str] = []
+    pos = search = 0
+    eol = -1
+    while True:
+        start = text.find(opener, search)
+        if start < 0:
+            break
+        if start > eol:
+            eol = text.find('\n', start)
+            if eol < 0:
+                eol = len(text)
+        close = text.find(')', start + len(opener), eol)
+        if close < 0:
+            search = eol + 1
+            if search >= len(text):
+                break
+            continue
+        out.append(text[pos:start])
+        out.append(replace(text[start + len(opener):close]))
+        pos = search = close + 1
+    if not out:
+        return text
+    out.append(text[pos:])
+    return ''.join(out)
+
+
+def sub_links(text: str, replace: Callable[[str, str], str]) -> str:
+    """Like re.sub(r'\\[([^\\]]+)\\]\\(([^)]+)\\)', ...) with `replace(label, url)`; may span lines"""
+    out: List[str] = []
+    pos = search = 0
+    bracket = paren = -1
+    while True:
+        start = text.find('[', search)
+        if start < 0:
+            break
+        # The label runs to the first ']' after '[', shared by every '[' before it
+        if bracket <= start:
+            bracket = text.find(']', start + 1)
+            if bracket < 0:
+                break
+        if bracket == start + 1 or not text.startswith('(', bracket + 1):
+            search = start + 1
+            continue
+        if paren <= bracket + 1:
+            paren = text.find(')', bracket + 2)
+            if paren < 0:
+                break
+        if paren == bracket + 2:
+            # Empty url: no '[' up to this ']' can match
+            search = bracket + 1
+            continue
+        out.append(text[pos:start])
+        out.append(replace(text[start + 1:bracket], text[bracket + 2:paren]))
+        pos = search = paren + 1
+    if not out:
+        return text
+    out.append(text[pos:])
+    return ''.join(out)
+
+
+def strip_tags(text: str, replacement: str = '') -> str:
+    """Like re.sub(r'<[^>]+>', replacement, text)"""
+    out: List[str] = []
+    pos = search = 0
+    while True:
+        start = text.find('<', search)
+        if start < 0:
+            break
+        end = text.find('>', start + 1)
+        if end < 0:
+            break
+        if end == start + 1:
+            search = end
+            continue
+        out.append(text[pos:start])
+        out.append(replacement)
+        pos = search = end + 1
+    if not out:
+        return text
+    out.append(text[pos:])
+    return ''.join(out)
+
+
+def find_tile(content: str, opener: re.Pattern, anchor: re.Pattern, tile: re.Pattern) -> Optional[Tuple[int, int]]:
+    """Span of the first `tile` match that starts at an `opener` and contains `anchor`.
+
+    The tile markup is short, so instead of trying the whole tile regex at
+    every opener in the page, each anchor is matched only against the
+    opener nearest in front of it.
+    """
+    openers = opener.finditer(content)
+    nearest = None
+    following = next(openers, None)
+    tried = None
+    for link in anchor.finditer(content):
+        while following and following.start() < link.start():
+            nearest, following = following, next(openers, None)
+        if nearest is None or nearest is tried:
+            continue
+        tried = nearest
+        match = tile.match(content, nearest.start())
+        if match and match.end() >= link.end():
+            return match.start(), match.end()
+    return None
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Tile Thumbnails for Portfolio Website
+The home page draws every Research tile image in a box about 320x200px, so
+each tile gets a thumbnail cropped to config.TILE_THUMBNAIL_SIZE plus one at
+twice that size for high-density screens, instead of the full attachment:
+
+    <img src="images/variants/<hash>-tile-400x250.webp"
+         srcset="images/variants/<hash>-tile-800x500.webp 2x" alt="..." width="400" height="250" ...>
+
+Thumbnails are WebP, named by the same content hash as the responsive
+variants (image_variants.py), so a tile image is only cropped and encoded
+once however many tiles show it.
+
+New tiles go in at the top of the page, so the first config.EAGER_TILES
+tile images load with the page and the ones below wait until they are
+scrolled to (mark_lazy_tiles, run whenever a tile is added or removed).
+
+The page builders make the thumbnail when they render a page; this script
+backfills the tiles already in index.html:
+
+Usage:
+    python tile_thumbnails.py [--no-commit]
+"""
+
+import os
+import re
+import sys
+import logging
+import argparse
+import threading
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from PIL import Image, ImageOps
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from image_variants import RASTER_FORMATS, content_stem, variants_dir, is_cached, encode_all
+from media_index import MediaIndex, image_attributes
+
+try:
+    import config  # Local import when running from CMS directory
+except ModuleNotFoundError:
+    from . import config  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+# The <img> of each tile in index.html
+TILE_IMAGE = re.compile(r'(<div class="project">\s*)(<img[^>]*>)', re.IGNORECASE)
+IMG_ATTRIBUTE = re.compile(r'\b(src|alt)="([^"]*)"', re.IGNORECASE)
+LAZY_LOADING = re.compile(r'\s+loading="lazy"', re.IGNORECASE)
+
+SCALES = (1, 2)
+
+
+class Thumbnail(NamedTuple):
+    """The 1x and 2x thumbnails of one tile image"""
+    stem: str
+    width: int  # 1x size
+    height: int
+
+    def url(self, scale: int) -> str:
+        return f"images/variants/{self.stem}-tile-{self.width * scale}x{self.height * scale}.webp"
+
+    def files(self) -> List[str]:
+        """Paths of the thumbnail files, as the page builders list saved media"""
+        return [f"../{self.url(scale)}" for scale in SCALES]
+
+
+def source_path(tile_image: str) -> Optional[str]:
+    """File behind a tile's 'images/x' src, or None when it is elsewhere (a URL, a thumbnail)"""
+    if not tile_image.startswith('images/') or tile_image.startswith('images/variants/'):
+        return None
+    return os.path.join(config.IMAGES_DIR, os.path.basename(tile_image))
+
+
+def plan_thumbnail(tile_image: str) -> Optional[Thumbnail]:
+    """The thumbnail `tile_image` gets, or None when it can't have one"""
+    source = source_path(tile_image)
+    if not config.TILE_THUMBNAILS or source is None:
+        return None
+    with Image.open(source) as img:
+        if img.format not in RASTER_FORMATS or getattr(img, 'is_animated', False):
+            return None
+    width, height = config.TILE_THUMBNAIL_SIZE
+    return Thumbnail(content_stem(source), width, height)
+
+
+def write_thumbnail(source: str, thumbnail: Thumbnail, quality: int) -> Thumbnail:
+    """Crop and encode both sizes of `thumbnail` (runs in a worker process)"""
+    os.makedirs(variants_dir(), exist_ok=True)
+    with Image.open(source) as img:
+        upright = ImageOps.exif_transpose(img)
+        upright = upright.convert('RGBA' if upright.mode in ('RGBA', 'LA', 'PA', 'P') else 'RGB')
+    for scale in SCALES:
+        size = (thumbnail.width * scale, thumbnail.height * scale)
+        target = os.path.join(variants_dir(), os.path.basename(thumbnail.url(scale)))
+        tmp_path = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+        # Same crop as the tile's object-fit: cover
+        ImageOps.fit(upright, size, Image.LANCZOS).save(tmp_path, 'WEBP', quality=quality, method=6)
+        os.replace(tmp_path, target)
+    return thumbnail
+
+
+def build_thumbnails(tile_images: List[str]) -> Dict[str, Thumbnail]:
+    """Thumbnail for each tile image that can have one, encoding the missing ones in parallel"""
+    done: Dict[str, Thumbnail] = {}
+    pending = []
+    for tile_image in dict.fromkeys(tile_images):
+        try:
+            thumbnail = plan_thumbnail(tile_image)
+        except Exception as e:
+            logger.warning(f"Could not read {tile_image} for a tile thumbnail: {e}")
+            continue
+        if thumbnail is None:
+            continue
+        if is_cached([thumbnail.url(scale) for scale in SCALES]):
+            done[tile_image] = thumbnail
+        else:
+            pending.append((tile_image, write_thumbnail, (source_path(tile_image), thumbnail, config.IMAGE_QUALITY)))
+
+    for tile_image, result in encode_all(pending).items():
+        if isinstance(result, Exception):
+            logger.warning(f"Could not build a tile thumbnail for {tile_image}: {result}")
+        else:
+            done[tile_image] = result
+    return done
+
+
+def thumbnail_files(tile_image: str) -> List[str]:
+    """Build the thumbnail for a page's tile image; its files, to publish with the page's media"""
+    thumbnail = build_thumbnails([tile_image]).get(tile_image)
+    return thumbnail.files() if thumbnail else []
+
+
+def tile_img_html(tile_image: str, alt: str, thumbnail: Optional[Thumbnail] = None,
+                  media_index: Optional[MediaIndex] = None, lazy: bool = True) -> str:
+    """The <img> of a tile (`alt` already escaped): its thumbnail when there is one, else `tile_image` itself
+
+    Either way it carries the source image's placeholder.
+    """
+    if thumbnail is None:
+        thumbnail = build_thumbnails([tile_image]).get(tile_image)
+    source = source_path(tile_image)
+    entry = None
+    if source and os.path.exists(source):
+        index = media_index or MediaIndex()
+        entry = index.image(source)
+        if media_index is None:
+            index.save()
+    if thumbnail is None:
+        return f'<img src="{tile_image}" alt="{alt}"{image_attributes(entry, lazy)}>'
+    entry = dict(entry or {}, width=thumbnail.width, height=thumbnail.height)
+    return f'<img src="{thumbnail.url(1)}" srcset="{thumbnail.url(2)} 2x" alt="{alt}"{image_attributes(entry, lazy)}>'
+
+
+def mark_lazy_tiles(content: str) -> str:
+    """index.html `content` with the first config.EAGER_TILES tile images loading eagerly and the rest lazily"""
+    out = []
+    pos = 0
+    for position, match in enumerate(TILE_IMAGE.finditer(content)):
+        img = LAZY_LOADING.sub('', match.group(2))
+        if position >= config.EAGER_TILES:
+            # Where image_attributes puts it, when the tag has its attributes
+            if ' decoding="async"' in img:
+                img = img.replace(' decoding="async"', ' decoding="async" loading="lazy"', 1)
+            else:
+                img = img[:-1].rstrip(' /') + ' loading="lazy">'
+        out.append(content[pos:match.start(2)])
+        out.append(img)
+        pos = match.end(2)
+    out.append(content[pos:])
+    return ''.join(out)
+
+
+def backfill(content: str) -> Tuple[str, List[str]]:
+    """index.html `content` with every tile pointing at its thumbnail, and the thumbnail files"""
+    tiles = []
+    for match in TILE_IMAGE.finditer(content):
+        attributes = {name.lower(): value for name, value in IMG_ATTRIBUTE.findall(match.group(2))}
+        tiles.append((match, attributes.get('src', ''), attributes.get('alt', '')))
+    thumbnails = build_thumbnails([src for _, src, _ in tiles])
+    media_index = MediaIndex()
+
+    out = []
+    pos = 0
+    files: List[str] = []
+    for match, src, alt in tiles:
+        thumbnail = thumbnails.get(src)
+        if thumbnail is None:
+            continue
+        out.append(content[pos:match.start(2)])
+        out.append(tile_img_html(src, alt, thumbnail, media_index))
+        pos = match.end(2)
+        files.extend(thumbnail.files())
+    out.append(content[pos:])
+    media_index.save()
+    return mark_lazy_tiles(''.join(out)), list(dict.fromkeys(files))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Point every home page tile at a cropped 1x/2x thumbnail")
+    parser.add_argument('--no-commit', action='store_true', help="write the files but don't commit or push")
+    args = parser.parse_args()
+
+    from simple_email_processor import write_index, commit_and_push_paths, media_state_paths
+
+    # The git helpers run from the CMS directory
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    index_path = os.path.join(str(config.BASE_DIR), 'index.html')
+    with open(index_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    updated, files = backfill(content)
+    if updated == content:
+        print("✅ Every tile already uses its thumbnail")
+        return
+    write_index(updated, index_path)
+    print(f"✅ Pointed tiles at {len(files) // len(SCALES)} thumbnail(s)")
+    if not args.no_commit:
+        paths = ['index.html'] + media_state_paths()
+        # Thumbnail URLs are relative to the site root already
+        paths += [path.replace('../', '', 1) for path in files]
+        if not commit_and_push_paths(paths, "Use cropped thumbnails for home page tiles"):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Title Version Index for Portfolio Website
+Persistent record of the newest email published for every page.
+
+Grouping by title only picks a winner inside one fetch window, so an older
+draft that shows up late (rescued from spam, re-sent, imported from an
+archive) would overwrite a newer page. The index remembers, per output
+filename, the date and content hash of the email that was last published:
+
+- emails not newer than the recorded version are skipped from their headers,
+  before any body is downloaded
+- a newer email whose content hash matches the recorded one is not re-rendered,
+  as long as the page and its tile are still on the site
+- deleting a page drops its entry, so the same draft can publish it again
+- titles that sanitize to the same filename are one page, so they are
+  resolved to a single winner up front instead of overwriting each other
+"""
+
+import os
+import json
+import hashlib
+import logging
+import email.utils
+from datetime import datetime, timezone
+from email.header import decode_header
+from email.message import Message
+from typing import Dict, Any, Iterable, Optional, Tuple, TypeVar
+
+from simple_email_processor import sanitize_filename, has_research_tile
+
+try:
+    import config  # Local import when running from CMS directory
+except ModuleNotFoundError:
+    from . import config  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+def normalize_title(title: str) -> str:
+    """Whitespace- and case-insensitive form of a page title"""
+    return ' '.join(title.split()).casefold()
+
+
+def parse_email_date(value: Optional[str]) -> Optional[datetime]:
+    """Date header as an aware UTC datetime, or None when missing/invalid"""
+    try:
+        date = email.utils.parsedate_to_datetime(value or '')
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return date.astimezone(timezone.utc)
+
+
+def decode_email_header(header: Optional[str]) -> str:
+    """Decode an RFC 2047 header (=?utf-8?...?=) safely; every runner keys titles by this form"""
+    if not header:
+        return ""
+    try:
+        decoded = decode_header(header)[0]
+        if isinstance(decoded[0], bytes):
+            return decoded[0].decode(decoded[1] or 'utf-8')
+        return str(decoded[0])
+    except Exception as e:
+        logger.warning(f"Could not decode header: {e}")
+        return str(header)
+
+
+def message_digest(msg: Message) -> str:
+    """SHA-256 over the subject and every decoded MIME part.
+
+    Transport headers and MIME boundaries differ between two sends of the same
+    draft, so they are left out.
+    """
+    digest = hashlib.sha256()
+    digest.update(normalize_title(str(msg.get('Subject', ''))).encode('utf-8'))
+    for part in msg.walk():
+        if part.is_multipart():
+            continue
+        digest.update(b'\0' + part.get_content_type().encode('ascii', 'replace'))
+        digest.update(b'\0' + (part.get_filename() or '').encode('utf-8', 'replace'))
+        digest.update(b'\0' + (part.get_payload(decode=True) or b''))
+    return digest.hexdigest()
+
+
+class TitleVersionIndex:
+    """filename -> {title, date, hash} of the last published email"""
+
+    def __init__(self, path: str = config.TITLE_INDEX_PATH):
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = self.load()
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                    return data if isinstance(data, dict) else {}
+        except Exception as e:
+            logger.warning(f"Could not load title index: {e}")
+        return {}
+
+    def save(self):
+        try:
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.error(f"Could not save title index: {e}")
+
+    def latest_date(self, title: str) -> Optional[datetime]:
+        entry = self.entries.get(sanitize_filename(title))
+        return datetime.fromisoformat(entry['date']) if entry else None
+
+    def is_stale(self, title: str, date: Optional[datetime]) -> bool:
+        """True when `date` is not newer than the version already published"""
+        published = self.latest_date(title)
+        if published is None:
+            return False
+        # Undated emails can't prove they are newer than a published version
+        return date is None or date <= published
+
+    def is_unchanged(self, title: str, digest: str) -> bool:
+        """True when `digest` is what was last published for `title` and that page is still on the site"""
+        filename = sanitize_filename(title)
+        entry = self.entries.get(filename)
+        if not entry or entry.get('hash') != digest:
+            return False
+        # A page deleted by hand has to be published again
+        return os.path.exists(os.path.join(config.PAGES_DIR, filename)) and has_research_tile(filename)
+
+    def forget(self, filename: str):
+        """Drop the entry of a deleted page"""
+        self.entries.pop(filename, None)
+
+    def record(self, title: str, date: Optional[datetime], digest: str):
+        """Remember the email that was just published for `title`"""
+        date = date or datetime.now(timezone.utc)
+        published = self.latest_date(title)
+        if published is not None and published > date:
+            return
+        self.entries[sanitize_filename(title)] = {
+            'title': normalize_title(title),
+            'date': date.isoformat(),
+            'hash': digest,
+        }
+
+    def select_latest(self, candidates: Iterable[Tuple[str, Optional[datetime], T]]
+                      ) -> Dict[str, Tuple[str, Optional[datetime], T]]:
+        """Newest (title, date, item) candidate per output file that still needs rendering.
+
+        Keyed by filename. Files whose newest candidate is stale are left out,
+        so every candidate for them can be marked as processed.
+        """
+        latest: Dict[str, Tuple[str, Optional[datetime], T]] = {}
+        titles: Dict[str, set] = {}
+        floor = datetime.min.replace(tzinfo=timezone.utc)
+        for title, date, item in candidates:
+            key = sanitize_filename(title)
+            titles.setdefault(key, set()).add(normalize_title(title))
+            if key not in latest or (date or floor) > (latest[key][1] or floor):
+                latest[key] = (title, date, item)
+
+        winners = {}
+        for key, (title, date, item) in latest.items():
+            if len(titles[key]) > 1:
+                logger.warning(f"Titles {sorted(titles[key])} all map to {key}; newest wins: '{title}'")
+            if self.is_stale(title, date):
+                logger.info(f"Skipping stale version of '{title}' ({date}); a newer one is already published")
+            else:
+                winners[key] = (title, date, item)
+        return winners
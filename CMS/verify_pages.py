@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Page Verifier for Portfolio Website
+Re-renders every page from the source recorded in the render cache and
+reports any page whose bytes differ from what is published.
+
+Sources live in render_sources.json, which is not committed, so only pages
+built on this machine (or a copy of its sources file) can be checked; the
+others are reported as unverifiable.
+
+Rendering is deterministic (carousel ids are content hashes, "Created:" is the
+recorded first-published date), so drift means a page was edited by hand or
+the templates/renderer changed since it was built. Nothing is written: media
+is referenced by its recorded path instead of being saved again.
+
+Usage:
+    python verify_pages.py [page.html ...]
+"""
+
+import io
+import os
+import sys
+import argparse
+import contextlib
+from datetime import date
+from typing import Dict, Any, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from simple_email_processor import build_html_page
+from enhanced_email_processor import build_enhanced_html_page
+from render_cache import RenderCache
+
+try:
+    import config  # Local import when running from CMS directory
+except ModuleNotFoundError:
+    from . import config  # type: ignore
+
+
+def rebuild(filename: str, entry: Dict[str, Any], source: Dict[str, Any]) -> bytes:
+    """The bytes building `source` on `entry`'s first-published date would write for `filename`"""
+    created = date.fromisoformat(entry['created'])
+    attachments = [{'filename': a['filename'], 'content_type': a['content_type']} for a in source['attachments']]
+    saved_paths = [a['path'] for a in source['attachments']]
+
+    # Rebuild with the markdown engine, minification and image setting the page was built with
+    engine, minify, variants = config.MARKDOWN_ENGINE, config.MINIFY_HTML, config.IMAGE_VARIANTS
+    config.MARKDOWN_ENGINE = source.get('engine', 'tags')
+    config.MINIFY_HTML = source.get('minified', False)
+    config.IMAGE_VARIANTS = source.get('image_variants', False)
+    try:
+        # The builders narrate every step; only the report matters here
+        with contextlib.redirect_stdout(io.StringIO()):
+            if source['builder'] == 'enhanced':
+                html_page, _, _ = build_enhanced_html_page(source['title'], source['content'], filename, attachments,
+                                                           source['description'], saved_paths, created)
+            else:
+                html_page, _ = build_html_page(source['title'], source['content'], filename, attachments,
+                                               saved_paths, created)
+    finally:
+        config.MARKDOWN_ENGINE, config.MINIFY_HTML, config.IMAGE_VARIANTS = engine, minify, variants
+    return html_page.encode('utf-8')
+
+
+def first_difference(a: bytes, b: bytes) -> int:
+    for i, (x, y) in enumerate(zip(a, b)):
+        if x != y:
+            return i
+    return min(len(a), len(b))
+
+
+def verify_page(filename: str, entry: Dict[str, Any], source: Optional[Dict[str, Any]]) -> Tuple[str, Optional[str]]:
+    """('ok' | 'drift' | 'missing' | 'unverifiable', detail)"""
+    if not source or not entry.get('created'):
+        return 'unverifiable', "no local source for this build"
+    try:
+        with open(os.path.join(config.PAGES_DIR, filename), 'rb') as f:
+            published = f.read()
+    except OSError:
+        return 'missing', "page not on disk"
+
+    rebuilt = rebuild(filename, entry, source)
+    if rebuilt == published:
+        return 'ok', None
+    offset = first_difference(rebuilt, published)
+    return 'drift', (f"{len(published)} bytes published, {len(rebuilt)} rebuilt; first difference at byte {offset}: "
+                     f"{published[offset:offset + 40]!r} != {rebuilt[offset:offset + 40]!r}")
+
+
+def verify_pages(filenames: Optional[List[str]] = None) -> Dict[str, int]:
+    """Verify `filenames` (default: every page in the render cache); returns a count per status"""
+    render_cache = RenderCache()
+    counts = {'ok': 0, 'drift': 0, 'missing': 0, 'unverifiable': 0}
+    for filename in filenames or sorted(render_cache.entries):
+        entry = render_cache.entries.get(filename)
+        if entry:
+            status, detail = verify_page(filename, entry, render_cache.source(filename))
+        else:
+            status, detail = 'unverifiable', "not in the render cache"
+        counts[status] += 1
+        if status != 'ok':
+            print(f"{'❌' if status == 'drift' else '⚠️'} {status}: Pages/{filename} - {detail}")
+    return counts
+
+
+def main():
+    """Main function for command line usage"""
+    parser = argparse.ArgumentParser(description="Re-render every page and report byte drift")
+    parser.add_argument('pages', nargs='*', help="page filenames to check (default: all recorded pages)")
+    args = parser.parse_args()
+
+    counts = verify_pages([os.path.basename(page) for page in args.pages])
+    print(', '.join(f"{count} {status}" for status, count in counts.items()))
+    if counts['drift'] or counts['missing']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
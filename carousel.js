@@ -0,0 +1,36 @@
+// Carousels on pages built from emails (CMS/tag_renderer.py writes the markup)
+// One shared module: every [Carousel] on a page is plain markup, and this
+// script drives them all through a single delegated click handler.
+
+function showSlide(carousel, index) {
+    const slides = carousel.querySelectorAll('.carousel-item');
+    const current = ((index % slides.length) + slides.length) % slides.length;
+    carousel.dataset.current = current;
+    carousel.querySelector('.carousel-track').style.transform = `translateX(-${current * 100}%)`;
+    carousel.querySelectorAll('.carousel-dot').forEach((dot, i) => {
+        dot.classList.toggle('active', i === current);
+    });
+    slides.forEach((slide, i) => {
+        if (i !== current) {
+            slide.querySelectorAll('video').forEach((video) => video.pause());
+        }
+    });
+    // Start fetching the next slide so it is ready when it slides in
+    const next = slides[(current + 1) % slides.length];
+    next.querySelectorAll('img[loading="lazy"]').forEach((img) => { img.loading = 'eager'; });
+}
+
+document.addEventListener('click', (event) => {
+    const control = event.target.closest('.carousel-container [data-step], .carousel-container [data-slide]');
+    if (!control) {
+        return;
+    }
+    const carousel = control.closest('.carousel-container');
+    if (control.dataset.step) {
+        showSlide(carousel, Number(carousel.dataset.current || 0) + Number(control.dataset.step));
+    } else {
+        showSlide(carousel, Number(control.dataset.slide));
+    }
+});
+
+document.querySelectorAll('.carousel-container').forEach((carousel) => showSlide(carousel, 0));
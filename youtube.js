@@ -0,0 +1,18 @@
+// Lite YouTube embeds on pages built from emails (CMS/tag_renderer.py writes the facades)
+// A facade is the video's thumbnail linking to YouTube. Clicking it swaps in
+// the privacy-enhanced player, so the player's scripts only load for videos
+// somebody actually plays.
+
+document.addEventListener('click', (event) => {
+    const link = event.target.closest('.youtube-facade a[data-youtube]');
+    if (!link) {
+        return;
+    }
+    event.preventDefault();
+    const iframe = document.createElement('iframe');
+    iframe.src = `https://www.youtube-nocookie.com/embed/${encodeURIComponent(link.dataset.youtube)}?autoplay=1`;
+    iframe.title = 'YouTube video player';
+    iframe.allow = 'accelerometer; autoplay; clipboard-write; encrypted-media; gyroscope; picture-in-picture';
+    iframe.allowFullscreen = true;
+    link.replaceWith(iframe);
+});